@@ -0,0 +1,393 @@
+"""
+Mesures de performance du Casse-Brique
+
+Fonctionnalités :
+- simulation : ticks par seconde de la boucle (Paddle.move + balle + collisions), modes swept et discret
+- avance rapide : partie entière (raquette sur toute la largeur) avec run() et avec fast_forward()
+- multiballe (si NumPy est installé) : coût d'un tick avec 500 balles supplémentaires
+- collisions : coût de BricksManager.collision / sweep quand la grille passe de 6x10 à 200x200
+- briques : coût par brique de destroy() et de la création du tableau (create_bricks + grille)
+- niveaux : compilation d'un niveau 200x200, chargement depuis le cache, changement de niveau
+- sauvegarde : temps de save_binary / load_binary et save_json / load_json sur un grand tableau
+- démarrage : import du moteur seul (sans Tkinter) dans un nouveau processus
+- rendu (si un affichage X est disponible, réel ou virtuel avec Xvfb) : création et dessin
+  des briques avec CanvasRenderer et FramebufferRenderer ; temps jusqu'à la première image du jeu
+  (niveau 200x200 et long historique des scores) et jusqu'à ce que le jeu soit prêt
+- résultats dans un fichier JSON, comparés à une référence: toute régression fait échouer la commande
+
+Utilisation :
+    python bench.py                                   # mesures -> bench_results.json
+    python bench.py --save-baseline bench_baseline.json
+    python bench.py --baseline bench_baseline.json    # code de sortie 1 en cas de régression
+    python bench.py --quick                           # mesures plus courtes
+
+Coding: UTF-8
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from moteur import Engine, BricksManager, Paddle, Ball, RUNNING
+from sauvegarde import save_binary, load_binary, save_json, load_json
+from niveau import compile_level, load_level
+from multiballe import HAS_NUMPY
+
+#tailles de grille (lignes, colonnes) pour les mesures de collisions
+GRID_SIZES = [(6, 10), (25, 40), (50, 100), (100, 200), (200, 200)]
+#écart toléré par rapport à la référence avant de signaler une régression
+TOLERANCE = 0.20
+HIGHER = "higher"
+LOWER = "lower"
+
+
+def brick_height(rows):
+    """hauteur des briques pour que la grille tienne entre le score et la raquette"""
+    return max(1, min(22, 400 // rows))
+
+
+def best_of(fn, repeat):
+    """meilleur temps (s) de repeat appels de fn()"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_simulation(results, ticks, repeat):
+    """ticks par seconde d'une partie jouée par un pilote automatique qui suit la balle"""
+    for swept in (True, False):
+        def play():
+            engine = Engine(swept=swept)
+            for _ in range(ticks):
+                if engine.status != RUNNING:
+                    engine = Engine(swept=swept)
+                dx = engine.ball.x - engine.paddle.x
+                engine.set_paddle_speed(10 if dx > 20 else -10 if dx < -20 else 0)
+                engine.step()
+        elapsed = best_of(play, repeat)
+        name = "sim.ticks_per_s." + ("swept" if swept else "discrete")
+        results[name] = {"value": ticks / elapsed, "unit": "ticks/s", "better": HIGHER}
+
+
+def bench_fast_forward(results, repeat):
+    """partie jouée jusqu'au bout (raquette sur toute la largeur): tick par tick et par avance rapide"""
+    for name, rows, cols in (("6x10", 6, 10), ("40x50", 40, 50)):
+        for method in ("run", "fast_forward"):
+            def play():
+                engine = Engine(paddle_width=800, rows=rows, cols=cols, brick_height=brick_height(rows))
+                getattr(engine, method)(1000000)
+            results[f"sim.full_game_{name}.{method}_ms"] = {
+                "value": best_of(play, repeat) * 1000, "unit": "ms", "better": LOWER}
+
+
+def bench_multiball(results, ticks, repeat, balls=500):
+    """coût d'un tick avec balls balles supplémentaires sur un tableau 50x100 (raquette sur toute la largeur)"""
+    rng = random.Random(0)
+
+    def prepare():
+        engine = Engine(rows=50, cols=100, brick_height=brick_height(50), swept=False)
+        engine.paddle.width = 800
+        engine.multiball()
+        while engine.swarm.n < balls:
+            engine.swarm.add(rng.uniform(10, 790), rng.uniform(300, 500), rng.uniform(-4, 4), -rng.uniform(2, 4))
+        return engine
+    #les moteurs sont construits hors chronométrage
+    engines = [prepare() for _ in range(repeat)]
+
+    def play():
+        engine = engines.pop()
+        for _ in range(ticks):
+            engine.step()
+    elapsed = best_of(play, repeat)
+    results[f"sim.multiball_{balls}.ms_per_tick"] = {"value": elapsed / ticks * 1000, "unit": "ms", "better": LOWER}
+
+
+def bench_collisions(results, calls, repeat):
+    """coût d'un appel de collision() et de sweep() selon la taille de la grille"""
+    rng = random.Random(0)
+    for rows, cols in GRID_SIZES:
+        h = brick_height(rows)
+        manager = BricksManager(rows, cols, h)
+        mask = manager.alive_mask()
+        ball = Ball(Paddle())
+        bottom = 60 + rows * h
+        positions = [(rng.uniform(0, 800), rng.uniform(40, bottom + 20)) for _ in range(calls)]
+
+        def collide():
+            manager.set_alive_mask(mask)
+            for x, y in positions:
+                ball.x, ball.y = x, y
+                manager.collision(ball)
+
+        def sweep():
+            manager.set_alive_mask(mask)
+            for x, y in positions:
+                manager.sweep(x, y, 3.5, -3.5, ball.radius)
+
+        size = f"{rows}x{cols}"
+        results["collision.us_per_call." + size] = {
+            "value": best_of(collide, repeat) / calls * 1e6, "unit": "us", "better": LOWER}
+        results["sweep.us_per_call." + size] = {
+            "value": best_of(sweep, repeat) / calls * 1e6, "unit": "us", "better": LOWER}
+
+
+def bench_bricks(results, repeat):
+    """coût par brique de la création du tableau et de destroy()"""
+    rows, cols = GRID_SIZES[-1]
+    n = rows * cols
+    elapsed = best_of(lambda: BricksManager(rows, cols, brick_height(rows)), repeat)
+    results["bricks.create_us_per_brick"] = {"value": elapsed / n * 1e6, "unit": "us", "better": LOWER}
+
+    manager = BricksManager(rows, cols, brick_height(rows))
+    mask = manager.alive_mask()
+
+    def destroy_all():
+        manager.set_alive_mask(mask)
+        for brick in manager.bricks:
+            brick.destroy()
+    elapsed = best_of(destroy_all, repeat)
+    results["bricks.destroy_us_per_brick"] = {"value": elapsed / n * 1e6, "unit": "us", "better": LOWER}
+
+
+def level_text(rows, cols):
+    """texte d'un niveau rows x cols (une brique sur deux résistante, une case sur quatre vide)"""
+    lines = ["case 4 2", "origine 0 60", "brique a #9b59b6 1 1", "brique b #e74c3c 2 2", "grille"]
+    lines += ["ab" * (cols // 2) if row % 2 else "a." * (cols // 2) for row in range(rows)]
+    return "\n".join(lines + ["fin"]) + "\n"
+
+
+def bench_levels(results, repeat):
+    """niveau 200x200 (une brique sur deux résistante): compilation, lecture du cache, changement de niveau"""
+    text = level_text(*GRID_SIZES[-1])
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "niveau.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        elapsed = best_of(lambda: compile_level(text, path), repeat)
+        results["level.compile_ms"] = {"value": elapsed * 1000, "unit": "ms", "better": LOWER}
+        load_level(path)
+        elapsed = best_of(lambda: load_level(path), repeat)
+        results["level.cached_load_ms"] = {"value": elapsed * 1000, "unit": "ms", "better": LOWER}
+
+        engine = Engine(levels=[path])
+        elapsed = best_of(lambda: engine.load_level(0), repeat)
+        results["level.switch_ms"] = {"value": elapsed * 1000, "unit": "ms", "better": LOWER}
+
+
+def bench_save(results, repeat):
+    """temps de sauvegarde et de chargement (binaire et JSON) d'un tableau 200x200 à moitié détruit"""
+    rows, cols = GRID_SIZES[-1]
+    engine = Engine(rows=rows, cols=cols, brick_height=brick_height(rows))
+    for index in range(0, len(engine.bricks), 2):
+        engine.bricks.destroy(index)
+
+    with tempfile.TemporaryDirectory() as folder:
+        for name, save, load in (("binary", save_binary, load_binary), ("json", save_json, load_json)):
+            path = os.path.join(folder, "save." + name)
+            elapsed = best_of(lambda: save(engine, path), repeat)
+            results[f"save.{name}_ms"] = {"value": elapsed * 1000, "unit": "ms", "better": LOWER}
+
+            #le moteur neuf est construit hors chronométrage
+            best = float('inf')
+            for _ in range(repeat):
+                fresh = Engine(rows=rows, cols=cols, brick_height=brick_height(rows))
+                start = time.perf_counter()
+                load(fresh, path)
+                best = min(best, time.perf_counter() - start)
+            results[f"load.{name}_ms"] = {"value": best * 1000, "unit": "ms", "better": LOWER}
+
+
+def bench_import(results, repeat):
+    """import du moteur dans un nouveau processus (ce que paie un script sans fenêtre); Tkinter ne doit pas venir"""
+    code = ("import sys, time; t = time.perf_counter(); import moteur; "
+            "print(time.perf_counter() - t, 'tkinter' in sys.modules)")
+    best = float('inf')
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+        if output[1] != "False":
+            raise RuntimeError("import moteur charge tkinter")
+        best = min(best, float(output[0]))
+    results["startup.import_engine_ms"] = {"value": best * 1000, "unit": "ms", "better": LOWER}
+
+
+def virtual_display():
+    """
+    - si aucun affichage X n'est défini, lance Xvfb (s'il est installé) et retourne le processus
+    - retourne None s'il y a déjà un affichage, False s'il n'y en a aucun
+    """
+    if os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return False
+    display = ":87"
+    process = subprocess.Popen([xvfb, display, "-screen", "0", "1024x768x24"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = display
+    return process
+
+
+def bench_render(results, frames, repeat):
+    """création des briques et coût d'une image, pour les deux rendus, sur un tableau 200x200"""
+    import tkinter as tk
+    from final_version import CanvasRenderer, FramebufferRenderer
+
+    rows, cols = GRID_SIZES[-1]
+    n = rows * cols
+    root = tk.Tk()
+    try:
+        for name, renderer_class in (("canvas", CanvasRenderer), ("framebuffer", FramebufferRenderer)):
+            def build():
+                canvas = tk.Canvas(root, width=800, height=600, bg='black')
+                engine = Engine(rows=rows, cols=cols, brick_height=brick_height(rows))
+                start = time.perf_counter()
+                renderer = renderer_class(canvas, engine)
+                canvas.update_idletasks()
+                return canvas, engine, renderer, time.perf_counter() - start
+            best = float('inf')
+            for _ in range(repeat):
+                canvas, engine, renderer, elapsed = build()
+                best = min(best, elapsed)
+                canvas.destroy()
+            results[f"render.{name}.create_us_per_brick"] = {"value": best / n * 1e6, "unit": "us", "better": LOWER}
+
+            canvas, engine, renderer, _ = build()
+
+            def play():
+                for _ in range(frames):
+                    dx = engine.ball.x - engine.paddle.x
+                    engine.set_paddle_speed(10 if dx > 0 else -10)
+                    engine.step()
+                    renderer.draw()
+                    canvas.update_idletasks()
+            elapsed = best_of(play, repeat)
+            results[f"render.{name}.frame_ms"] = {"value": elapsed / frames * 1000, "unit": "ms", "better": LOWER}
+            canvas.destroy()
+    finally:
+        root.destroy()
+
+
+def bench_startup(results, repeat, history=100000):
+    """
+    Game() avec un niveau 200x200 et un ancien historique de history scores à importer:
+    temps jusqu'à la première image (menu) et jusqu'à ce que le jeu soit prêt
+    """
+    import final_version
+
+    folder = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    levels = final_version.LEVELS
+    first_frame = ready = float('inf')
+    try:
+        os.chdir(folder)
+        with open("niveau.txt", "w", encoding="utf-8") as f:
+            f.write(level_text(*GRID_SIZES[-1]))
+        load_level("niveau.txt")    #cache du niveau déjà construit, comme au second lancement
+        final_version.LEVELS = ["niveau.txt"]
+        for _ in range(repeat):
+            with open(final_version.LEGACY_SCORES_FILE, "w", encoding="utf-8") as f:
+                json.dump([random.randrange(1000) for _ in range(history)], f)
+            if os.path.exists(final_version.SCORES_FILE):
+                os.remove(final_version.SCORES_FILE)
+            start = time.perf_counter()
+            game = final_version.Game()
+            while "ready" not in game.startup:
+                game.window.update()
+            first_frame = min(first_frame, game.startup["first_frame"] - start)
+            ready = min(ready, game.startup["ready"] - start)
+            game.quitter()
+    finally:
+        final_version.LEVELS = levels
+        os.chdir(cwd)
+        shutil.rmtree(folder, ignore_errors=True)
+    results["startup.first_frame_ms"] = {"value": first_frame * 1000, "unit": "ms", "better": LOWER}
+    results["startup.ready_ms"] = {"value": ready * 1000, "unit": "ms", "better": LOWER}
+
+
+def compare(results, baseline, tolerance):
+    """affiche la comparaison à la référence et retourne la liste des régressions"""
+    regressions = []
+    for name, ref in sorted(baseline.items()):
+        if name not in results:
+            continue
+        value, base = results[name]["value"], ref["value"]
+        if ref["better"] == HIGHER:
+            worse = value < base * (1 - tolerance)
+        else:
+            worse = value > base * (1 + tolerance)
+        change = (value - base) / base * 100 if base else 0.0
+        flag = "RÉGRESSION" if worse else "ok"
+        print(f"{name:45s} {base:12.3f} -> {value:12.3f} {ref['unit']:8s} {change:+7.1f} %  {flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesures de performance du Casse-Brique")
+    parser.add_argument("--output", default="bench_results.json", help="fichier de résultats (JSON)")
+    parser.add_argument("--baseline", help="référence à comparer (JSON produit par --save-baseline)")
+    parser.add_argument("--save-baseline", help="enregistre les résultats comme nouvelle référence")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="écart toléré (0.20 = 20 %%)")
+    parser.add_argument("--quick", action="store_true", help="mesures plus courtes (moins précises)")
+    parser.add_argument("--no-render", action="store_true", help="ne pas mesurer le rendu Tk")
+    args = parser.parse_args(argv)
+
+    repeat = 2 if args.quick else 5
+    results = {}
+    bench_simulation(results, ticks=5000 if args.quick else 50000, repeat=repeat)
+    bench_fast_forward(results, repeat=1 if args.quick else 3)
+    if HAS_NUMPY:
+        bench_multiball(results, ticks=200 if args.quick else 1000, repeat=repeat)
+    bench_collisions(results, calls=2000 if args.quick else 20000, repeat=repeat)
+    bench_bricks(results, repeat=repeat)
+    bench_levels(results, repeat=repeat)
+    bench_save(results, repeat=repeat)
+    bench_import(results, repeat=repeat)
+
+    if not args.no_render:
+        display = virtual_display()
+        if display is False:
+            print("rendu non mesuré: pas d'affichage X (DISPLAY) ni de Xvfb")
+        else:
+            try:
+                bench_render(results, frames=200 if args.quick else 1000, repeat=repeat)
+                bench_startup(results, repeat=1 if args.quick else 3)
+            finally:
+                if display is not None:
+                    display.terminate()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    for name, result in sorted(results.items()):
+        print(f"{name:45s} {result['value']:12.3f} {result['unit']}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} RÉGRESSION(S) par rapport à {args.baseline}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Commandes clavier du Casse-Brique (sans Tkinter)
+
+Fonctionnalités :
+- InputQueue : les gestionnaires de touches ne font que mettre l'évènement dans une file (press / release)
+- la file est lue une fois au début de chaque tick (sample) : l'état des touches est figé pour tout le tick
+- répétition automatique du système (relâché + appuyé aussitôt) filtrée : la touche reste enfoncée,
+  la raquette ne s'arrête plus un instant à chaque répétition
+- la dernière flèche enfoncée donne la direction ; la relâcher rend la main à l'autre si elle est encore enfoncée
+- latence entre l'évènement clavier et le tick qui déplace la raquette, mesurée dans un histogramme
+  (telemetrie.RollingHistogram, affiché avec les autres mesures)
+
+Coding: UTF-8
+"""
+
+import time
+from collections import deque
+
+from telemetrie import RollingHistogram
+
+LEFT = -1
+RIGHT = 1
+PRESS = 1
+RELEASE = 0
+#un relâchement suivi d'un appui de la même touche en moins de REPEAT_GAP secondes est une répétition
+REPEAT_GAP = 0.03
+
+
+class InputQueue:
+    """
+    File des évènements clavier (direction, appui/relâchement, instant):
+    - press(direction) / release(direction): appelés par les gestionnaires Tk, en O(1)
+    - sample(): au début d'un tick, applique les évènements et retourne la direction (-1, 0 ou 1)
+    - un relâchement trop récent est gardé pour le tick suivant (une répétition peut encore le suivre)
+    - latency: délais (ms) entre l'évènement et le tick où la direction a changé
+    """
+    def __init__(self, repeat_gap=REPEAT_GAP, clock=time.perf_counter):
+        self.repeat_gap = repeat_gap
+        self.clock = clock
+        self.events = deque()
+        #flèches enfoncées, de la plus ancienne à la plus récente
+        self.held = []
+        self.direction = 0
+        self.latency = RollingHistogram()
+        self.repeats = 0     #répétitions automatiques filtrées
+
+    def press(self, direction):
+        self.events.append((direction, PRESS, self.clock()))
+
+    def release(self, direction):
+        self.events.append((direction, RELEASE, self.clock()))
+
+    def clear(self):
+        """oublie les évènements en attente et les touches enfoncées (nouvelle partie, reprise)"""
+        self.events.clear()
+        self.held.clear()
+        self.direction = 0
+
+    def sample(self):
+        """applique les évènements en attente (début de tick) et retourne la direction de la raquette"""
+        events = self.events
+        if not events:
+            return self.direction
+        now = self.clock()
+        changed_at = None
+        while events:
+            direction, kind, at = events[0]
+            if kind == RELEASE:
+                #répétition: le même appui suit aussitôt, les deux évènements s'annulent
+                if len(events) > 1 and events[1][0] == direction and events[1][1] == PRESS \
+                        and events[1][2] - at < self.repeat_gap:
+                    events.popleft()
+                    events.popleft()
+                    self.repeats += 1
+                    continue
+                if len(events) == 1 and now - at < self.repeat_gap:
+                    break
+                if direction in self.held:
+                    self.held.remove(direction)
+            elif direction not in self.held:
+                self.held.append(direction)
+            events.popleft()
+            new = self.held[-1] if self.held else 0
+            if new != self.direction:
+                self.direction = new
+                changed_at = at
+        if changed_at is not None:
+            self.latency.add((now - changed_at) * 1000.0)
+        return self.direction
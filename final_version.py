@@ -1,556 +1,979 @@
-"""
-Jeu Casse-Brique
-
-Fonctionnalités :
-- Interface Tkinter : Canvas, score, vies, menu, boutons (Start new, Last game, Pause/Resume, Recent Scores, Quit)
-- Classes: Game, Paddle, Ball, Brick, BrickManager
-- Raquette contrôlée par flèches gauche/droite
-- Balle se déplace automatiquement avec des rebonds suivant la loi de Descartes, collisions avec murs/raquette/briques
-- Plusieurs rangées de briques, destruction + score
-- mise en pause/reprise du jeu
-- sauvegarde automatique du jeu par pression du bouton quit si la partie n'est pas achevée
-- choix de reprendre la partie (ou non) par l'utilisateur
-- affichage disponible des 5 derniers scores
-- Vies (par défaut 3), affichage, fin de partie (victoire / game over)
-
-Coding: UTF-8
-
-Auteurs: Stefania NOUBOUA - Elise MUSTO
-"""
-
-import tkinter as tk
-import math
-from typing import List
-from collections import deque 
-import json
-import os
-
-C_WIDTH = 800
-C_HEIGHT = 600
-P_WIDTH = 120
-P_HEIGHT = 16
-OFFSET = 40
-RADIUS = 5
-INIT_BALL_SPEED = 5.0
-ROWS = 6
-COLS = 10
-B_WIDTH = C_WIDTH // COLS
-B_HEIGHT = 22
-LIVES = 3
-FPS = 110
-
-
-class Paddle:
-    """
-    Classe représentant la raquette du joueur.
-    Cette classe gère :
-      - sa position et sa vitesse horizontale,
-      - le dessin graphique sur le canevas,
-      - le déplacement limité aux bords du canevas.
-    """
-    def __init__(self, canvas):
-        """
-        -initialise la raquette au centre en bas du canevas.
-        """
-        self.canvas = canvas
-        self.width = P_WIDTH
-        self.height = P_HEIGHT
-        self.x = C_WIDTH // 2
-        self.y = C_HEIGHT - OFFSET
-        self.vel = 0
-        self.max_speed = 10
-        self.id = self.canvas.create_rectangle(0, 0, 1, 1, fill='blue')
-        self.draw()
-
-    def draw(self):
-        """
-        - met à jour la position graphique de la raquette sur le canevas.
-        - la raquette est centrée autour de (self.x, self.y).
-        """
-        #Calcule les coordonnées du coin supérieur gauche du rectangle
-        x1 = self.x - self.width // 2
-        y1 = self.y - self.height // 2
-
-        #Calcule les coordonnées du coin inférieur droit du rectangle
-        x2 = self.x + self.width // 2
-        y2 = self.y + self.height // 2
-
-        self.canvas.coords(self.id, x1, y1, x2, y2)
-
-    def move(self):
-        """
-        - déplace la raquette selon sa vitesse actuelle.
-        - si elle touche un bord, on la bloque (elle ne sort pas de la zone de jeu).
-        """
-        #Nouvelle position calculée
-        new_x = self.x + self.vel
-        half = self.width // 2
-        #Empêche la raquette de dépasser le bord gauche
-        if new_x - half < 0:
-            new_x = half
-        #Empêche la raquette de dépasser le bord droit
-        if new_x + half > C_WIDTH:
-            new_x = C_WIDTH - half
-
-        self.x = new_x
-        self.draw()
-
-    def set_speed(self, v):
-        """
-        - définit la vitesse de la raquette.
-        - utilisée lorsqu'on appuie ou relâche les flèches du clavier.
-        - param v: vitesse souhaitée (positive = droite, négative = gauche)
-        """
-        self.vel = v
-
-class Brick:
-    """
-    Brique unique définie par:
-    - position
-    - taille
-    - couleur
-    """
-    def __init__(self, canvas, x, y, w, h, color, value):
-        self.canvas = canvas
-
-        #coin supérieur gauche
-        self.x = x  
-        self.y = y
-        #coin inférieur droit
-        self.w = w
-        self.h = h
-
-        self.color = color
-        self.value = value #nombre de points que sa destruction
-        self.alive = True
-        self.id = self.canvas.create_rectangle(x, y, x + w, y + h, fill=color, outline='black')
-
-    def destroy(self):
-        """détruit la brique si elle est encore en vie"""
-        if self.alive:
-            self.alive = False
-            self.canvas.delete(self.id)
-
-class BricksManager:
-    """
-    - crée la grille de briques
-    - détecte collisions balle-brique
-    - détruit la brique touchée
-    - renvoie True si une brique a été touchée
-    """
-    def __init__(self, canvas):
-        self.canvas = canvas
-        self.bricks: List[Brick] = []
-        self.create_bricks()
-
-    def create_bricks(self):
-        """
-        crée le tableau de briques en haut de la fenêtre de jeu
-        """
-
-        top_offset = 60  # laisse de la place pour score/vies
-        for row in range(ROWS):
-            for col in range(COLS):
-                x = col * B_WIDTH
-                y = row * B_HEIGHT + top_offset
-                brick = Brick(self.canvas, x, y, B_WIDTH, B_HEIGHT, color='#9b59b6', value=1)
-                self.bricks.append(brick)
-
-    
-    def collision(self, ball: 'Ball'):
-        """
-        - vérifie si collision entre la balle et une des briques.
-        - retourne la brique touchée et la détruit, ou None si aucune.
-        """
-        ball_left = ball.x - ball.radius
-        ball_right = ball.x + ball.radius
-        ball_top = ball.y - ball.radius
-        ball_bottom = ball.y + ball.radius
-
-        for brick in self.bricks:
-            if not brick.alive:
-                continue
-
-            #Les variables brick_left/right/top/bottom sont les bornes de la brique.
-            brick_left = brick.x
-            brick_right = brick.x + brick.w
-            brick_top = brick.y
-            brick_bottom = brick.y + brick.h
-
-            # Vérifie s'il y a chevauchement entre la balle (approximée en carré) et la brique (se chevauchent à la fois sur l'axe x et l'axe y)
-            if (ball_right >= brick_left and ball_left <= brick_right and
-                ball_bottom >= brick_top and ball_top <= brick_bottom):
-                
-                #calculer la distance entre les côtés de la balle et de la brique susceptibles de se toucher. La plus petite distance indique quel côté de la brique est touché.
-                hit_left = ball_right - brick_left
-                hit_right = brick_right - ball_left
-                hit_top = ball_bottom - brick_top
-                hit_bottom = brick_bottom - ball_top
-                min_hit = min(hit_left, hit_right, hit_top, hit_bottom)
-
-                if min_hit == hit_left or min_hit == hit_right:
-                    #contact latéral. on inverse la composante selon x.
-                    ball.vx = -ball.vx
-                else:
-                    #contact vertical. on inverse la composante selon y.
-                    ball.vy = -ball.vy
-
-                brick.destroy()
-
-                #permet d'actualiser le score en indiquant à la classe Game la valeur de la brique qui vient d'être détruite (hit_brick)
-                return brick
-        return None
-
-    def count(self):
-        """Nombre de briques encore présentes."""
-        return sum(1 for b in self.bricks if b.alive)
-
-class Ball:
-    """
-    - crée la balle sur le canevas Tkinter
-    - gère son mouvement (mettre à jour sa position à chaque frame)
-    - rebonds sur les murs et la raquette (loi de Descartes)
-    """
-    def __init__(self, canvas, paddle, radius=RADIUS, color='white', speed=INIT_BALL_SPEED):
-        self.canvas = canvas
-        self.paddle = paddle
-        self.radius = radius
-        self.color = color
-        self.speed = speed
-
-        #vitesses horizontales et verticales initiales (arbitraire. la trajectoire est ici une diagonale)
-        self.vx = speed
-        self.vy = -speed
-
-        #création de la balle sur le canevas
-        self.id = self.canvas.create_oval(0, 0, 0, 0, fill=color, outline=color)
-
-        #Position et vitesse initiales
-        self.set_reset()
-
-    def update(self):
-        """Déplace la balle et met à jour sa position sur le canevas."""
-        self.x += self.vx
-        self.y += self.vy
-
-
-    def set_reset(self):
-        """Place la balle au centre de la raquette et initialise la vitesse."""
-        self.x = self.paddle.x
-        self.y = self.paddle.y - self.paddle.height // 2 - self.radius
-        self.vx = self.speed / math.sqrt(2)
-        self.vy = -self.speed / math.sqrt(2)
-        self.canvas.coords(self.id, self.x-self.radius, self.y-self.radius, self.x+self.radius, self.y+self.radius)
-    
-    def handle_collisions(self, brick_manager):
-        """
-        Gestion des collisions:
-        - murs: inversion vx ou vy
-        - briques: inversion vx ou vy selon l'axe du contact
-        - raquette: inversion de vy
-        - paramètres: brick_manager
-        """
-        #Murs
-        if self.x - self.radius <= 0:  #mur gauche
-            self.x = self.radius
-            self.vx = -self.vx
-        elif self.x + self.radius >= C_WIDTH:  #mur droit
-            self.x = C_WIDTH - self.radius
-            self.vx = -self.vx
-
-        if self.y - self.radius <= 0:  #plafond
-            self.y = self.radius
-            self.vy = -self.vy
-
-        #Brique
-        
-        hit_brick = brick_manager.collision(self)
-
-        #Raquette
-        px1 = self.paddle.x - self.paddle.width / 2
-        px2 = self.paddle.x + self.paddle.width / 2
-        py1 = self.paddle.y - self.paddle.height / 2
-        py2 = self.paddle.y + self.paddle.height / 2
-
-        if (px1 <= self.x <= px2) and (py1 <= self.y + self.radius <= py2) and self.vy > 0:
-            self.y = py1 - self.radius
-            self.vy = -self.vy 
-
-        #mise à jour sur le canevas
-        self.canvas.coords(self.id, self.x - self.radius, self.y - self.radius, self.x + self.radius, self.y + self.radius)
-
-        return hit_brick
-    
-
-class Game:
-    """
-    Classe principale du jeu:
-    - Création et gestion de l'interface Tkinter (fenêtre, canvas, boutons (=QUIT, START NEW...))
-    - Création de l'état du jeu (score, vie)
-    - Met à jour les élements du jeu : balle, raquette, brique, score et vies
-    - Gestion des déplacements de la raquette par le clavier
-    - Sauvegarde et restauration des parties (save.json) et gère l'historique des scores (historique.json)
-    """
-    def __init__(self):
-        #charge l'historique (liste) stocké dans historique.json. Si inexistant, on crée une liste vide
-        loaded = []
-        if os.path.exists("historique.json"):
-            with open("historique.json", "r", encoding="utf-8") as f:
-                data = json.load(f)
-                loaded = data
-
-        #implémentation d'une file deque pour garder automatiquement seulement les 5 derniers scores
-        self.historique = deque(loaded, maxlen=5)
-
-        self.window = tk.Tk()
-        self.window.title("Casse-Brique")
-
-        self.canvas = tk.Canvas( self.window, width=C_WIDTH, height=C_HEIGHT, bg='black')
-        self.canvas.pack()
-
-        #score et vies
-        self.score = 0
-        self.lives = LIVES
-        self.score_text = self.canvas.create_text(10, 10, anchor='nw', fill='white', font=('Arial', 16), text=f"Score: {self.score}")
-        self.life_icons = []
-
-        #raquette, balle, briques
-        self.paddle = Paddle(self.canvas)
-        self.ball = Ball(self.canvas, self.paddle)
-        self.bricks = BricksManager(self.canvas)
-
-        #menu
-
-        self.menu_text = self.canvas.create_text(C_WIDTH//2, C_HEIGHT//2, text="Casse-Brique\nChoisissez une option pour jouer pour jouer",
-                                                 fill="white", font=('Arial', 24), justify='center')
-        
-        #boutons
-        self.start_btn = tk.Button(self.window, text=" ▶ START NEW", command=self.start, bg = '#BBDDF2', fg = 'darkgreen', font=('Arial',12, 'bold'), relief='raised')
-        self.start_btn.pack(side='left')
-
-        self.quit_btn = tk.Button(self.window, text=" ✖ QUIT", command=self.quitter, bg = '#BBDDF2', fg = 'darkred', font=('Arial',12, 'bold'), relief='raised')
-        self.quit_btn.pack(side='right')
-
-        self.continue_btn = tk.Button(self.window, text="LAST GAME", command=self.continue_game, bg = '#BBDDF2', fg = "#391369", font=('Arial',12, 'bold'), relief='raised')
-        self.continue_btn.pack(side='left', padx=20, pady=10)
-
-        self.pause_btn = tk.Button(self.window, text="⏸️ PAUSE", command=self.press_pause, bg='grey', fg='white', font=('Arial', 12, 'bold'), relief='raised')
-        self.pause_btn.pack(side='left')
-
-        self.memory_btn = tk.Button(self.window, text="RECENT SCORES", command=self.show_last_scores, bg='#BBDDF2', fg="#8C0544", font=('Arial', 12, 'bold'), relief='raised')
-
-        self.running = False
-        self.paused = False
-
-        #commandes
-        self.window.bind("<Left>", self.on_left_press)
-        self.window.bind("<Right>", self.on_right_press)
-        self.window.bind("<KeyRelease-Left>", self.on_left_release)
-        self.window.bind("<KeyRelease-Right>", self.on_right_release)
-
-
-    #vies avec coeurs
-    def update_lives_display(self):
-        heart = self.life_icons.pop()   
-        self.canvas.delete(heart)
-        self.canvas.update_idletasks()  
-
-    #touches
-    def on_left_press(self, event): 
-        self.paddle.set_speed(-self.paddle.max_speed)
-    def on_right_press(self, event): 
-        self.paddle.set_speed(self.paddle.max_speed)
-    def on_left_release(self, event): 
-        if self.paddle.vel < 0: 
-            self.paddle.set_speed(0)
-    def on_right_release(self, event):
-        if self.paddle.vel > 0: 
-            self.paddle.set_speed(0)
-
-    def start(self):
-        """initialisation et lancement du jeu"""
-        self.running = True
-        self.canvas.delete(self.menu_text)
-        self.start_btn.pack_forget()
-        self.continue_btn.pack_forget()
-        #initialise le nombre de vies
-        for i in range(self.lives):
-            heart = self.canvas.create_text(C_WIDTH - 20 - i*20, 10, anchor='ne', fill='#fd3f92', font=('Arial', 16), text='❤')
-            self.life_icons.append(heart)   #implémentation d'une pile
-
-        self.update()
-
-    def new_game(self):
-        """Commence une nouvelle partie en supprimant la sauvegarde existante."""
-        if os.path.exists("save.json"):
-            os.remove("save.json")
-        self.ball.set_reset()
-        self.start()
-
-    def continue_game(self):
-        """Continue la partie sauvegardée (si elle existe)."""
-        if os.path.exists("save.json"):
-            print("Partie reprise.")
-            self.load_state()
-            self.start()
-        else:
-            print("Pas de sauvegarde à charger.")
-            self.new_game()
-
-    def press_pause(self):
-        """run/stop du jeu et change le nom du bouton en fonction"""
-        if self.running:
-            self.paused, self.running = not self.paused, not self.running
-            self.pause_btn.config(text="RESUME")
-        else:
-            self.paused, self.running = not self.paused, not self.running
-            self.pause_btn.config(text="PAUSE")
-            self.update()
-
-    def end_game(self):
-        """
-        - arrête le jeu en cas de victoire/défaite
-        - met à jour l'historique des scores
-        - efface la dernière sauvegarde car partie achevée
-        """
-        self.running = False
-
-        self.memory_btn.pack(side='left')
-        self.pause_btn.pack_forget()
-
-        self.historique.append(str(self.score))
-
-        # sauvegarde de l'historique en JSON (liste)
-
-        with open("historique.json", 'w', encoding='utf-8') as f:
-            # convertir la file deque en liste pour json
-            json.dump(list(self.historique), f, ensure_ascii=False)
-
-        if os.path.exists("save.json"):
-            os.remove("save.json")
-
-    def show_last_scores(self):
-        """Ouvre une petite fenêtre affichant l'historique des scores."""
-        self.memory_btn.pack_forget()
-        # nouvelle petite fenêtre
-        small_window = tk.Toplevel(self.window)
-        small_window.title("Historique des 5 derniers scores")
-        # taille et position relative à la fenêtre principale
-        x = self.window.winfo_x() + 50
-        y = self.window.winfo_y() + 50
-        small_window.geometry(f"300x240+{x}+{y}")
-
-        # zone de texte non éditable pour afficher l'historique
-        text = tk.Text(small_window, wrap='word', height=10, width=36)
-        text.pack(fill='both', expand=True, padx=10, pady=(10, 5))
-
-        # afficher l'historique (du plus ancien au plus récent)
-        if self.historique:
-            lines = list(self.historique)
-            #une ligne pour chaque score
-            text.insert('end', "\n".join(lines))
-        else:
-            text.insert('end', "Aucun score enregistré.")
-    
-        # rendre la zone non-editable
-        text.config(state='disabled')
-
-        # met un focus sur la fenêtre (sans bloquer la principale)
-        small_window.transient(self.window)
-        small_window.focus_force()
-
-
-    def update(self):
-        if not self.running:
-            return
-        self.paddle.move()
-        self.ball.update()
-        hit_brick = self.ball.handle_collisions(self.bricks)
-        if hit_brick:
-            self.score += hit_brick.value
-            self.canvas.itemconfigure(self.score_text, text=f"Score: {self.score}")
-
-        #si balle tombée
-        if self.ball.y - self.ball.radius > C_HEIGHT:
-            self.lives -= 1
-            self.update_lives_display()
-            if self.lives > 0:
-                self.ball.set_reset()
-            else:
-                self.end_game()
-                self.canvas.create_text(C_WIDTH//2, C_HEIGHT//2, text="GAME OVER", fill="red", font=('Arial', 36))
-
-        #victoire
-        elif self.bricks.count() == 0:
-            self.end_game()
-            self.canvas.create_text(C_WIDTH//2, C_HEIGHT//2, text="VICTOIRE!", fill="green",
-                                    font=('Arial', 36))
-
-        if self.running:
-            self.window.after(int(1000/FPS) #délai en milisecondes
-                              , self.update)
-            
-    def quitter(self):
-        """
-        - sauvegarde automatique du jeu si la partie n'est pas finie
-        - fermeture de la fenêtre
-        """
-        if self.running or self.paused==True:
-            self.save_state()
-        self.window.destroy()
-
-    def save_state(self):
-        """Sauvegarde l'état actuel du jeu dans un fichier JSON."""
-        state = {
-            "score": self.score,
-            "lives": self.lives,
-            "paddle": {"x": self.paddle.x},
-            "ball": {
-                "x": self.ball.x,
-                "y": self.ball.y,
-                "vx": self.ball.vx,
-                "vy": self.ball.vy
-
-            },
-            "bricks": [b.alive for b in self.bricks.bricks]
-        }
-
-        with open("save.json", "w") as f:
-            json.dump(state, f)
-        print("Sauvegarde effectuée.")
-
-    def load_state(self):
-        """Charge une sauvegarde si elle existe."""
-        with open("save.json", "r") as f:
-            state = json.load(f)
-
-        self.score = state["score"]
-        self.lives = state["lives"]
-        self.canvas.itemconfigure(self.score_text, text=f"Score: {self.score}")
-
-        self.paddle.x = state["paddle"]["x"]
-        self.paddle.draw()
-
-        self.ball.x = state["ball"]["x"]
-        self.ball.y = state["ball"]["y"]
-        self.ball.vx = state["ball"]["vx"]
-        self.ball.vy = state["ball"]["vy"]
-        self.canvas.coords(self.ball.id, self.ball.x - self.ball.radius, self.ball.y - self.ball.radius,
-                            self.ball.x + self.ball.radius, self.ball.y + self.ball.radius)
-        
-        # Restaure les briques
-        for b, alive in zip(self.bricks.bricks, state["bricks"]):
-            if not alive:
-                b.destroy()
-
-        print("Sauvegarde chargée avec succès.")
-
-    def run(self):
-        self.window.mainloop()
-
-
-
-#lancer le jeu
-if __name__ == "__main__":
-    game = Game()
+"""
+Jeu Casse-Brique
+
+Fonctionnalités :
+- Interface Tkinter : Canvas, score, vies, menu, boutons (Start new, Last game, Pause/Resume, Recent Scores, Quit)
+- Classes: Game, CanvasRenderer (dessin du moteur sur le canevas)
+- Moteur sans Tkinter dans moteur.py : Engine, Paddle, Ball, Brick, BricksManager
+- Raquette contrôlée par flèches gauche/droite (file des touches lue au début de chaque tick, voir commandes.py)
+- Balle se déplace automatiquement avec des rebonds suivant la loi de Descartes, collisions avec murs/raquette/briques
+- Plusieurs rangées de briques, destruction + score
+- niveaux décrits dans des fichiers texte (niveaux/, voir niveau.py), joués l'un après l'autre
+- boucle de jeu à pas fixe : physique à TICK_RATE ticks/s quelle que soit la machine, dessins sautés en cas de retard
+- mise en pause/reprise du jeu
+- diffusion de la partie à des spectateurs sur une socket locale (SPECTATE, voir spectateur.py)
+- retour en arrière (touche Retour arrière) et kill-cam : la dernière vie perdue est rejouée (voir retour.py)
+- sauvegarde automatique du jeu par pression du bouton quit si la partie n'est pas achevée
+- choix de reprendre la partie (ou non) par l'utilisateur
+- historique de toutes les parties (scores.db) : dernières parties, meilleurs scores, record, centiles, parties par jour
+- Vies (par défaut 3), affichage, fin de partie (victoire / game over)
+- plusieurs parties dans une seule fenêtre, sur une horloge commune (voir multijeu.py)
+- démarrage rapide : le menu s'affiche d'abord, le moteur, les briques et les sous-systèmes sont créés juste après
+  (temps jusqu'à la première image mesuré et affiché)
+
+Coding: UTF-8
+
+Auteurs: Stefania NOUBOUA - Elise MUSTO
+"""
+
+import time
+#le temps jusqu'à la première image est compté à partir du chargement de ce module
+LAUNCH_TIME = time.perf_counter()
+
+import tkinter as tk
+import os
+import random
+
+from moteur import Engine, FixedStepClock, C_WIDTH, C_HEIGHT, RENDER_RATE, RUNNING, LOST, WON
+from telemetrie import Profiler
+from rejeu import InputRecorder
+from sauvegarde import AutoSaver, BackgroundWriter, load_autosave
+from historique import ScoreDB
+from niveau import LEVEL_DIR, level_files
+from commandes import InputQueue, LEFT, RIGHT
+from retour import RewindBuffer
+
+#rendu des briques: 'canvas' (un rectangle par brique), 'framebuffer' (une image) ou 'auto'
+BRICKS_BACKEND = 'auto'
+FRAMEBUFFER_MIN_BRICKS = 2000   #en mode 'auto', nombre de briques à partir duquel on passe à l'image
+
+#mesures de temps par phase (telemetrie.py), exportées en fin de partie
+TELEMETRY = False
+TELEMETRY_OVERLAY = True        #affichage p50/p99 et ticks/s sur le canevas (touche F3)
+TELEMETRY_FILE = "telemetrie"   #fichiers telemetrie.json et telemetrie.csv
+
+#enregistrement des commandes de la partie (rejouable sans fenêtre: python rejeu.py derniere_partie.cbr)
+RECORD_REPLAY = True
+REPLAY_FILE = "derniere_partie.cbr"
+
+#sauvegarde de la partie (format binaire); l'ancien save.json est encore repris s'il existe seul
+SAVE_FILE = "save.bin"
+LEGACY_SAVE_FILE = "save.json"
+
+#niveaux joués dans l'ordre (fichiers texte de niveaux/, voir niveau.py); liste vide: grille d'origine
+LEVELS = level_files(LEVEL_DIR)
+
+#retour en arrière (touche Retour arrière) et kill-cam après une vie perdue (retour.py)
+REWIND_SECONDS = 3      #secondes annulées par la touche
+KILLCAM = True
+KILLCAM_SECONDS = 3     #secondes rejouées avant la vie perdue
+
+#diffusion aux spectateurs (python spectateur.py ADRESSE sur le second écran)
+SPECTATE = False
+SPECTATE_ADDRESS = "127.0.0.1:7777"     #"hôte:port" (TCP) ou chemin d'une socket UNIX
+
+#historique de toutes les parties (base SQLite); l'ancien historique.json y est importé une fois
+SCORES_FILE = "scores.db"
+LEGACY_SCORES_FILE = "historique.json"
+
+#touches de la raquette (gauche, droite) et du retour en arrière
+KEYS = ("Left", "Right", "BackSpace")
+#fenêtre partagée: intervalle (ms) entre deux regards sur un chargement en cours
+LOAD_POLL_MS = 20
+
+
+def slot_file(path, slot):
+    """fichier propre à une partie d'une fenêtre partagée (save.bin -> save_2.bin); slot None: path"""
+    if slot is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{slot}{ext}"
+
+
+def renderer_class(count):
+    """rendu des briques selon BRICKS_BACKEND (et, en mode 'auto', le nombre count de briques)"""
+    backend = BRICKS_BACKEND
+    if backend == 'auto':
+        backend = 'framebuffer' if count >= FRAMEBUFFER_MIN_BRICKS else 'canvas'
+    return FramebufferRenderer if backend == 'framebuffer' else CanvasRenderer
+
+
+class CanvasRenderer:
+    """
+    Dessine l'état du moteur (Engine) sur le canevas Tkinter:
+    - crée les éléments graphiques du score, de la raquette, de la balle et des briques
+    - draw() compare l'état du moteur à ce qui a été dessiné la dernière fois
+      et n'envoie à Tk que les changements (un appel Tcl par élément qui a bougé)
+    - les briques détruites sont cachées (state='hidden') et non supprimées:
+      leurs rectangles restent dans une réserve et sont réutilisés par sync_bricks()
+    - de même pour les balles du multiballe: les ovales sont pris dans une réserve et cachés quand une balle disparaît
+    - calls compte les appels au canevas (mesure du coût du rendu)
+    """
+    def __init__(self, canvas, engine):
+        self.canvas = canvas
+        self.engine = engine
+        self.calls = 0
+        self.score = engine.score
+        self.score_id = self.canvas.create_text(10, 10, anchor='nw', fill='white', font=('Arial', 16), text=f"Score: {self.score}")
+        self.paddle_id = self.canvas.create_rectangle(0, 0, 1, 1, fill='blue')
+        ball = engine.ball
+        self.ball_id = self.canvas.create_oval(0, 0, 0, 0, fill=ball.color, outline=ball.color)
+        #dernières coordonnées envoyées à Tk
+        self.paddle_coords = None
+        self.ball_coords = None
+        #réserve d'ovales pour les balles supplémentaires: swarm_ids[i] dessine la balle i (shown premières visibles)
+        self.swarm_ids = []
+        self.swarm_shown = 0
+        #réserve de rectangles: brick_ids[i] dessine la brique i
+        self.brick_ids = []
+        self.brick_version = None
+        self.sync_bricks()
+        self.draw()
+
+    def sync_bricks(self):
+        """
+        recopie toutes les briques du moteur sur le canevas (création, chargement, nouveau niveau):
+        les rectangles existants sont réutilisés, il n'en est créé que s'il en manque
+        """
+        bricks = self.engine.bricks
+        bricks.destroyed.clear()
+        bricks.revived.clear()
+        self.brick_version = bricks.version
+        canvas = self.canvas
+        for index, b in enumerate(bricks.bricks):
+            state = 'normal' if b.alive else 'hidden'
+            if index < len(self.brick_ids):
+                item = self.brick_ids[index]
+                canvas.coords(item, b.x, b.y, b.x + b.w, b.y + b.h)
+                canvas.itemconfigure(item, fill=b.color, state=state)
+                self.calls += 2
+            else:
+                item = canvas.create_rectangle(b.x, b.y, b.x + b.w, b.y + b.h, fill=b.color, outline='black', state=state)
+                self.brick_ids.append(item)
+                self.calls += 1
+        #rectangles en trop (niveau plus petit): cachés, gardés pour plus tard
+        for item in self.brick_ids[len(bricks):]:
+            canvas.itemconfigure(item, state='hidden')
+            self.calls += 1
+
+    def draw(self):
+        """met à jour sur le canevas ce qui a changé: score, raquette, balle, briques détruites"""
+        canvas = self.canvas
+        engine = self.engine
+        if engine.score != self.score:
+            self.score = engine.score
+            canvas.itemconfigure(self.score_id, text=f"Score: {self.score}")
+            self.calls += 1
+
+        paddle = engine.paddle
+        #la raquette est centrée autour de (paddle.x, paddle.y)
+        coords = (round(paddle.x - paddle.width / 2), round(paddle.y - paddle.height / 2),
+                  round(paddle.x + paddle.width / 2), round(paddle.y + paddle.height / 2))
+        if coords != self.paddle_coords:
+            self.paddle_coords = coords
+            canvas.coords(self.paddle_id, *coords)
+            self.calls += 1
+
+        ball = engine.ball
+        coords = (round(ball.x - ball.radius), round(ball.y - ball.radius),
+                  round(ball.x + ball.radius), round(ball.y + ball.radius))
+        if coords != self.ball_coords:
+            self.ball_coords = coords
+            canvas.coords(self.ball_id, *coords)
+            self.calls += 1
+
+        if engine.swarm is not None or self.swarm_shown:
+            self.draw_swarm()
+
+        bricks = engine.bricks
+        if bricks.version != self.brick_version:
+            #changement en bloc (chargement, niveau): on resynchronise tout
+            self.sync_bricks()
+            return
+        #(une brique peut être détruite puis revenue, ou l'inverse, entre deux dessins: on suit alive)
+        alive = bricks.alive
+        for index in bricks.destroyed:
+            if not alive[index]:
+                self.hide_brick(index)
+        bricks.destroyed.clear()
+        for index in bricks.revived:
+            if alive[index]:
+                self.show_brick(index)
+        bricks.revived.clear()
+
+    def draw_swarm(self):
+        """place les ovales des balles supplémentaires (créés seulement si la réserve est trop petite)"""
+        canvas = self.canvas
+        swarm = self.engine.swarm
+        n = swarm.n if swarm is not None else 0
+        if n:
+            r = swarm.radius
+            color = self.engine.ball.color
+            for i, (x, y) in enumerate(zip(swarm.x[:n].round().tolist(), swarm.y[:n].round().tolist())):
+                if i < len(self.swarm_ids):
+                    canvas.coords(self.swarm_ids[i], x - r, y - r, x + r, y + r)
+                    if i >= self.swarm_shown:
+                        canvas.itemconfigure(self.swarm_ids[i], state='normal')
+                        self.calls += 1
+                else:
+                    self.swarm_ids.append(canvas.create_oval(x - r, y - r, x + r, y + r, fill=color, outline=color))
+                self.calls += 1
+        for item in self.swarm_ids[n:self.swarm_shown]:
+            canvas.itemconfigure(item, state='hidden')
+            self.calls += 1
+        self.swarm_shown = n
+
+    def hide_brick(self, index):
+        """cache le rectangle de la brique index"""
+        self.canvas.itemconfigure(self.brick_ids[index], state='hidden')
+        self.calls += 1
+
+    def show_brick(self, index):
+        """montre à nouveau le rectangle de la brique index (retour en arrière)"""
+        self.canvas.itemconfigure(self.brick_ids[index], state='normal')
+        self.calls += 1
+
+    def destroy(self):
+        """efface du canevas tout ce que le rendu a créé (changement de rendu)"""
+        self.canvas.delete(self.score_id, self.paddle_id, self.ball_id, *self.swarm_ids, *self.brick_ids)
+
+
+class FramebufferRenderer(CanvasRenderer):
+    """
+    Variante de CanvasRenderer pour les très grands champs de briques:
+    - les briques sont peintes dans un tableau de pixels (bytearray RGB) hors écran,
+      affiché par une seule image Tk (PhotoImage), au lieu d'un rectangle par brique
+    - une brique détruite ne repeint que son rectangle (dans le tableau et dans l'image)
+    - balle, raquette, score et vies restent des éléments du canevas
+    """
+    def __init__(self, canvas, engine):
+        self.photo = None
+        self.image_id = None
+        super().__init__(canvas, engine)
+
+    def sync_bricks(self):
+        """repeint tout le champ de briques et remplace l'image affichée"""
+        bricks = self.engine.bricks
+        bricks.destroyed.clear()
+        bricks.revived.clear()
+        self.brick_version = bricks.version
+        n = len(bricks)
+        if n == 0:
+            self.fb_x = self.fb_y = 0
+            self.fb_w = self.fb_h = 1
+        else:
+            #rectangle englobant les briques
+            xs, ys, ws, hs = bricks.xs, bricks.ys, bricks.ws, bricks.hs
+            self.fb_x = int(min(xs))
+            self.fb_y = int(min(ys))
+            self.fb_w = int(max(xs[i] + ws[i] for i in range(n))) - self.fb_x + 1
+            self.fb_h = int(max(ys[i] + hs[i] for i in range(n))) - self.fb_y + 1
+        self.pixels = bytearray(self.fb_w * self.fb_h * 3)  #fond noir, comme le canevas
+
+        colors = [self.rgb(color) for color in bricks.palette]
+        alive = bricks.alive
+        color_ids = bricks.color_ids
+        for index in range(n):
+            if alive[index]:
+                #bordure noire d'un pixel, comme outline='black'
+                x, y, w, h = self.brick_rect(index)
+                self.fill(x + 1, y + 1, w - 2, h - 2, colors[color_ids[index]])
+
+        header = b'P6 %d %d 255\n' % (self.fb_w, self.fb_h)
+        self.photo = tk.PhotoImage(width=self.fb_w, height=self.fb_h, data=header + bytes(self.pixels), format='PPM')
+        if self.image_id is None:
+            self.image_id = self.canvas.create_image(self.fb_x, self.fb_y, anchor='nw', image=self.photo)
+            #sous la balle et la raquette
+            self.canvas.tag_lower(self.image_id)
+            self.calls += 2
+        else:
+            self.canvas.coords(self.image_id, self.fb_x, self.fb_y)
+            self.canvas.itemconfigure(self.image_id, image=self.photo)
+            self.calls += 2
+
+    def brick_rect(self, index):
+        """rectangle (x, y, w, h) de la brique index, en pixels de l'image"""
+        bricks = self.engine.bricks
+        x = int(bricks.xs[index]) - self.fb_x
+        y = int(bricks.ys[index]) - self.fb_y
+        return x, y, int(bricks.ws[index]), int(bricks.hs[index])
+
+    def destroy(self):
+        super().destroy()
+        if self.image_id is not None:
+            self.canvas.delete(self.image_id)
+
+    def rgb(self, color):
+        """couleur Tk ('#rrggbb' ou nom) -> 3 octets RGB"""
+        if color.startswith('#') and len(color) == 7:
+            return bytes.fromhex(color[1:])
+        r, g, b = self.canvas.winfo_rgb(color)  #composantes sur 16 bits
+        return bytes((r >> 8, g >> 8, b >> 8))
+
+    def fill(self, x, y, w, h, rgb):
+        """remplit un rectangle du tableau de pixels (une copie de tranche par ligne)"""
+        if w <= 0 or h <= 0:
+            return
+        x2 = min(x + w, self.fb_w)
+        x = max(x, 0)
+        if x2 <= x:
+            return
+        line = rgb * (x2 - x)
+        stride = self.fb_w * 3
+        for row in range(max(y, 0), min(y + h, self.fb_h)):
+            start = row * stride + x * 3
+            self.pixels[start:start + len(line)] = line
+
+    def hide_brick(self, index):
+        """efface la brique dans le tableau et dans l'image (seul son rectangle est repeint)"""
+        x, y, w, h = self.brick_rect(index)
+        self.fill(x, y, w, h, b'\x00\x00\x00')
+        self.photo.put('#000000', to=(max(x, 0), max(y, 0), min(x + w, self.fb_w), min(y + h, self.fb_h)))
+        self.calls += 1
+
+    def show_brick(self, index):
+        """repeint la brique index (retour en arrière), bordure noire comprise"""
+        bricks = self.engine.bricks
+        color = bricks.palette[bricks.color_ids[index]]
+        x, y, w, h = self.brick_rect(index)
+        self.fill(x + 1, y + 1, w - 2, h - 2, self.rgb(color))
+        if w > 2 and h > 2:
+            self.photo.put(color, to=(max(x + 1, 0), max(y + 1, 0),
+                                      min(x + w - 1, self.fb_w), min(y + h - 1, self.fb_h)))
+        self.calls += 1
+
+
+class Game:
+    """
+    Classe principale du jeu:
+    - Création et gestion de l'interface Tkinter (fenêtre, canvas, boutons (=QUIT, START NEW...))
+    - Création de l'état du jeu (score, vie)
+    - Met à jour les élements du jeu : balle, raquette, brique, score et vies
+    - Gestion des déplacements de la raquette par le clavier
+    - Sauvegarde et restauration des parties (save.bin, ou ancien save.json) et gère l'historique des scores (scores.db)
+    - host (multijeu.SessionHost ou None): partie d'une fenêtre partagée; fenêtre, horloge, fil d'écriture
+      et historique sont alors ceux de l'hôte, les fichiers de la partie portent le numéro slot (save_2.bin...)
+    - keys: touches (gauche, droite, retour arrière) ou None; autopilot: fonction(engine) -> vitesse
+      de la raquette (voir lots.py) qui remplace le clavier (tableaux de démonstration)
+    """
+    def __init__(self, host=None, slot=None, keys=KEYS, autopilot=None):
+        self.host = host
+        self.slot = slot
+        self.autopilot = autopilot
+        self.save_file = slot_file(SAVE_FILE, slot)
+        self.legacy_save_file = slot_file(LEGACY_SAVE_FILE, slot)
+        self.replay_file = slot_file(REPLAY_FILE, slot)
+        self.telemetry_file = slot_file(TELEMETRY_FILE, slot)
+        if host is None:
+            #écritures de fichiers (sauvegardes, historique, rejeu) dans un fil à part: le jeu n'attend jamais le disque
+            self.writer = BackgroundWriter()
+            #historique des scores: la base n'est ouverte qu'à la première requête (rien n'est lu au démarrage)
+            self.scores = ScoreDB(SCORES_FILE)
+        else:
+            self.writer = host.writer
+            self.scores = host.scores
+        self.saver = AutoSaver(self.writer, self.save_file)
+
+        #instants du démarrage (perf_counter): fenêtre créée, première image, jeu prêt
+        self.startup = {"launch": LAUNCH_TIME}
+
+        if host is None:
+            self.window = tk.Tk()
+            self.window.title("Casse-Brique")
+            self.panel = self.window
+        else:
+            #un cadre de la fenêtre de l'hôte (placé par SessionHost.add)
+            self.window = host.root
+            self.panel = tk.Frame(host.root, bg='black')
+
+        self.canvas = tk.Canvas( self.panel, width=C_WIDTH, height=C_HEIGHT, bg='black')
+        self.canvas.pack()
+
+        #moteur, briques, rendu, retour en arrière, spectateurs: créés par prepare(), après la première image
+        self.engine = None
+        self.paddle = self.ball = self.bricks = None
+        self.renderer = None
+        self.rewind = None
+        self.publisher = None
+        self.life_icons = []
+        self.end_text = None
+        #chargement d'une sauvegarde en cours dans le fil d'écriture (fenêtre partagée),
+        #dans un moteur à part qui ne remplace celui de la partie qu'une fois prêt
+        self.loading = False
+        self.load_done = False
+        self.loaded_engine = None
+        self.load_id = None     #after() de check_loading en attente
+
+        #horloge à pas fixe: physique à TICK_RATE, dessin à RENDER_RATE au plus (celle de l'hôte s'il y en a un)
+        self.clock = FixedStepClock() if host is None else host.clock
+        self.after_id = None
+
+        #menu
+
+        self.menu_text = self.canvas.create_text(C_WIDTH//2, C_HEIGHT//2, text="Casse-Brique\nChoisissez une option pour jouer pour jouer",
+                                                 fill="white", font=('Arial', 24), justify='center')
+        
+        #boutons
+        self.start_btn = tk.Button(self.panel, text=" ▶ START NEW", command=self.start, bg = '#BBDDF2', fg = 'darkgreen', font=('Arial',12, 'bold'), relief='raised')
+        self.start_btn.pack(side='left')
+
+        self.quit_btn = tk.Button(self.panel, text=" ✖ QUIT", command=self.quitter, bg = '#BBDDF2', fg = 'darkred', font=('Arial',12, 'bold'), relief='raised')
+        self.quit_btn.pack(side='right')
+
+        self.continue_btn = tk.Button(self.panel, text="LAST GAME", command=self.continue_game, bg = '#BBDDF2', fg = "#391369", font=('Arial',12, 'bold'), relief='raised')
+        self.continue_btn.pack(side='left', padx=20, pady=10)
+
+        self.pause_btn = tk.Button(self.panel, text="⏸️ PAUSE", command=self.press_pause, bg='grey', fg='white', font=('Arial', 12, 'bold'), relief='raised')
+        self.pause_btn.pack(side='left')
+
+        self.memory_btn = tk.Button(self.panel, text="RECENT SCORES", command=self.show_last_scores, bg='#BBDDF2', fg="#8C0544", font=('Arial', 12, 'bold'), relief='raised')
+
+        self.running = False
+        self.paused = False
+
+        #commandes: les touches vont dans une file, lue au début de chaque tick
+        self.inputs = InputQueue()
+        if keys is not None:
+            #add='+': dans une fenêtre partagée, chaque partie ajoute ses touches à celles des autres
+            left, right, rewind = keys
+            self.window.bind(f"<KeyPress-{left}>", self.on_left_press, add='+')
+            self.window.bind(f"<KeyPress-{right}>", self.on_right_press, add='+')
+            self.window.bind(f"<KeyRelease-{left}>", self.on_left_release, add='+')
+            self.window.bind(f"<KeyRelease-{right}>", self.on_right_release, add='+')
+            self.window.bind(f"<KeyPress-{rewind}>", self.on_rewind, add='+')
+        self.window.bind("<F3>", self.toggle_overlay, add='+')
+
+        self.killcam_end = None     #tick de l'historique où finit la kill-cam en cours
+        self.killcam_text = None
+
+        #mesures de temps (désactivées par défaut: un seul test par tick et par image)
+        self.profiler = None
+        self.overlay_text = None
+        self.overlay_refresh = 0.0
+
+        #le menu est prêt: on laisse Tk l'afficher avant de construire le reste
+        #(un after_idle peut passer avant que le canevas soit à l'écran: on attend son premier Expose)
+        self.startup["window"] = time.perf_counter()
+        self.canvas.bind("<Expose>", self.first_frame)
+
+    def first_frame(self, event):
+        """(premier Expose du canevas) dessin du menu terminé, mesure du démarrage, puis prepare() juste après"""
+        self.canvas.unbind("<Expose>")
+        if "first_frame" in self.startup:
+            return
+        #le canevas se redessine au prochain moment libre de Tk: on le force avant de mesurer
+        self.window.update_idletasks()
+        self.startup["first_frame"] = time.perf_counter()
+        #after plutôt qu'after_idle: les évènements d'affichage en attente passent d'abord
+        self.window.after(1, self.prepare)
+
+    def prepare(self):
+        """
+        construit ce dont le menu n'a pas besoin (une seule fois, au plus tard au lancement d'une partie):
+        - moteur et briques du premier niveau, rendu (un élément du canevas par brique, ou l'image)
+        - import de l'ancien historique.json et niveaux suivants, par le fil d'écriture
+        - retour en arrière, spectateurs, mesures de temps
+        """
+        if self.engine is not None:
+            return
+        #état du jeu (score, vies, raquette, balle, briques) géré par le moteur
+        self.engine = Engine(seed=random.randrange(2**32), levels=LEVELS)
+        self.paddle = self.engine.paddle
+        self.ball = self.engine.ball
+        self.bricks = self.engine.bricks
+        #niveaux suivants compilés/chargés d'avance: le changement de niveau ne lit plus de fichier
+        self.writer.submit(self.engine.prepare_levels)
+        if self.host is None:
+            self.writer.submit(self.scores.import_legacy, LEGACY_SCORES_FILE)
+
+        #dessin du score, de la raquette, de la balle et des briques (sous le texte du menu)
+        self.renderer = self.make_renderer()
+        self.canvas.tag_raise(self.menu_text)
+
+        #dernières secondes de jeu (une image par tick), pour le retour en arrière et la kill-cam
+        self.rewind = RewindBuffer(self.engine)
+
+        if SPECTATE and self.host is None:
+            #spectateurs: une image (delta) envoyée à chaque dessin, sans jamais attendre le réseau
+            from spectateur import StatePublisher
+            self.publisher = StatePublisher(SPECTATE_ADDRESS)
+        if TELEMETRY:
+            self.enable_telemetry()
+
+        self.startup["ready"] = time.perf_counter()
+        if self.host is None:
+            print(self.startup_text())
+
+    def startup_text(self):
+        """durées du démarrage, comptées depuis le chargement du module"""
+        launch = self.startup["launch"]
+        steps = (("fenêtre", "window"), ("première image", "first_frame"), ("jeu prêt", "ready"))
+        return "Démarrage : " + ", ".join(f"{label} {(self.startup[key] - launch) * 1000:.0f} ms"
+                                          for label, key in steps if key in self.startup)
+
+    def make_renderer(self):
+        """choisit le rendu des briques selon BRICKS_BACKEND (et le nombre de briques en mode 'auto')"""
+        return renderer_class(len(self.engine.bricks))(self.canvas, self.engine)
+
+    def draw(self):
+        """
+        dessine le moteur sur le canevas; briques changées en bloc (niveau, chargement, nouvelle partie):
+        en mode 'auto', le rendu est d'abord remplacé si le nouveau nombre de briques l'impose
+        """
+        if self.engine.bricks.version != self.renderer.brick_version:
+            backend = renderer_class(len(self.engine.bricks))
+            if type(self.renderer) is not backend:
+                self.renderer.destroy()
+                self.renderer = backend(self.canvas, self.engine)
+                self.canvas.tag_raise(self.menu_text)
+                if self.overlay_text is not None:
+                    self.canvas.tag_raise(self.overlay_text)
+        self.renderer.draw()
+
+    def enable_telemetry(self):
+        """active les mesures de temps de chaque phase de la boucle de jeu"""
+        self.profiler = Profiler(frame_budget=1.0 / RENDER_RATE)
+        self.engine.profiler = self.profiler
+        #latence des touches: même histogramme que la file des commandes
+        self.profiler.phases['input.latency'] = self.inputs.latency
+        if TELEMETRY_OVERLAY:
+            self.overlay_text = self.canvas.create_text(10, C_HEIGHT - 10, anchor='sw', fill='#7fff7f',
+                                                        font=('Courier', 10), text="")
+
+    def toggle_overlay(self, event):
+        """affiche/cache les mesures sur le canevas (si les mesures sont actives)"""
+        if self.profiler is None:
+            return
+        if self.overlay_text is None:
+            self.overlay_text = self.canvas.create_text(10, C_HEIGHT - 10, anchor='sw', fill='#7fff7f',
+                                                        font=('Courier', 10), text="")
+        else:
+            self.canvas.delete(self.overlay_text)
+            self.overlay_text = None
+
+    #vies avec coeurs
+    def update_lives_display(self):
+        heart = self.life_icons.pop()   
+        self.canvas.delete(heart)
+        if self.host is None:
+            #(fenêtre partagée: le canevas est redessiné avec les autres au retour dans la boucle Tk)
+            self.canvas.update_idletasks()  
+
+    def add_life_icon(self):
+        i = len(self.life_icons)
+        heart = self.canvas.create_text(C_WIDTH - 20 - i*20, 10, anchor='ne', fill='#fd3f92', font=('Arial', 16), text='❤')
+        self.life_icons.append(heart)   #implémentation d'une pile
+
+    def sync_lives_display(self):
+        """autant de coeurs que de vies (des vies peuvent revenir avec le retour en arrière)"""
+        while len(self.life_icons) > self.engine.lives:
+            self.update_lives_display()
+        while len(self.life_icons) < self.engine.lives:
+            self.add_life_icon()
+
+    #touches (mises en file, lues par update() au début de chaque tick)
+    def on_left_press(self, event):
+        self.inputs.press(LEFT)
+    def on_right_press(self, event):
+        self.inputs.press(RIGHT)
+    def on_left_release(self, event):
+        self.inputs.release(LEFT)
+    def on_right_release(self, event):
+        self.inputs.release(RIGHT)
+
+    def start(self):
+        """initialisation et lancement du jeu"""
+        if self.loading:
+            return
+        self.prepare()
+        self.running = True
+        self.canvas.delete(self.menu_text)
+        self.start_btn.pack_forget()
+        self.continue_btn.pack_forget()
+        #initialise le nombre de vies
+        self.sync_lives_display()
+
+        if RECORD_REPLAY and self.autopilot is None:
+            #l'enregistrement part de l'état actuel (nouvelle partie ou partie reprise)
+            self.engine.recorder = InputRecorder(self.engine)
+        self.inputs.clear()
+        self.rewind.clear()
+        self.rewind.record()
+        self.run_loop()
+
+    def run_loop(self):
+        """(re)lance la boucle de jeu: la sienne, ou celle de l'hôte qui fait avancer toutes ses parties"""
+        if self.host is not None:
+            self.host.wake()
+            return
+        #un update() encore programmé d'avant la pause ferait tourner une seconde boucle
+        if self.after_id is not None:
+            self.window.after_cancel(self.after_id)
+            self.after_id = None
+        #le temps passé hors de la boucle (menu, pause) ne doit pas être rattrapé
+        self.clock.start()
+        self.update()
+
+    def new_game(self):
+        """Commence une nouvelle partie en supprimant la sauvegarde existante."""
+        if self.loading:
+            return
+        self.prepare()
+        self.saver.delete()
+        self.delete_legacy_save()
+        self.engine.serve()
+        self.start()
+
+    def continue_game(self):
+        """Continue la partie sauvegardée (si elle existe)."""
+        if self.loading:
+            return
+        if self.saver.exists() or os.path.exists(self.legacy_save_file):
+            print("Partie reprise.")
+            if self.host is None:
+                self.load_state()
+                self.start()
+            else:
+                #fenêtre partagée: lecture dans le fil d'écriture, les autres parties continuent pendant ce temps
+                #(les boutons de la partie sont ignorés jusqu'à la fin du chargement)
+                self.prepare()
+                self.loading = True
+                self.load_done = False
+                self.loaded_engine = None
+                self.writer.submit(self.load_in_background)
+                self.load_id = self.window.after(LOAD_POLL_MS, self.check_loading)
+        else:
+            print("Pas de sauvegarde à charger.")
+            self.new_game()
+
+    def press_pause(self):
+        """run/stop du jeu et change le nom du bouton en fonction"""
+        if self.loading:
+            return
+        if self.running:
+            self.paused, self.running = not self.paused, not self.running
+            self.pause_btn.config(text="RESUME")
+        else:
+            self.prepare()
+            self.paused, self.running = not self.paused, not self.running
+            self.pause_btn.config(text="PAUSE")
+            self.run_loop()
+
+    def end_game(self):
+        """
+        - arrête le jeu en cas de victoire/défaite
+        - met à jour l'historique des scores
+        - efface la dernière sauvegarde car partie achevée
+        """
+        self.running = False
+
+        self.memory_btn.pack(side='left')
+        self.pause_btn.pack_forget()
+
+        # ajout de la partie à l'historique, par le fil d'écriture (pas celles du pilote automatique)
+        if self.autopilot is None:
+            self.writer.submit(self.scores.add, self.engine.score, self.engine.status == WON, self.engine.ticks)
+
+        self.saver.delete()
+        self.delete_legacy_save()
+
+        self.save_replay()
+        if self.profiler is not None:
+            self.writer.submit(self.profiler.export_json, self.telemetry_file + ".json")
+            self.writer.submit(self.profiler.export_csv, self.telemetry_file + ".csv")
+
+    def restart(self):
+        """(tableau de démonstration) nouvelle partie après une fin de partie: nouveau moteur, nouvelle graine"""
+        if self.running or self.loading or self.engine is None:
+            return
+        #(la graine tire la direction de chaque service: les tableaux ne rejouent pas tous la même partie)
+        self.use_engine(Engine(seed=random.randrange(2**32), levels=LEVELS))
+        self.writer.submit(self.engine.prepare_levels)
+        if self.end_text is not None:
+            self.canvas.delete(self.end_text)
+            self.end_text = None
+        self.memory_btn.pack_forget()
+        self.pause_btn.pack(side='left')
+        self.draw()
+        self.start()
+
+    def show_last_scores(self):
+        """Ouvre une petite fenêtre affichant l'historique des scores."""
+        self.memory_btn.pack_forget()
+        # nouvelle petite fenêtre
+        small_window = tk.Toplevel(self.window)
+        small_window.title("Historique des scores")
+        # taille et position relative à la fenêtre principale
+        x = self.window.winfo_x() + 50
+        y = self.window.winfo_y() + 50
+        small_window.geometry(f"340x420+{x}+{y}")
+
+        # zone de texte non éditable pour afficher l'historique
+        text = tk.Text(small_window, wrap='word', height=22, width=40)
+        text.pack(fill='both', expand=True, padx=10, pady=(10, 5))
+
+        # afficher l'historique (requêtes sur les index de la base)
+        if self.scores.count():
+            lines = ["5 dernières parties :"]
+            #une ligne pour chaque score (du plus récent au plus ancien)
+            lines += [f"  {score}" for _, score, _ in self.scores.recent(5)]
+            lines.append("\nMeilleurs scores :")
+            lines += [f"  {rank}. {score}  ({player}, {time.strftime('%d/%m/%Y', time.localtime(played_at))})"
+                      for rank, (player, score, played_at) in enumerate(self.scores.top(5), 1)]
+            lines.append(f"\nRecord personnel ({self.scores.player}) : {self.scores.best()}")
+            lines.append(f"Médiane : {self.scores.percentile(50)}  -  90e centile : {self.scores.percentile(90)}")
+            lines.append("\nParties par jour :")
+            lines += [f"  {day} : {games} partie(s), meilleur {best}, moyenne {mean:.1f}"
+                      for day, games, best, mean in self.scores.by_day(7)]
+            text.insert('end', "\n".join(lines))
+        else:
+            text.insert('end', "Aucun score enregistré.")
+    
+        # rendre la zone non-editable
+        text.config(state='disabled')
+
+        # met un focus sur la fenêtre (sans bloquer la principale)
+        small_window.transient(self.window)
+        small_window.focus_force()
+
+
+    def update(self):
+        """
+        - joue les ticks de physique dus depuis le dernier appel (pas fixe)
+        - dessine si un dessin est dû (les dessins sont sautés en cas de retard, pas la physique)
+        - se reprogramme jusqu'au prochain tick ou dessin
+        """
+        if not self.running:
+            return
+        skipped = self.clock.skipped_renders
+        ticks = self.clock.advance()
+        self.step(ticks, self.clock.render_due(), self.clock.skipped_renders - skipped)
+        if self.running:
+            self.schedule()
+
+    def step(self, ticks, render, skipped=0):
+        """
+        une image de la partie (appelée par update(), ou par l'hôte pour toutes ses parties):
+        - ticks ticks de physique (ou de kill-cam), autosauvegarde si elle est due
+        - dessin si render (ou en fin de partie); skipped: dessins sautés depuis l'image précédente
+        """
+        if self.killcam_end is not None:
+            self.play_killcam(ticks, render)
+            return
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin_frame()
+
+        lives = self.engine.lives
+        for _ in range(ticks):
+            #état des touches figé pour tout le tick
+            if self.autopilot is None:
+                self.engine.set_paddle_speed(self.inputs.sample() * self.paddle.max_speed)
+            else:
+                self.engine.set_paddle_speed(self.autopilot(self.engine))
+            self.engine.step()
+            self.rewind.record()
+            if self.engine.status != RUNNING:
+                break
+            if KILLCAM and self.engine.lives < lives:
+                self.start_killcam()
+                break
+        if self.engine.status == RUNNING and self.killcam_end is None and self.saver.due():
+            #copie de l'état ici, écriture (incrémentale) dans le fil d'écriture
+            self.saver.autosave(self.engine)
+
+        if render or self.engine.status != RUNNING:
+            if profiler is None:
+                self.draw()
+            else:
+                t0 = profiler.clock()
+                self.draw()
+                profiler.add('render', profiler.clock() - t0)
+            if self.publisher is not None:
+                self.publisher.publish(self.engine)
+
+        if profiler is not None:
+            t0 = profiler.clock()
+        #si balle tombée
+        self.sync_lives_display()
+        if profiler is not None:
+            if self.overlay_text is not None and t0 >= self.overlay_refresh:
+                #2 fois par seconde suffit pour être lisible
+                self.overlay_refresh = t0 + 0.5
+                self.canvas.itemconfigure(self.overlay_text, text=profiler.overlay_text())
+            profiler.add('hud', profiler.clock() - t0)
+            profiler.end_frame(skipped)
+
+        if self.engine.status == LOST:
+            self.end_game()
+            self.end_text = self.canvas.create_text(C_WIDTH//2, C_HEIGHT//2, text="GAME OVER", fill="red",
+                                                    font=('Arial', 36))
+
+        #victoire
+        elif self.engine.status == WON:
+            self.end_game()
+            self.end_text = self.canvas.create_text(C_WIDTH//2, C_HEIGHT//2, text="VICTOIRE!", fill="green",
+                                                    font=('Arial', 36))
+
+    def schedule(self):
+        """reprogramme update() jusqu'au prochain tick ou dessin"""
+        if self.after_id is not None:
+            self.window.after_cancel(self.after_id)
+        self.after_id = self.window.after(self.clock.delay_ms() #délai en milisecondes
+                                          , self.on_timer)
+
+    def on_timer(self):
+        """update() appelé par Tk: le rappel programmé est consommé"""
+        self.after_id = None
+        self.update()
+
+    def start_killcam(self):
+        """vie perdue: on revient KILLCAM_SECONDS en arrière pour rejouer la fin de la vie"""
+        end = self.rewind.position
+        start = max(self.rewind.oldest(), end - int(KILLCAM_SECONDS * self.engine.params["tick_rate"]))
+        if start >= end:
+            return
+        self.killcam_end = end
+        self.rewind.seek(start)
+        self.killcam_text = self.canvas.create_text(C_WIDTH//2, 40, text="KILL-CAM", fill='orange',
+                                                    font=('Arial', 20))
+
+    def play_killcam(self, ticks, render):
+        """
+        - kill-cam: avance de ticks ticks dans l'historique (aucun tick n'est rejoué par le moteur)
+        - arrivée au présent, la partie reprend là où elle en était
+        """
+        k = min(self.rewind.position + ticks, self.killcam_end)
+        self.rewind.seek(k)
+        if k == self.killcam_end:
+            self.canvas.delete(self.killcam_text)
+            self.killcam_text = None
+            self.killcam_end = None
+            #touches pressées pendant la kill-cam oubliées
+            self.inputs.clear()
+        if render or self.killcam_end is None:
+            self.draw()
+            if self.publisher is not None:
+                self.publisher.publish(self.engine)
+        self.sync_lives_display()
+
+    def on_rewind(self, event):
+        """annule les REWIND_SECONDS dernières secondes de jeu (la suite est oubliée)"""
+        if not (self.running or self.paused) or self.killcam_end is not None:
+            return
+        if self.rewind.rewind(int(REWIND_SECONDS * self.engine.params["tick_rate"])):
+            if RECORD_REPLAY and self.autopilot is None:
+                #l'enregistrement repart de l'état restauré
+                self.engine.recorder = InputRecorder(self.engine)
+            self.inputs.clear()
+            self.draw()
+            self.sync_lives_display()
+
+    def quitter(self):
+        """
+        - sauvegarde automatique du jeu si la partie n'est pas finie
+        - fermeture de la fenêtre (fenêtre partagée: du cadre de la partie; l'hôte ferme le reste)
+        """
+        if (self.running or self.paused==True) and self.autopilot is None:
+            self.save_state()
+            self.save_replay()
+        self.running = self.paused = False
+        if self.load_id is not None:
+            #chargement en cours (fenêtre partagée): le moteur chargé ne sera jamais installé
+            self.window.after_cancel(self.load_id)
+            self.load_id = None
+        if self.publisher is not None:
+            self.publisher.close()
+        if self.host is not None:
+            self.profiler = None    #(F3 reste lié à la fenêtre de l'hôte)
+            self.panel.destroy()
+            self.host.remove(self)
+            return
+        #on attend la fin des écritures en cours avant de fermer
+        self.writer.submit(self.scores.close)
+        self.writer.close()
+        self.scores.close()
+        self.window.destroy()
+
+    def save_replay(self):
+        """
+        écrit l'enregistrement des commandes de la partie (si actif), par le fil d'écriture:
+        la copie est prise ici, le moteur peut continuer (ou être remplacé) pendant l'écriture
+        """
+        if self.engine.recorder is not None:
+            self.writer.submit(self.engine.recorder.snapshot().save, self.replay_file)
+
+    def delete_legacy_save(self):
+        """efface l'ancien save.json (remplacé par save.bin), par le fil d'écriture"""
+        if os.path.exists(self.legacy_save_file):
+            self.writer.submit(os.remove, self.legacy_save_file)
+
+    def save_state(self):
+        """Sauvegarde complète de l'état actuel du jeu (save.bin), par le fil d'écriture."""
+        if self.killcam_end is not None:
+            #pendant la kill-cam le moteur montre le passé: on sauve le présent
+            self.rewind.seek(self.killcam_end)
+        self.saver.save(self.engine)
+        print("Sauvegarde effectuée.")
+
+    def load_state(self):
+        """
+        Charge une sauvegarde si elle existe (base save.bin + journal des sauvegardes automatiques),
+        sinon l'ancien save.json
+        """
+        self.prepare()
+        load_autosave(self.engine, self.save_file if self.saver.exists() else self.legacy_save_file)
+        self.draw()
+
+        print("Sauvegarde chargée avec succès.")
+
+    def load_in_background(self):
+        """
+        (fil d'écriture, fenêtre partagée) charge la sauvegarde dans un nouveau moteur, sans toucher
+        à celui de la partie; check_loading() l'installe ensuite dans le fil Tk
+        """
+        try:
+            engine = Engine(seed=random.randrange(2**32), levels=LEVELS)
+            load_autosave(engine, self.save_file if self.saver.exists() else self.legacy_save_file)
+            engine.prepare_levels()
+            self.loaded_engine = engine
+        finally:
+            #loading reste vrai jusqu'à l'installation du moteur (check_loading, fil Tk)
+            self.load_done = True
+
+    def check_loading(self):
+        """(fil Tk) attend la fin de load_in_background() sans bloquer les autres parties"""
+        if not self.load_done:
+            self.load_id = self.window.after(LOAD_POLL_MS, self.check_loading)
+            return
+        self.load_id = None
+        self.loading = False
+        if self.loaded_engine is None:
+            #(erreur déjà affichée par le fil d'écriture) on reste au menu
+            return
+        self.use_engine(self.loaded_engine)
+        self.loaded_engine = None
+        self.draw()
+        print("Sauvegarde chargée avec succès.")
+        self.start()
+
+    def use_engine(self, engine):
+        """(fil Tk) remplace le moteur de la partie: rendu (tout est redessiné), retour en arrière, mesures"""
+        self.engine = engine
+        self.paddle = engine.paddle
+        self.ball = engine.ball
+        self.bricks = engine.bricks
+        engine.profiler = self.profiler
+        self.renderer.engine = engine
+        self.renderer.brick_version = None
+        self.rewind = RewindBuffer(engine)
+
+    def run(self):
+        self.window.mainloop()
+
+
+
+#lancer le jeu
+if __name__ == "__main__":
+    game = Game()
     game.run()
\ No newline at end of file
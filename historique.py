@@ -0,0 +1,155 @@
+"""
+Historique des scores du Casse-Brique (sans Tkinter)
+
+Fonctionnalités :
+- toutes les parties sont gardées dans une base SQLite locale (scores.db), en mode WAL :
+  les lectures ne bloquent pas les écritures
+- index sur le score, sur (joueur, score) et sur la date : les requêtes ne parcourent pas toute la table
+    - top(n) : classement des meilleurs scores
+    - best(joueur) : record personnel
+    - percentile(p) : score sous lequel se trouvent p % des parties
+    - recent(n) : dernières parties, by_day() : nombre de parties, meilleur score et moyenne par jour
+- add() est prévu pour le fil d'écriture (BackgroundWriter) : une partie terminée n'attend pas le disque
+- la base n'est ouverte qu'à la première requête : le démarrage ne dépend pas du nombre de parties
+- import_legacy : reprend une fois pour toutes l'ancien historique.json (liste des 5 derniers scores)
+
+Coding: UTF-8
+"""
+
+import getpass
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    won INTEGER NOT NULL DEFAULT 0,
+    ticks INTEGER NOT NULL DEFAULT 0,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_score ON games (score DESC);
+CREATE INDEX IF NOT EXISTS games_player_score ON games (player, score DESC);
+CREATE INDEX IF NOT EXISTS games_played_at ON games (played_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def default_player():
+    """nom du joueur par défaut: l'utilisateur du système"""
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "joueur"
+
+
+class ScoreDB:
+    """
+    Base des scores:
+    - une connexion SQLite par fil (fil Tk pour les lectures, fil d'écriture pour add),
+      ouverte à la première utilisation
+    - close() ferme la connexion du fil appelant
+    """
+    def __init__(self, path="scores.db", player=None):
+        self.path = path
+        self.player = player or default_player()
+        self.local = threading.local()
+
+    def connection(self):
+        """connexion du fil courant (créée et initialisée au premier appel)"""
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            self.local.db = db
+        return db
+
+    def close(self):
+        db = getattr(self.local, "db", None)
+        if db is not None:
+            db.close()
+            self.local.db = None
+
+    def add(self, score, won=False, ticks=0, player=None, played_at=None):
+        """enregistre une partie terminée"""
+        db = self.connection()
+        with db:
+            db.execute("INSERT INTO games (player, score, won, ticks, played_at) VALUES (?, ?, ?, ?, ?)",
+                       (player or self.player, int(score), int(won), int(ticks),
+                        time.time() if played_at is None else played_at))
+
+    def import_legacy(self, path="historique.json"):
+        """
+        - ajoute les scores de l'ancien historique.json (du plus ancien au plus récent),
+          datés de la dernière modification du fichier
+        - n'est fait qu'une fois (noté dans la table meta); retourne le nombre de scores importés
+        """
+        if not os.path.exists(path):
+            return 0
+        db = self.connection()
+        if db.execute("SELECT 1 FROM meta WHERE key = 'legacy_import'").fetchone():
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            scores = [int(score) for score in json.load(f)]
+        played_at = os.path.getmtime(path)
+        with db:
+            db.executemany("INSERT INTO games (player, score, played_at) VALUES (?, ?, ?)",
+                           [(self.player, score, played_at) for score in scores])
+            db.execute("INSERT INTO meta (key, value) VALUES ('legacy_import', ?)", (path,))
+        return len(scores)
+
+    def count(self, player=None):
+        """nombre de parties (de tous les joueurs, ou d'un seul)"""
+        if player is None:
+            return self.connection().execute("SELECT COUNT(*) FROM games").fetchone()[0]
+        return self.connection().execute("SELECT COUNT(*) FROM games WHERE player = ?", (player,)).fetchone()[0]
+
+    def top(self, n=10):
+        """n meilleurs scores: liste de (joueur, score, date)"""
+        return self.connection().execute(
+            "SELECT player, score, played_at FROM games ORDER BY score DESC LIMIT ?", (n,)).fetchall()
+
+    def best(self, player=None):
+        """record personnel du joueur (None s'il n'a pas encore joué)"""
+        row = self.connection().execute(
+            "SELECT score FROM games WHERE player = ? ORDER BY score DESC LIMIT 1",
+            (player or self.player,)).fetchone()
+        return row[0] if row else None
+
+    def recent(self, n=5):
+        """n dernières parties, de la plus récente à la plus ancienne: liste de (joueur, score, date)"""
+        return self.connection().execute(
+            "SELECT player, score, played_at FROM games ORDER BY played_at DESC, id DESC LIMIT ?", (n,)).fetchall()
+
+    def percentile(self, p):
+        """score sous lequel (ou égal auquel) se trouvent p % des parties (None si aucune partie)"""
+        db = self.connection()
+        total = db.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+        if total == 0:
+            return None
+        rank = min(total - 1, max(0, -(-total * p // 100) - 1))
+        #parcours de l'index sur le score
+        return db.execute("SELECT score FROM games ORDER BY score LIMIT 1 OFFSET ?", (rank,)).fetchone()[0]
+
+    def between(self, start, end):
+        """parties jouées entre deux dates (secondes depuis l'epoch): liste de (joueur, score, date)"""
+        return self.connection().execute(
+            "SELECT player, score, played_at FROM games WHERE played_at >= ? AND played_at < ? ORDER BY played_at",
+            (start, end)).fetchall()
+
+    def by_day(self, days=7):
+        """
+        parties des days derniers jours (aujourd'hui compris, date locale), du plus récent au plus ancien:
+        liste de (jour 'AAAA-MM-JJ', nombre de parties, meilleur score, score moyen)
+        """
+        today = time.localtime()
+        start = time.mktime((today.tm_year, today.tm_mon, today.tm_mday - (days - 1), 0, 0, 0, 0, 0, -1))
+        return self.connection().execute(
+            "SELECT date(played_at, 'unixepoch', 'localtime') AS day, COUNT(*), MAX(score), AVG(score) "
+            "FROM games WHERE played_at >= ? GROUP BY day ORDER BY day DESC", (start,)).fetchall()
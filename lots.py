@@ -0,0 +1,239 @@
+"""
+Parties en lot du Casse-Brique (sans Tkinter)
+
+Fonctionnalités :
+- joue des milliers de parties sans fenêtre avec une raquette pilotée par une stratégie (policy)
+- grille de paramètres : vitesse de la balle, largeur de la raquette, rayon, tableau (grille ou niveaux)
+- parties réparties sur les cœurs du processeur (ProcessPoolExecutor), par paquets de parties
+- graine de chaque partie tirée de (graine du lot, combinaison, numéro de partie) :
+  résultats identiques quel que soit le nombre de processus et l'ordre d'exécution
+- résultats agrégés (taux de victoire, ticks pour vider le tableau, vies perdues, score)
+  écrits au fur et à mesure dans un fichier JSON Lines : une ligne par paquet terminé, puis une ligne finale
+  par combinaison ("final": true)
+
+Utilisation :
+    python lots.py --games 1000 --ball-speed 4 5 6 --paddle-width 80 120 --layout grille niveaux
+    python lots.py --policy anticipation --workers 4 --output lots.jsonl
+    python lots.py --policy mon_module:ma_strategie     # fonction(engine) -> vitesse de la raquette
+
+Coding: UTF-8
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from moteur import Engine, RUNNING, WON, C_WIDTH, INIT_BALL_SPEED, P_WIDTH, RADIUS
+from niveau import level_files
+
+MAX_TICKS = 200000      #une partie plus longue est arrêtée (comptée dans timeouts)
+CHUNK = 20              #parties par tâche envoyée à un processus
+
+
+def follow(engine):
+    """stratégie 'suiveur': la raquette suit la balle (zone morte de 20 pixels)"""
+    dx = engine.ball.x - engine.paddle.x
+    speed = engine.paddle.max_speed
+    return speed if dx > 20 else -speed if dx < -20 else 0
+
+
+def anticipate(engine):
+    """
+    stratégie 'anticipation': quand la balle descend, la raquette va là où elle arrivera
+    (rebonds sur les murs compris), sinon elle revient vers la balle
+    """
+    ball, paddle = engine.ball, engine.paddle
+    target = ball.x
+    if ball.vy > 0:
+        ticks = (paddle.y - paddle.height / 2 - ball.radius - ball.y) / ball.vy
+        if ticks > 0:
+            #déplacement replié dans [r, C_WIDTH - r] (rebonds sur les murs)
+            span = C_WIDTH - 2 * ball.radius
+            x = (ball.x - ball.radius + ball.vx * ticks) % (2 * span)
+            target = ball.radius + (x if x <= span else 2 * span - x)
+    dx = target - paddle.x
+    speed = paddle.max_speed
+    if abs(dx) <= speed:
+        return 0
+    return speed if dx > 0 else -speed
+
+
+def idle(engine):
+    """stratégie 'immobile': la raquette ne bouge pas"""
+    return 0
+
+
+POLICIES = {"suiveur": follow, "anticipation": anticipate, "immobile": idle}
+
+
+def resolve_policy(name):
+    """nom d'une stratégie de POLICIES, ou 'module:fonction' (fonction(engine) -> vitesse)"""
+    if name in POLICIES:
+        return POLICIES[name]
+    if ":" in name:
+        module, function = name.split(":", 1)
+        return getattr(importlib.import_module(module), function)
+    raise ValueError(f"stratégie inconnue: {name!r} (connues: {', '.join(POLICIES)} ou module:fonction)")
+
+
+def layout_params(layout):
+    """
+    paramètres du moteur pour un tableau:
+    - 'grille' (grille d'origine) ou 'grille:LxC' (L rangées, C colonnes)
+    - 'niveaux' (tous les niveaux livrés, dans l'ordre) ou un fichier de niveau
+    """
+    if layout == "grille":
+        return {}
+    if layout.startswith("grille:"):
+        rows, cols = (int(value) for value in layout[len("grille:"):].split("x"))
+        return {"rows": rows, "cols": cols, "brick_height": max(1, min(22, 400 // rows))}
+    if layout == "niveaux":
+        return {"levels": level_files()}
+    if os.path.exists(layout):
+        return {"levels": [layout]}
+    raise ValueError(f"tableau inconnu: {layout!r} (grille, grille:LxC, niveaux ou fichier de niveau)")
+
+
+def game_seed(seed, combo, game):
+    """graine d'une partie (ne dépend ni du processus ni de l'ordre d'exécution)"""
+    return random.Random(f"{seed}-{combo}-{game}").getrandbits(32)
+
+
+def new_stats():
+    return {"games": 0, "wins": 0, "timeouts": 0, "ticks": 0, "clear_ticks": 0,
+            "lives_lost": 0, "score": 0, "cpu_s": 0.0}
+
+
+def merge_stats(total, part):
+    for key, value in part.items():
+        total[key] += value
+
+
+def summary(stats):
+    """moyennes d'un agrégat"""
+    games = stats["games"] or 1
+    return {
+        "games": stats["games"],
+        "win_rate": stats["wins"] / games,
+        "mean_ticks_to_clear": stats["clear_ticks"] / stats["wins"] if stats["wins"] else None,
+        "mean_lives_lost": stats["lives_lost"] / games,
+        "mean_score": stats["score"] / games,
+        "timeouts": stats["timeouts"],
+        "ticks": stats["ticks"],
+        "cpu_s": stats["cpu_s"],
+    }
+
+
+def run_chunk(task):
+    """
+    (processus de calcul) joue count parties d'une combinaison et retourne (combo, agrégat)
+    task = (combo, paramètres du moteur, stratégie, graine du lot, première partie, count, max_ticks)
+    """
+    combo, params, policy_name, seed, first, count, max_ticks = task
+    policy = resolve_policy(policy_name)
+    stats = new_stats()
+    start = time.process_time()
+    for game in range(first, first + count):
+        engine = Engine(seed=game_seed(seed, combo, game), **params)
+        lives = engine.lives
+        while engine.status == RUNNING and engine.ticks < max_ticks:
+            engine.set_paddle_speed(policy(engine))
+            engine.step()
+        stats["games"] += 1
+        stats["ticks"] += engine.ticks
+        stats["score"] += engine.score
+        stats["lives_lost"] += lives - engine.lives
+        if engine.status == WON:
+            stats["wins"] += 1
+            stats["clear_ticks"] += engine.ticks
+        elif engine.status == RUNNING:
+            stats["timeouts"] += 1
+    stats["cpu_s"] = time.process_time() - start
+    return combo, stats
+
+
+def parameter_grid(ball_speeds, paddle_widths, radii, layouts):
+    """liste des combinaisons: (description, paramètres du moteur)"""
+    grid = []
+    for ball_speed, paddle_width, radius, layout in itertools.product(ball_speeds, paddle_widths, radii, layouts):
+        params = {"ball_speed": ball_speed, "paddle_width": paddle_width, "radius": radius}
+        params.update(layout_params(layout))
+        grid.append(({"ball_speed": ball_speed, "paddle_width": paddle_width, "radius": radius,
+                      "layout": layout}, params))
+    return grid
+
+
+def run_batch(grid, games, policy, output, workers=None, seed=0, chunk=CHUNK, max_ticks=MAX_TICKS):
+    """
+    - joue games parties par combinaison de grid, réparties sur workers processus (par défaut: tous les cœurs)
+    - écrit dans output une ligne JSON par paquet terminé (agrégat de la combinaison jusque-là),
+      puis une ligne "final" par combinaison
+    - retourne la liste des résumés finaux
+    """
+    resolve_policy(policy)  #erreur tout de suite plutôt que dans chaque processus
+    tasks = [(combo, params, policy, seed, first, min(chunk, games - first), max_ticks)
+             for combo, (_, params) in enumerate(grid) for first in range(0, games, chunk)]
+    totals = [new_stats() for _ in grid]
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+
+    with open(output, "w", encoding="utf-8") as f:
+        def record(combo, part):
+            merge_stats(totals[combo], part)
+            done = totals[combo]["games"]
+            line = {"combo": combo, **grid[combo][0], **summary(totals[combo]), "final": done == games}
+            f.write(json.dumps(line) + "\n")
+            f.flush()
+
+        if workers == 1:
+            for task in tasks:
+                record(*run_chunk(task))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for future in as_completed([pool.submit(run_chunk, task) for task in tasks]):
+                    record(*future.result())
+
+    elapsed = time.perf_counter() - start
+    total_games = sum(stats["games"] for stats in totals)
+    total_ticks = sum(stats["ticks"] for stats in totals)
+    print(f"{total_games} parties, {total_ticks} ticks en {elapsed:.2f} s sur {workers} processus "
+          f"({total_games / elapsed:.1f} parties/s, {total_ticks / elapsed:.0f} ticks/s)")
+    return [{"combo": combo, **grid[combo][0], **summary(stats)} for combo, stats in enumerate(totals)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parties en lot du Casse-Brique (raquette automatique)")
+    parser.add_argument("--games", type=int, default=100, help="parties par combinaison de paramètres")
+    parser.add_argument("--ball-speed", type=float, nargs="+", default=[INIT_BALL_SPEED])
+    parser.add_argument("--paddle-width", type=int, nargs="+", default=[P_WIDTH])
+    parser.add_argument("--radius", type=int, nargs="+", default=[RADIUS])
+    parser.add_argument("--layout", nargs="+", default=["grille"],
+                        help="grille, grille:LxC, niveaux ou fichier de niveau")
+    parser.add_argument("--policy", default="suiveur", help=f"{', '.join(POLICIES)} ou module:fonction")
+    parser.add_argument("--workers", type=int, default=None, help="processus (par défaut: nombre de cœurs)")
+    parser.add_argument("--seed", type=int, default=0, help="graine du lot")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="parties par tâche")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="ticks au plus par partie")
+    parser.add_argument("--output", default="lots.jsonl", help="fichier de résultats (JSON Lines)")
+    args = parser.parse_args(argv)
+
+    grid = parameter_grid(args.ball_speed, args.paddle_width, args.radius, args.layout)
+    results = run_batch(grid, args.games, args.policy, args.output, workers=args.workers, seed=args.seed,
+                        chunk=args.chunk, max_ticks=args.max_ticks)
+    for result in results:
+        clear = result["mean_ticks_to_clear"]
+        print(f"vitesse {result['ball_speed']:g}, raquette {result['paddle_width']}, rayon {result['radius']}, "
+              f"{result['layout']}: victoires {result['win_rate']:.1%}, "
+              f"ticks pour vider {'-' if clear is None else f'{clear:.0f}'}, "
+              f"vies perdues {result['mean_lives_lost']:.2f}, score {result['mean_score']:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
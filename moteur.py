@@ -0,0 +1,1125 @@
+"""
+Moteur du Casse-Brique (sans Tkinter)
+
+Fonctionnalités :
+- état complet du jeu : raquette, balle, briques, score, vies
+- avance la simulation tick par tick (Engine.step)
+- collisions murs / briques / raquette identiques à la version graphique
+- aucun accès au canevas : le rendu est fait à part (voir final_version.py)
+- horloge à pas fixe (FixedStepClock) : physique à cadence constante, rendu découplé
+
+Coding: UTF-8
+"""
+
+import math
+import random
+import time
+from array import array
+
+C_WIDTH = 800
+C_HEIGHT = 600
+P_WIDTH = 120
+P_HEIGHT = 16
+OFFSET = 40
+RADIUS = 5
+INIT_BALL_SPEED = 5.0
+ROWS = 6
+COLS = 10
+B_WIDTH = C_WIDTH // COLS
+B_HEIGHT = 22
+TOP_OFFSET = 60  # laisse de la place pour score/vies
+LIVES = 3
+FPS = 110
+#cadences de la boucle de jeu (voir FixedStepClock)
+TICK_RATE = FPS         #ticks de physique par seconde (les vitesses sont en pixels par tick)
+RENDER_RATE = 60        #dessins par seconde au maximum
+MAX_FRAME_TICKS = 30    #ticks rattrapés au plus par appel (au-delà le retard est abandonné)
+FREE_MARGIN = 1e-6      #marge (ticks) avant un contact pour Engine.fast_forward
+#service: angle (degrés, depuis la verticale) tiré entre ces bornes, à gauche ou à droite (Engine.serve)
+SERVE_MIN_ANGLE = 20
+SERVE_MAX_ANGLE = 60
+
+#états possibles d'une partie
+RUNNING = "running"
+LOST = "lost"
+WON = "won"
+
+#bonus libérés par une brique détruite (BricksManager.powers)
+POWER_NONE = 0
+POWER_MULTIBALL = 1     #chaque balle en donne de nouvelles (voir multiballe.py)
+
+
+class Paddle:
+    """
+    Classe représentant la raquette du joueur.
+    Cette classe gère :
+      - sa position et sa vitesse horizontale,
+      - le déplacement limité aux bords du canevas.
+    """
+    def __init__(self, width=P_WIDTH):
+        """
+        -initialise la raquette au centre en bas du canevas.
+        """
+        self.width = width
+        self.height = P_HEIGHT
+        self.x = C_WIDTH // 2
+        self.y = C_HEIGHT - OFFSET
+        self.vel = 0
+        self.max_speed = 10
+
+    def move(self):
+        """
+        - déplace la raquette selon sa vitesse actuelle.
+        - si elle touche un bord, on la bloque (elle ne sort pas de la zone de jeu).
+        """
+        #Nouvelle position calculée
+        new_x = self.x + self.vel
+        half = self.width // 2
+        #Empêche la raquette de dépasser le bord gauche
+        if new_x - half < 0:
+            new_x = half
+        #Empêche la raquette de dépasser le bord droit
+        if new_x + half > C_WIDTH:
+            new_x = C_WIDTH - half
+
+        self.x = new_x
+
+    def set_speed(self, v):
+        """
+        - définit la vitesse de la raquette.
+        - utilisée lorsqu'on appuie ou relâche les flèches du clavier.
+        - param v: vitesse souhaitée (positive = droite, négative = gauche)
+        """
+        self.vel = v
+
+class Brick:
+    """
+    Vue légère sur une brique de BricksManager (aucune donnée recopiée):
+    - position, taille, couleur, valeur, points de vie (hp)
+    - alive / destroy()
+    """
+    __slots__ = ('manager', 'index')
+
+    def __init__(self, manager, index):
+        self.manager = manager
+        self.index = index #position dans les tableaux de BricksManager
+
+    #coin supérieur gauche
+    @property
+    def x(self):
+        return self.manager.xs[self.index]
+
+    @property
+    def y(self):
+        return self.manager.ys[self.index]
+
+    #largeur et hauteur
+    @property
+    def w(self):
+        return self.manager.ws[self.index]
+
+    @property
+    def h(self):
+        return self.manager.hs[self.index]
+
+    @property
+    def color(self):
+        return self.manager.palette[self.manager.color_ids[self.index]]
+
+    @property
+    def value(self):
+        """nombre de points que rapporte sa destruction"""
+        return self.manager.values[self.index]
+
+    @property
+    def hp(self):
+        """nombre de coups restant avant destruction"""
+        return self.manager.hp[self.index]
+
+    @property
+    def alive(self):
+        return bool(self.manager.alive[self.index])
+
+    def destroy(self):
+        """détruit la brique si elle est encore en vie"""
+        self.manager.destroy(self.index)
+
+class BrickList:
+    """
+    Séquence de vues Brick sur un BricksManager (créées à la demande):
+    permet de garder l'écriture bricks.bricks[i] / for b in bricks.bricks
+    """
+    __slots__ = ('manager',)
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def __len__(self):
+        return len(self.manager.alive)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return Brick(self.manager, index)
+
+    def __iter__(self):
+        manager = self.manager
+        for index in range(len(manager.alive)):
+            yield Brick(manager, index)
+
+class BricksManager:
+    """
+    - crée la grille de briques
+    - détecte collisions balle-brique
+    - touche/détruit la brique touchée
+    - renvoie la brique touchée (ou None)
+    - garde la liste des briques détruites depuis le dernier rendu (destroyed)
+    - range les briques dans une grille uniforme (cellules de la taille des briques)
+      pour ne tester que les briques proches de la balle
+
+    Les briques sont stockées en tableaux parallèles (une case par brique):
+    xs, ys, ws, hs, values, hp, color_ids, powers (bonus, bytearray) et alive (bytearray, 1 = vivante).
+    live compte les briques vivantes, count() ne parcourt donc plus la liste.
+    version change à chaque modification en bloc (le rendu redessine alors tout).
+    journal (retour.RewindBuffer ou None): prévenu de chaque coup porté à une brique (hit).
+    changes (liste ou None): si un lecteur (spectateurs) y a mis une liste, indices des briques détruites
+    ou revenues, qu'il vide lui-même (destroyed/revived restent ceux du rendu).
+    level (niveau.CompiledLevel): tableau d'un fichier de niveau à la place de la grille rows x cols.
+    """
+    def __init__(self, rows=ROWS, cols=COLS, brick_height=B_HEIGHT, level=None):
+        #dimensions de la grille de départ (la largeur des briques remplit le canevas)
+        self.rows = rows
+        self.cols = cols
+        self.brick_width = C_WIDTH // cols
+        self.brick_height = brick_height
+        self.xs = array('d')
+        self.ys = array('d')
+        self.ws = array('d')
+        self.hs = array('d')
+        self.values = array('i')
+        self.hp = array('i')
+        self.color_ids = array('H')
+        self.powers = bytearray()
+        self.palette: list[str] = []
+        self.alive = bytearray()
+        self.live = 0
+        #vues Brick, comme l'ancienne liste d'objets
+        self.bricks = BrickList(self)
+        #indices des briques détruites / revenues (retour en arrière), vidées par le rendu
+        self.destroyed: list[int] = []
+        self.revived: list[int] = []
+        self.journal = None
+        self.changes = None
+        self.version = 0
+        if level is not None:
+            self.load_level(level)
+        else:
+            self.create_bricks()
+            self.build_grid()
+
+    def create_bricks(self):
+        """
+        crée le tableau de briques en haut de la fenêtre de jeu
+        """
+        w, h = self.brick_width, self.brick_height
+        for row in range(self.rows):
+            for col in range(self.cols):
+                x = col * w
+                y = row * h + TOP_OFFSET
+                self.add_brick(x, y, w, h, color='#9b59b6', value=1)
+
+    def add_brick(self, x, y, w, h, color, value, hp=1, power=POWER_NONE):
+        """ajoute une brique vivante à la fin des tableaux et retourne son indice"""
+        if color not in self.palette:
+            self.palette.append(color)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.ws.append(w)
+        self.hs.append(h)
+        self.values.append(value)
+        self.hp.append(hp)
+        self.color_ids.append(self.palette.index(color))
+        self.powers.append(power)
+        self.alive.append(1)
+        self.live += 1
+        return len(self.alive) - 1
+
+    def load_level(self, level):
+        """
+        remplace toutes les briques par celles d'un niveau compilé (niveau.CompiledLevel):
+        tableaux et grille de collisions sont recopiés en bloc, sans reconstruction
+        """
+        self.rows, self.cols = level.rows, level.cols
+        self.brick_width, self.brick_height = level.brick_width, level.brick_height
+        for name in ('xs', 'ys', 'ws', 'hs', 'values', 'hp', 'color_ids', 'cell_start', 'cell_items'):
+            setattr(self, name, getattr(level, name)[:])
+        self.powers = bytearray(level.powers)
+        self.palette = list(level.palette)
+        self.cell_w, self.cell_h = level.cell_w, level.cell_h
+        self.grid_x, self.grid_y = level.grid_x, level.grid_y
+        self.grid_cols, self.grid_rows = level.grid_cols, level.grid_rows
+        self.alive = bytearray(b'\x01' * len(self.xs))
+        self.live = len(self.xs)
+        self.destroyed.clear()
+        self.revived.clear()
+        self.version += 1
+
+    def destroy(self, index):
+        """détruit la brique index si elle est encore en vie"""
+        if self.alive[index]:
+            self.alive[index] = 0
+            self.live -= 1
+            self.destroyed.append(index)
+            if self.changes is not None:
+                self.changes.append(index)
+
+    def revive(self, index, hp):
+        """remet en vie la brique index avec hp points de vie (retour en arrière)"""
+        self.hp[index] = hp
+        if not self.alive[index]:
+            self.alive[index] = 1
+            self.live += 1
+            self.revived.append(index)
+            if self.changes is not None:
+                self.changes.append(index)
+
+    def hit(self, index):
+        """retire un point de vie à la brique index, la détruit à 0. Retourne True si détruite."""
+        if self.journal is not None:
+            self.journal.brick_hit(index, self.hp[index])
+        self.hp[index] -= 1
+        if self.hp[index] <= 0:
+            self.destroy(index)
+            return True
+        return False
+
+    def alive_mask(self):
+        """copie (bytes) de l'état des briques: 1 = vivante, 0 = détruite"""
+        return bytes(self.alive)
+
+    def set_alive_mask(self, mask, hp=None):
+        """
+        restaure en bloc l'état des briques (masque d'alive_mask(), points de vie optionnels)
+        sans passer par destroy(): le rendu redessine tout (version)
+        """
+        self.alive[:] = mask
+        if hp is not None:
+            self.hp = array('i', hp)
+        self.live = sum(self.alive)
+        self.destroyed.clear()
+        self.revived.clear()
+        self.version += 1
+
+    def __len__(self):
+        return len(self.alive)
+
+    def build_grid(self, cell_w=None, cell_h=None):
+        """
+        - découpe la zone des briques en cellules de cell_w x cell_h (par défaut la taille des briques)
+        - chaque cellule contient les indices des briques qui la touchent (bords compris)
+        - stockage compact: les indices de la cellule c sont
+          cell_items[cell_start[c]:cell_start[c + 1]]
+        """
+        self.cell_w = cell_w or self.brick_width
+        self.cell_h = cell_h or self.brick_height
+        cell_w, cell_h = self.cell_w, self.cell_h
+        n = len(self.alive)
+        if n == 0:
+            self.grid_x = self.grid_y = 0
+            self.grid_cols = self.grid_rows = 0
+            self.cell_start = array('i', [0])
+            self.cell_items = array('i')
+            return
+
+        xs, ys, ws, hs = self.xs, self.ys, self.ws, self.hs
+        #origine et taille de la grille: rectangle englobant toutes les briques
+        self.grid_x = min(xs)
+        self.grid_y = min(ys)
+        self.grid_cols = int((max(xs[i] + ws[i] for i in range(n)) - self.grid_x) // cell_w) + 1
+        self.grid_rows = int((max(ys[i] + hs[i] for i in range(n)) - self.grid_y) // cell_h) + 1
+        cols = self.grid_cols
+
+        #1er passage: nombre de briques par cellule
+        ranges = [self.cell_range(xs[i], ys[i], xs[i] + ws[i], ys[i] + hs[i]) for i in range(n)]
+        sizes = array('i', bytes(4 * (cols * self.grid_rows)))
+        for col1, row1, col2, row2 in ranges:
+            for row in range(row1, row2 + 1):
+                for col in range(col1, col2 + 1):
+                    sizes[row * cols + col] += 1
+
+        #2e passage: rangement des indices (dans l'ordre des briques)
+        self.cell_start = array('i', [0])
+        for size in sizes:
+            self.cell_start.append(self.cell_start[-1] + size)
+        self.cell_items = array('i', bytes(4 * self.cell_start[-1]))
+        fill = array('i', self.cell_start[:-1])
+        for index, (col1, row1, col2, row2) in enumerate(ranges):
+            for row in range(row1, row2 + 1):
+                for col in range(col1, col2 + 1):
+                    cell = row * cols + col
+                    self.cell_items[fill[cell]] = index
+                    fill[cell] += 1
+
+    def cell_range(self, left, top, right, bottom):
+        """
+        - retourne (col1, row1, col2, row2), les cellules couvertes par le rectangle (bords compris)
+        - les indices sont bornés à la grille; col1 > col2 si le rectangle est hors de la grille
+        """
+        col1 = max(int((left - self.grid_x) // self.cell_w), 0)
+        row1 = max(int((top - self.grid_y) // self.cell_h), 0)
+        col2 = min(int((right - self.grid_x) // self.cell_w), self.grid_cols - 1)
+        row2 = min(int((bottom - self.grid_y) // self.cell_h), self.grid_rows - 1)
+        return col1, row1, col2, row2
+
+    def candidates(self, left, top, right, bottom):
+        """
+        - indices des briques rangées dans les cellules touchées par le rectangle,
+        - triés dans l'ordre des briques (même ordre de test qu'un parcours complet)
+        """
+        col1, row1, col2, row2 = self.cell_range(left, top, right, bottom)
+        if col1 > col2 or row1 > row2:
+            return ()
+        start = self.cell_start
+        items = self.cell_items
+        cols = self.grid_cols
+        if col1 == col2 and row1 == row2:
+            cell = row1 * cols + col1
+            return items[start[cell]:start[cell + 1]]
+        found = set()
+        for row in range(row1, row2 + 1):
+            for col in range(col1, col2 + 1):
+                cell = row * cols + col
+                found.update(items[start[cell]:start[cell + 1]])
+        return sorted(found)
+
+    def collision(self, ball: 'Ball'):
+        """
+        - vérifie si collision entre la balle et une des briques.
+        - seules les briques des cellules couvertes par la balle sont testées.
+        - retourne la brique touchée (vue Brick) et lui retire un point de vie, ou None si aucune.
+        """
+        ball_left = ball.x - ball.radius
+        ball_right = ball.x + ball.radius
+        ball_top = ball.y - ball.radius
+        ball_bottom = ball.y + ball.radius
+
+        alive = self.alive
+        for index in self.candidates(ball_left, ball_top, ball_right, ball_bottom):
+            if not alive[index]:
+                continue
+
+            #Les variables brick_left/right/top/bottom sont les bornes de la brique.
+            brick_left = self.xs[index]
+            brick_right = brick_left + self.ws[index]
+            brick_top = self.ys[index]
+            brick_bottom = brick_top + self.hs[index]
+
+            # Vérifie s'il y a chevauchement entre la balle (approximée en carré) et la brique (se chevauchent à la fois sur l'axe x et l'axe y)
+            if (ball_right >= brick_left and ball_left <= brick_right and
+                ball_bottom >= brick_top and ball_top <= brick_bottom):
+
+                #calculer la distance entre les côtés de la balle et de la brique susceptibles de se toucher. La plus petite distance indique quel côté de la brique est touché.
+                hit_left = ball_right - brick_left
+                hit_right = brick_right - ball_left
+                hit_top = ball_bottom - brick_top
+                hit_bottom = brick_bottom - ball_top
+                min_hit = min(hit_left, hit_right, hit_top, hit_bottom)
+
+                if min_hit == hit_left or min_hit == hit_right:
+                    #contact latéral. on inverse la composante selon x.
+                    ball.vx = -ball.vx
+                else:
+                    #contact vertical. on inverse la composante selon y.
+                    ball.vy = -ball.vy
+
+                self.hit(index)
+
+                #permet d'actualiser le score en indiquant à la classe Game la brique qui vient d'être touchée (hit_brick)
+                return Brick(self, index)
+        return None
+
+    def sweep(self, x, y, dx, dy, radius):
+        """
+        Collision continue: la balle (carré de demi-côté radius, comme dans collision())
+        va de (x, y) à (x + dx, y + dy).
+        - retourne (s, index, axe) pour la première brique vivante rencontrée,
+          s dans [0, 1] étant la fraction du déplacement au moment du contact
+          et axe 'x' (contact latéral) ou 'y' (contact vertical)
+        - retourne None si le déplacement ne touche aucune brique
+        """
+        left = min(x, x + dx) - radius
+        right = max(x, x + dx) + radius
+        top = min(y, y + dy) - radius
+        bottom = max(y, y + dy) + radius
+
+        best = None
+        best_s = 2.0
+        alive = self.alive
+        xs, ys, ws, hs = self.xs, self.ys, self.ws, self.hs
+        for index in self.candidates(left, top, right, bottom):
+            if not alive[index]:
+                continue
+            #brique élargie de radius: la balle devient un point (méthode des "slabs")
+            box_left = xs[index] - radius
+            box_right = xs[index] + ws[index] + radius
+            box_top = ys[index] - radius
+            box_bottom = ys[index] + hs[index] + radius
+
+            if dx != 0:
+                s1 = (box_left - x) / dx
+                s2 = (box_right - x) / dx
+                sx_near, sx_far = (s1, s2) if s1 < s2 else (s2, s1)
+            elif box_left <= x <= box_right:
+                sx_near, sx_far = -math.inf, math.inf
+            else:
+                continue
+            if dy != 0:
+                s1 = (box_top - y) / dy
+                s2 = (box_bottom - y) / dy
+                sy_near, sy_far = (s1, s2) if s1 < s2 else (s2, s1)
+            elif box_top <= y <= box_bottom:
+                sy_near, sy_far = -math.inf, math.inf
+            else:
+                continue
+
+            s_near = max(sx_near, sy_near)
+            s_far = min(sx_far, sy_far)
+            #pas de contact, contact après ce déplacement, ou balle posée sur la brique et qui s'en éloigne
+            if s_near > s_far or s_far <= 0 or s_near > 1:
+                continue
+
+            if s_near >= 0:
+                #entrée dans la brique: l'axe d'entrée donne le côté touché (coin: côté latéral, comme collision())
+                axis = 'x' if sx_near >= sy_near else 'y'
+            else:
+                #balle déjà dans la brique: même règle que collision() (plus petite pénétration)
+                s_near = 0.0
+                hit_left = x + radius - xs[index]
+                hit_right = xs[index] + ws[index] - (x - radius)
+                hit_top = y + radius - ys[index]
+                hit_bottom = ys[index] + hs[index] - (y - radius)
+                min_hit = min(hit_left, hit_right, hit_top, hit_bottom)
+                axis = 'x' if min_hit == hit_left or min_hit == hit_right else 'y'
+
+            #à égalité on garde la première brique de la liste
+            if s_near < best_s:
+                best_s = s_near
+                best = (s_near, index, axis)
+        return best
+
+    def first_contact(self, x, y, vx, vy, radius, horizon):
+        """
+        - temps (en ticks, réel) du premier contact d'une balle en ligne droite (vitesse vx, vy par tick)
+          avec une brique vivante, ou math.inf s'il n'y en a pas avant horizon ticks
+        - même test que sweep(), fait par tronçons d'environ quatre cellules et seulement
+          pendant la traversée de la bande horizontale occupée par la grille
+        """
+        if self.live == 0 or self.grid_cols == 0:
+            return math.inf
+        #traversée de la bande [grid_y - radius, bas de la grille + radius]
+        top = self.grid_y - radius
+        bottom = self.grid_y + self.grid_rows * self.cell_h + radius
+        if vy > 0:
+            start, end = (top - y) / vy, (bottom - y) / vy
+        elif vy < 0:
+            start, end = (bottom - y) / vy, (top - y) / vy
+        elif top <= y <= bottom:
+            start, end = 0.0, horizon
+        else:
+            return math.inf
+        start = max(start, 0.0)
+        end = min(end, horizon)
+        span = max(1.0, 4 * min(self.cell_w, self.cell_h) / max(abs(vx), abs(vy), 1e-9))
+        t = start
+        while t < end:
+            length = min(span, end - t)
+            hit = self.sweep(x + vx * t, y + vy * t, vx * length, vy * length, radius)
+            if hit is not None:
+                return t + hit[0] * length
+            t += length
+        return math.inf
+
+    def count(self):
+        """Nombre de briques encore présentes."""
+        return self.live
+
+class Ball:
+    """
+    - gère le mouvement de la balle (mettre à jour sa position à chaque tick)
+    - rebonds sur les murs et la raquette (loi de Descartes)
+    - deux modes: update() + handle_collisions() (test à la position d'arrivée)
+      ou sweep() (collision continue, la balle ne traverse plus briques et raquette)
+    """
+    def __init__(self, paddle, radius=RADIUS, color='white', speed=INIT_BALL_SPEED):
+        self.paddle = paddle
+        self.radius = radius
+        self.color = color
+        self.speed = speed
+
+        #vitesses horizontales et verticales initiales (arbitraire. la trajectoire est ici une diagonale)
+        self.vx = speed
+        self.vy = -speed
+
+        #Position et vitesse initiales
+        self.set_reset()
+
+    def update(self):
+        """Déplace la balle d'un tick."""
+        self.x += self.vx
+        self.y += self.vy
+
+    def set_reset(self, angle=None):
+        """
+        Place la balle au centre de la raquette et initialise la vitesse:
+        vers le haut, angle (radians) depuis la verticale (négatif: vers la gauche); None: diagonale à droite
+        """
+        self.x = self.paddle.x
+        self.y = self.paddle.y - self.paddle.height // 2 - self.radius
+        if angle is None:
+            self.vx = self.speed / math.sqrt(2)
+            self.vy = -self.speed / math.sqrt(2)
+        else:
+            self.vx = self.speed * math.sin(angle)
+            self.vy = -self.speed * math.cos(angle)
+
+    def handle_collisions(self, brick_manager):
+        """
+        Gestion des collisions:
+        - murs: inversion vx ou vy
+        - briques: inversion vx ou vy selon l'axe du contact
+        - raquette: inversion de vy
+        - paramètres: brick_manager
+        """
+        self.collide_walls()
+        hit_brick = brick_manager.collision(self)
+        self.collide_paddle()
+        return hit_brick
+
+    def collide_walls(self):
+        """murs: inversion vx ou vy (la balle est replacée contre le mur)"""
+        if self.x - self.radius <= 0:  #mur gauche
+            self.x = self.radius
+            self.vx = -self.vx
+        elif self.x + self.radius >= C_WIDTH:  #mur droit
+            self.x = C_WIDTH - self.radius
+            self.vx = -self.vx
+
+        if self.y - self.radius <= 0:  #plafond
+            self.y = self.radius
+            self.vy = -self.vy
+
+    def collide_paddle(self):
+        """raquette: inversion de vy si la balle descend sur la raquette"""
+        px1 = self.paddle.x - self.paddle.width / 2
+        px2 = self.paddle.x + self.paddle.width / 2
+        py1 = self.paddle.y - self.paddle.height / 2
+        py2 = self.paddle.y + self.paddle.height / 2
+
+        if (px1 <= self.x <= px2) and (py1 <= self.y + self.radius <= py2) and self.vy > 0:
+            self.y = py1 - self.radius
+            self.vy = -self.vy
+
+    def wall_toi(self, dx, dy):
+        """
+        - premier contact avec un mur (gauche, droit, plafond) pendant le déplacement (dx, dy)
+        - retourne (s, mur) avec s dans [0, 1], ou None
+        """
+        r = self.radius
+        best = None
+        if dx < 0 and self.x - r + dx <= 0:  #mur gauche
+            best = (max((r - self.x) / dx, 0.0), 'left')
+        elif dx > 0 and self.x + r + dx >= C_WIDTH:  #mur droit
+            best = (max((C_WIDTH - r - self.x) / dx, 0.0), 'right')
+        if dy < 0 and self.y - r + dy <= 0:  #plafond
+            s = max((r - self.y) / dy, 0.0)
+            if best is None or s < best[0]:
+                best = (s, 'top')
+        return best
+
+    def paddle_toi(self, dx, dy):
+        """
+        - premier contact avec le dessus de la raquette pendant le déplacement (dx, dy)
+        - retourne s dans [0, 1], ou None (la balle doit descendre, comme dans handle_collisions)
+        """
+        if dy <= 0:
+            return None
+        px1 = self.paddle.x - self.paddle.width / 2
+        px2 = self.paddle.x + self.paddle.width / 2
+        py1 = self.paddle.y - self.paddle.height / 2
+        py2 = self.paddle.y + self.paddle.height / 2
+        bottom = self.y + self.radius
+
+        if py1 < bottom <= py2:
+            #déjà dans l'épaisseur de la raquette (elle s'est déplacée sous la balle)
+            return 0.0 if px1 <= self.x <= px2 else None
+        if bottom <= py1 <= bottom + dy:
+            s = (py1 - bottom) / dy
+            if px1 <= self.x + dx * s <= px2:
+                return s
+        return None
+
+    def sweep(self, brick_manager, max_hits=8, profiler=None):
+        """
+        Déplace la balle d'un tick avec collision continue:
+        - cherche le premier contact (murs, briques, raquette) sur le trajet restant
+        - avance jusqu'au contact, rebondit (inversion vx ou vy), puis continue le trajet
+        - au plus max_hits rebonds par tick
+        - profiler (telemetrie.Profiler): chronomètre les recherches de contact par type
+        - retourne la liste des briques touchées (vues Brick), dans l'ordre
+        """
+        hits = []
+        remaining = 1.0
+        for _ in range(max_hits):
+            dx = self.vx * remaining
+            dy = self.vy * remaining
+
+            if profiler is None:
+                wall = self.wall_toi(dx, dy)
+                brick = brick_manager.sweep(self.x, self.y, dx, dy, self.radius)
+                s = self.paddle_toi(dx, dy)
+            else:
+                t0 = profiler.clock()
+                wall = self.wall_toi(dx, dy)
+                t1 = profiler.clock()
+                brick = brick_manager.sweep(self.x, self.y, dx, dy, self.radius)
+                t2 = profiler.clock()
+                s = self.paddle_toi(dx, dy)
+                profiler.add('collisions.walls', t1 - t0)
+                profiler.add('collisions.bricks', t2 - t1)
+                profiler.add('collisions.paddle', profiler.clock() - t2)
+
+            #premier contact: (s, type, détail)
+            first = None
+            if wall is not None:
+                first = (wall[0], 'wall', wall[1])
+            if brick is not None and (first is None or brick[0] < first[0]):
+                first = (brick[0], 'brick', brick)
+            if s is not None and (first is None or s < first[0]):
+                first = (s, 'paddle', None)
+
+            if first is None:
+                self.x += dx
+                self.y += dy
+                break
+
+            s, kind, detail = first
+            self.x += dx * s
+            self.y += dy * s
+            r = self.radius
+            if kind == 'wall':
+                if detail == 'left':
+                    self.x = r
+                    self.vx = -self.vx
+                elif detail == 'right':
+                    self.x = C_WIDTH - r
+                    self.vx = -self.vx
+                else:
+                    self.y = r
+                    self.vy = -self.vy
+            elif kind == 'brick':
+                index, axis = detail[1], detail[2]
+                if axis == 'x':
+                    #on pose la balle contre le côté touché
+                    if dx > 0:
+                        self.x = brick_manager.xs[index] - r
+                    elif dx < 0:
+                        self.x = brick_manager.xs[index] + brick_manager.ws[index] + r
+                    self.vx = -self.vx
+                else:
+                    if dy > 0:
+                        self.y = brick_manager.ys[index] - r
+                    elif dy < 0:
+                        self.y = brick_manager.ys[index] + brick_manager.hs[index] + r
+                    self.vy = -self.vy
+                brick_manager.hit(index)
+                hits.append(Brick(brick_manager, index))
+            else:
+                self.y = self.paddle.y - self.paddle.height / 2 - r
+                self.vy = -self.vy
+            remaining *= 1.0 - s
+        return hits
+
+
+class Engine:
+    """
+    Simulation complète d'une partie, sans affichage:
+    - contient la raquette, la balle, les briques, le score et les vies
+    - step() avance le jeu d'un tick (1/tick_rate seconde de jeu)
+    - status vaut RUNNING, LOST (plus de vies) ou WON (plus de briques)
+    - swept=True: collision continue (Ball.sweep), False: test à l'arrivée (handle_collisions)
+    - les vitesses (balle, raquette) sont données par tick à FPS et mises à l'échelle
+      pour tick_rate: la partie va à la même vitesse quel que soit le nombre de ticks par seconde
+    - profiler (telemetrie.Profiler ou None): chronométrage de chaque phase du tick
+    - les commandes du joueur (set_paddle_speed) ne sont appliquées qu'au début d'un tick:
+      la partie ne dépend que de la graine (seed), de l'état initial et des commandes par tick
+    - recorder (rejeu.InputRecorder ou None): enregistre chaque commande appliquée
+    - levels (liste de fichiers de niveau, voir niveau.py): joués dans l'ordre, le suivant est chargé
+      dès que le tableau est vide; sans levels, grille rows x cols d'origine
+    - swarm (multiballe.BallSwarm ou None): balles supplémentaires du bonus multiballe;
+      la balle principale perdue est remplacée par l'une d'elles, une vie n'est perdue qu'avec la dernière
+    - fast_forward(): comme run(), en sautant d'un coup les vols libres de la balle entre deux contacts
+    - random_serve=True: chaque service (départ, vie perdue, niveau suivant) part dans une direction tirée par rng:
+      deux graines donnent deux parties différentes; False: toujours la diagonale à droite (anciens rejeux)
+    """
+    def __init__(self, paddle_width=P_WIDTH, radius=RADIUS, ball_speed=INIT_BALL_SPEED, lives=LIVES,
+                 tick_rate=TICK_RATE, swept=True, seed=0, rows=ROWS, cols=COLS, brick_height=B_HEIGHT,
+                 levels=None, random_serve=True):
+        #paramètres de construction (en-tête des fichiers de rejeu)
+        self.params = {"paddle_width": paddle_width, "radius": radius, "ball_speed": ball_speed,
+                       "lives": lives, "tick_rate": tick_rate, "swept": swept, "seed": seed,
+                       "rows": rows, "cols": cols, "brick_height": brick_height,
+                       "levels": list(levels) if levels else None, "random_serve": random_serve}
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.random_serve = random_serve
+        self.serve_angle = None
+        scale = FPS / tick_rate
+        self.swept = swept
+        self.paddle = Paddle(paddle_width)
+        self.paddle.max_speed *= scale
+        self.ball = Ball(self.paddle, radius=radius, speed=ball_speed * scale)
+        #niveaux compilés déjà chargés (indice -> niveau.CompiledLevel)
+        self.levels = list(levels or [])
+        self.level = 0
+        self.compiled_levels = {}
+        if self.levels:
+            self.bricks = BricksManager(level=self.level_data(0))
+        else:
+            self.bricks = BricksManager(rows, cols, brick_height)
+        self.score = 0
+        self.lives = lives
+        self.status = RUNNING
+        self.ticks = 0
+        self.swarm = None
+        self.profiler = None
+        self.recorder = None
+        #commande de vitesse de la raquette pour le prochain tick
+        self.input_vel = 0
+        self.serve()
+
+    def serve(self):
+        """balle replacée sur la raquette, direction tirée par rng (gardée dans serve_angle, radians)"""
+        if self.random_serve:
+            angle = math.radians(self.rng.uniform(SERVE_MIN_ANGLE, SERVE_MAX_ANGLE))
+            self.serve_angle = angle if self.rng.random() < 0.5 else -angle
+        self.ball.set_reset(self.serve_angle)
+
+    def set_paddle_speed(self, v):
+        """commande de vitesse de la raquette, appliquée au début du prochain tick"""
+        self.input_vel = v
+
+    def apply_input(self):
+        """applique la commande en attente (et l'enregistre avec le numéro du tick)"""
+        self.paddle.set_speed(self.input_vel)
+        if self.recorder is not None:
+            self.recorder.record(self.ticks, self.input_vel)
+
+    def level_data(self, index):
+        """niveau compilé numéro index (lu dans le cache de niveau.py au premier appel, gardé ensuite)"""
+        level = self.compiled_levels.get(index)
+        if level is None:
+            from niveau import load_level
+            level = self.compiled_levels[index] = load_level(self.levels[index])
+        return level
+
+    def prepare_levels(self):
+        """charge d'avance tous les niveaux (changement de niveau sans lecture de fichier)"""
+        for index in range(len(self.levels)):
+            self.level_data(index)
+
+    def load_level(self, index):
+        """passe au niveau index: nouvelles briques, balle replacée sur la raquette (score et vies gardés)"""
+        self.bricks.load_level(self.level_data(index))
+        self.level = index
+        self.serve()
+        if self.swarm is not None:
+            self.swarm.clear()
+        self.status = RUNNING
+
+    def multiball(self):
+        """
+        bonus multiballe: chaque balle (principale et supplémentaires) en donne multiballe.SPLIT de plus
+        retourne le nombre de balles ajoutées (0 sans NumPy)
+        """
+        from multiballe import BallSwarm, HAS_NUMPY
+        if not HAS_NUMPY:
+            return 0
+        if self.swarm is None:
+            self.swarm = BallSwarm(self.ball.radius)
+        ball = self.ball
+        return self.swarm.split([(ball.x, ball.y, ball.vx, ball.vy)] + self.swarm.balls(), self.rng)
+
+    def get_state(self):
+        """état complet de la partie (dictionnaire, masque et points de vie des briques en bytes)"""
+        ball = self.ball
+        return {
+            "ticks": self.ticks, "score": self.score, "lives": self.lives, "status": self.status,
+            "level": self.level,
+            "paddle": {"x": self.paddle.x, "vel": self.paddle.vel},
+            "ball": {"x": ball.x, "y": ball.y, "vx": ball.vx, "vy": ball.vy},
+            "input_vel": self.input_vel,
+            "serve_angle": self.serve_angle,
+            "rng": self.rng.getstate(),
+            "bricks": self.bricks.alive_mask(),
+            "hp": self.bricks.hp.tobytes(),
+            "swarm": self.swarm.balls() if self.swarm is not None else [],
+        }
+
+    def set_state(self, state):
+        """restaure un état donné par get_state()"""
+        if state.get("level", 0) != self.level:
+            self.load_level(state["level"])
+        self.ticks = state["ticks"]
+        self.score = state["score"]
+        self.lives = state["lives"]
+        self.status = state["status"]
+        self.paddle.x = state["paddle"]["x"]
+        self.paddle.vel = state["paddle"]["vel"]
+        self.ball.x = state["ball"]["x"]
+        self.ball.y = state["ball"]["y"]
+        self.ball.vx = state["ball"]["vx"]
+        self.ball.vy = state["ball"]["vy"]
+        self.input_vel = state["input_vel"]
+        self.serve_angle = state.get("serve_angle")
+        #(tuples redevenus listes si l'état est passé par JSON)
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
+        self.bricks.set_alive_mask(state["bricks"], array('i', state["hp"]))
+        if self.swarm is not None:
+            self.swarm.clear()
+        if state.get("swarm"):
+            if self.swarm is None:
+                from multiballe import BallSwarm
+                self.swarm = BallSwarm(self.ball.radius)
+            for x, y, vx, vy in state["swarm"]:
+                self.swarm.add(x, y, vx, vy)
+
+    def step(self):
+        """
+        - avance la partie d'un tick: raquette, balle, collisions, vies et score
+        - retourne la liste des briques touchées pendant ce tick
+        """
+        if self.status != RUNNING:
+            return []
+        if self.input_vel != self.paddle.vel:
+            self.apply_input()
+        if self.profiler is not None:
+            return self.step_profiled()
+        self.ticks += 1
+
+        self.paddle.move()
+        if self.swept:
+            hits = self.ball.sweep(self.bricks)
+        else:
+            self.ball.update()
+            hit_brick = self.ball.handle_collisions(self.bricks)
+            hits = [hit_brick] if hit_brick else []
+        if self.swarm is not None and self.swarm.n:
+            hits = hits + self.swarm.step(self.bricks, self.paddle)
+        self.end_tick(hits)
+        return hits
+
+    def step_profiled(self):
+        """
+        même chose que step(), en chronométrant chaque phase dans self.profiler
+        (en mode swept, ball.update comprend les recherches de contact)
+        """
+        profiler = self.profiler
+        clock = profiler.clock
+        self.ticks += 1
+        profiler.tick()
+
+        t0 = clock()
+        self.paddle.move()
+        t1 = clock()
+        profiler.add('paddle.move', t1 - t0)
+        if self.swept:
+            hits = self.ball.sweep(self.bricks, profiler=profiler)
+            t5 = clock()
+            profiler.add('ball.update', t5 - t1)
+        else:
+            self.ball.update()
+            t2 = clock()
+            self.ball.collide_walls()
+            t3 = clock()
+            hit_brick = self.bricks.collision(self.ball)
+            t4 = clock()
+            self.ball.collide_paddle()
+            t5 = clock()
+            profiler.add('ball.update', t2 - t1)
+            profiler.add('collisions.walls', t3 - t2)
+            profiler.add('collisions.bricks', t4 - t3)
+            profiler.add('collisions.paddle', t5 - t4)
+            hits = [hit_brick] if hit_brick else []
+        if self.swarm is not None and self.swarm.n:
+            hits = hits + self.swarm.step(self.bricks, self.paddle)
+            t6 = clock()
+            profiler.add('multiballe', t6 - t5)
+            t5 = t6
+        self.end_tick(hits)
+        profiler.add('bricks.count', clock() - t5)
+        return hits
+
+    def end_tick(self, hits):
+        """
+        fin de tick: score des briques détruites, balle perdue, victoire
+        (une brique touchée plusieurs fois dans le tick, par la balle et le multiballe, ou deux fois
+        par la même balle, n'est comptée qu'une fois: valeur et bonus à sa destruction)
+        """
+        if hits:
+            counted = set()
+            for brick in hits:
+                index = brick.index
+                if not brick.alive and index not in counted:
+                    counted.add(index)
+                    self.score += brick.value
+                    if self.bricks.powers[index] == POWER_MULTIBALL:
+                        self.multiball()
+
+        #si balle tombée
+        if self.ball.y - self.ball.radius > C_HEIGHT:
+            if self.swarm is not None and self.swarm.n:
+                #une balle supplémentaire devient la balle principale
+                ball = self.ball
+                ball.x, ball.y, ball.vx, ball.vy = self.swarm.pop()
+            else:
+                self.lives -= 1
+                if self.lives > 0:
+                    self.serve()
+                else:
+                    self.status = LOST
+
+        #niveau suivant, ou victoire après le dernier
+        elif self.bricks.count() == 0:
+            if self.level + 1 < len(self.levels):
+                self.load_level(self.level + 1)
+            else:
+                self.status = WON
+
+    def run(self, max_ticks):
+        """Avance la partie jusqu'à sa fin ou jusqu'à max_ticks ticks. Retourne le nombre de ticks joués."""
+        start = self.ticks
+        while self.status == RUNNING and self.ticks - start < max_ticks:
+            self.step()
+        return self.ticks - start
+
+    def free_ticks(self, limit):
+        """
+        - nombre de ticks (au plus limit) pendant lesquels la balle vole sûrement en ligne droite:
+          aucun mur, aucune brique, et la balle reste au-dessus de la raquette
+        - 0 s'il faut jouer le prochain tick normalement (commande en attente, multiballe, chronométrage,
+          balle contre une brique ou au niveau de la raquette)
+        """
+        if (self.input_vel != self.paddle.vel or self.profiler is not None
+                or (self.swarm is not None and self.swarm.n)):
+            return 0
+        ball = self.ball
+        x, y, vx, vy, r = ball.x, ball.y, ball.vx, ball.vy, ball.radius
+        if self.bricks.sweep(x, y, 0.0, 0.0, r) is not None:
+            return 0
+        #premier contact possible (en ticks, réel): murs, plafond, dessus de la raquette, briques
+        t = math.inf
+        if vx < 0:
+            t = (x - r) / -vx
+        elif vx > 0:
+            t = (C_WIDTH - r - x) / vx
+        if vy < 0:
+            t = min(t, (y - r) / -vy)
+        elif vy > 0:
+            t = min(t, (self.paddle.y - self.paddle.height / 2 - r - y) / vy)
+        t = min(t, self.bricks.first_contact(x, y, vx, vy, r, min(t, limit)))
+        #le tick j (de j-1 à j) est sûr si j < t; marge pour les arrondis du cumul des déplacements
+        if t == math.inf:
+            return limit
+        return max(0, min(limit, math.ceil(t - FREE_MARGIN) - 1))
+
+    def coast(self, ticks):
+        """
+        joue ticks ticks de vol libre (voir free_ticks): la balle et la raquette avancent
+        par les mêmes additions qu'avec step(), sans recherche de collision
+        """
+        ball = self.ball
+        x, y, vx, vy = ball.x, ball.y, ball.vx, ball.vy
+        for _ in range(ticks):
+            x += vx
+            y += vy
+        ball.x, ball.y = x, y
+        paddle = self.paddle
+        if paddle.vel:
+            for _ in range(ticks):
+                before = paddle.x
+                paddle.move()
+                if paddle.x == before:  #contre un bord: ne bouge plus
+                    break
+        self.ticks += ticks
+
+    def fast_forward(self, max_ticks):
+        """
+        - même résultat que run(max_ticks), commande de la raquette fixée (rejeu entre deux commandes, analyse)
+        - les vols libres de la balle sont sautés d'un coup (coast), seuls les ticks proches
+          d'un contact (murs, briques, raquette, balle perdue) passent par step()
+        - retourne le nombre de ticks joués
+        """
+        start = self.ticks
+        while self.status == RUNNING and self.ticks - start < max_ticks:
+            free = self.free_ticks(max_ticks - (self.ticks - start))
+            if free:
+                self.coast(free)
+            else:
+                self.step()
+        return self.ticks - start
+
+
+class FixedStepClock:
+    """
+    Horloge de la boucle de jeu à pas fixe:
+    - mesure le temps réel écoulé et l'ajoute à un accumulateur
+    - advance() retourne le nombre de ticks de physique à jouer (1/tick_rate seconde chacun)
+    - render_due() indique si un dessin est dû (au plus render_rate par seconde)
+    - en cas de retard on rattrape les ticks (jusqu'à max_ticks par appel) et on saute des dessins
+    """
+    def __init__(self, tick_rate=TICK_RATE, render_rate=RENDER_RATE, max_ticks=MAX_FRAME_TICKS, clock=time.perf_counter):
+        self.tick_dt = 1.0 / tick_rate
+        self.render_dt = 1.0 / render_rate
+        self.max_ticks = max_ticks
+        self.clock = clock
+        self.dropped_ticks = 0    #ticks abandonnés (retard supérieur à max_ticks)
+        self.skipped_renders = 0  #dessins sautés pour rattraper la physique
+        self.start()
+
+    def start(self):
+        """(re)démarre l'horloge: à appeler au lancement et après une pause"""
+        self.last = self.clock()
+        self.accumulator = 0.0
+        self.next_render = self.last
+
+    def advance(self):
+        """ajoute le temps écoulé depuis le dernier appel et retourne le nombre de ticks à jouer"""
+        now = self.clock()
+        self.accumulator += now - self.last
+        self.last = now
+        ticks = int(self.accumulator / self.tick_dt)
+        self.accumulator -= ticks * self.tick_dt
+        if ticks > self.max_ticks:
+            #trop de retard (machine suspendue, fenêtre déplacée...): on ne rattrape pas tout
+            self.dropped_ticks += ticks - self.max_ticks
+            ticks = self.max_ticks
+        return ticks
+
+    def render_due(self):
+        """True si un dessin doit être fait maintenant (les dessins manqués sont comptés et sautés)"""
+        now = self.last
+        if now < self.next_render:
+            return False
+        late = int((now - self.next_render) / self.render_dt)
+        self.skipped_renders += late
+        self.next_render += (late + 1) * self.render_dt
+        return True
+
+    def delay_ms(self):
+        """délai (ms, au moins 1) avant le prochain tick ou le prochain dessin"""
+        until_tick = self.tick_dt - self.accumulator
+        until_render = self.next_render - self.clock()
+        return max(1, int(min(until_tick, until_render) * 1000))
@@ -0,0 +1,225 @@
+"""
+Multiballe du Casse-Brique (sans Tkinter, NumPy facultatif)
+
+Fonctionnalités :
+- BallSwarm : balles supplémentaires stockées en tableaux NumPy (x, y, vx, vy), préalloués pour MAX_BALLS balles
+- step() avance toutes les balles d'un coup, avec les règles de Ball (déplacement, murs, briques, raquette) :
+    - murs et raquette : opérations sur les tableaux entiers
+    - briques : la grille de BricksManager donne en une fois les couples (balle, brique) proches,
+      le test de chevauchement et le côté touché sont calculés en lot,
+      seuls les contacts trouvés sont appliqués un par un (points de vie, destruction)
+- les balles sorties par le bas sont retirées (les balles restantes restent rangées au début des tableaux)
+- sans NumPy (HAS_NUMPY faux), le bonus multiballe est simplement désactivé
+
+Limites : test de collision à l'arrivée (comme handle_collisions, pas de recherche continue),
+une balle ne touche qu'une brique par tick.
+
+Coding: UTF-8
+"""
+
+import math
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from moteur import Brick, C_WIDTH, C_HEIGHT
+
+MAX_BALLS = 1000        #balles supplémentaires au plus
+SPLIT = 2               #nouvelles balles créées par balle existante quand le bonus est pris
+SPLIT_ANGLE = 0.5       #écart maximal (radians) entre la direction d'une balle et celle de ses copies
+
+
+class BallSwarm:
+    """
+    Balles supplémentaires (même rayon et même vitesse que la balle principale):
+    - n balles actives, rangées dans x[:n], y[:n], vx[:n], vy[:n]
+    - add() ajoute des balles (dans la limite de capacity), pop() en retire la dernière
+    """
+    def __init__(self, radius, capacity=MAX_BALLS):
+        if not HAS_NUMPY:
+            raise RuntimeError("le mode multiballe demande NumPy (pip install numpy)")
+        self.radius = radius
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def add(self, x, y, vx, vy):
+        """ajoute une balle; retourne False si la réserve est pleine"""
+        if self.n == self.capacity:
+            return False
+        i = self.n
+        self.x[i], self.y[i], self.vx[i], self.vy[i] = x, y, vx, vy
+        self.n += 1
+        return True
+
+    def split(self, sources, rng, copies=SPLIT, spread=SPLIT_ANGLE):
+        """
+        - chaque balle de sources (liste de (x, y, vx, vy)) donne copies nouvelles balles au même endroit,
+          la direction tournée d'un angle tiré par rng (random.Random du moteur: partie reproductible)
+        - retourne le nombre de balles ajoutées
+        """
+        added = 0
+        for x, y, vx, vy in sources:
+            for _ in range(copies):
+                angle = rng.uniform(-spread, spread)
+                c, s = math.cos(angle), math.sin(angle)
+                nvx, nvy = vx * c - vy * s, vx * s + vy * c
+                #une balle qui part presque à l'horizontale mettrait trop longtemps à revenir
+                if abs(nvy) < 0.2 * abs(vy):
+                    nvy = math.copysign(0.2 * abs(vy), nvy or vy)
+                if not self.add(x, y, nvx, nvy):
+                    return added
+                added += 1
+        return added
+
+    def pop(self):
+        """retire la dernière balle et retourne (x, y, vx, vy)"""
+        self.n -= 1
+        i = self.n
+        return float(self.x[i]), float(self.y[i]), float(self.vx[i]), float(self.vy[i])
+
+    def clear(self):
+        self.n = 0
+
+    def balls(self):
+        """liste de (x, y, vx, vy) des balles actives"""
+        n = self.n
+        return list(zip(self.x[:n].tolist(), self.y[:n].tolist(), self.vx[:n].tolist(), self.vy[:n].tolist()))
+
+    def step(self, bricks, paddle):
+        """
+        - avance toutes les balles d'un tick: déplacement, murs, briques, raquette, sortie par le bas
+        - retourne la liste des briques détruites (vues Brick)
+        """
+        n = self.n
+        if n == 0:
+            return []
+        r = self.radius
+        x, y, vx, vy = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n]
+        x += vx
+        y += vy
+
+        #murs (même ordre que Ball.collide_walls)
+        left = x - r <= 0
+        right = ~left & (x + r >= C_WIDTH)
+        x[left] = r
+        x[right] = C_WIDTH - r
+        vx[left | right] *= -1
+        top = y - r <= 0
+        y[top] = r
+        vy[top] *= -1
+
+        destroyed = self.collide_bricks(bricks, x, y, vx, vy)
+
+        #raquette (Ball.collide_paddle)
+        px1 = paddle.x - paddle.width / 2
+        px2 = paddle.x + paddle.width / 2
+        py1 = paddle.y - paddle.height / 2
+        py2 = paddle.y + paddle.height / 2
+        bottom = y + r
+        on = (px1 <= x) & (x <= px2) & (py1 <= bottom) & (bottom <= py2) & (vy > 0)
+        y[on] = py1 - r
+        vy[on] *= -1
+
+        #balles perdues: on garde les autres au début des tableaux
+        keep = y - r <= C_HEIGHT
+        if not keep.all():
+            k = int(keep.sum())
+            for values in (self.x, self.y, self.vx, self.vy):
+                values[:k] = values[:n][keep]
+            self.n = k
+        return destroyed
+
+    def collide_bricks(self, bricks, x, y, vx, vy):
+        """
+        collisions balles-briques en lot, avec la règle de BricksManager.collision:
+        - carré de la balle contre rectangle de la brique (bords compris), brique de plus petit indice d'abord
+        - côté touché = plus petite pénétration (latéral: vx inversé, sinon vy)
+        """
+        if bricks.live == 0 or bricks.grid_cols == 0:
+            return []
+        r = self.radius
+        n = len(x)
+        cols, rows = bricks.grid_cols, bricks.grid_rows
+        cell_start = np.frombuffer(bricks.cell_start, dtype=np.intc)
+        cell_items = np.frombuffer(bricks.cell_items, dtype=np.intc)
+
+        #cellules couvertes par chaque balle (bornées à la grille, comme BricksManager.cell_range)
+        col1 = np.maximum(np.floor((x - r - bricks.grid_x) / bricks.cell_w).astype(np.intp), 0)
+        col2 = np.minimum(np.floor((x + r - bricks.grid_x) / bricks.cell_w).astype(np.intp), cols - 1)
+        row1 = np.maximum(np.floor((y - r - bricks.grid_y) / bricks.cell_h).astype(np.intp), 0)
+        row2 = np.minimum(np.floor((y + r - bricks.grid_y) / bricks.cell_h).astype(np.intp), rows - 1)
+        inside = (col1 <= col2) & (row1 <= row2)
+        if not inside.any():
+            return []
+        ball_ids = np.arange(n)
+        owners = []
+        cells = []
+        #un passage par décalage (colonne, rangée) dans le rectangle de cellules le plus grand
+        for dc in range(int((col2 - col1)[inside].max()) + 1):
+            for dr in range(int((row2 - row1)[inside].max()) + 1):
+                col, row = col1 + dc, row1 + dr
+                valid = inside & (col <= col2) & (row <= row2)
+                owners.append(ball_ids[valid])
+                cells.append(row[valid] * cols + col[valid])
+        owners = np.concatenate(owners)
+        cells = np.concatenate(cells)
+
+        #couples (balle, brique) de ces cellules, à partir du rangement compact de la grille
+        starts = cell_start[cells]
+        counts = cell_start[cells + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return []
+        pair_ball = np.repeat(owners, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_brick = cell_items[np.repeat(starts, counts) + offsets]
+
+        alive = np.frombuffer(bricks.alive, dtype=np.uint8)
+        xs = np.frombuffer(bricks.xs)
+        ys = np.frombuffer(bricks.ys)
+        ws = np.frombuffer(bricks.ws)
+        hs = np.frombuffer(bricks.hs)
+        bx, by = x[pair_ball], y[pair_ball]
+        left, top = xs[pair_brick], ys[pair_brick]
+        right, bottom = left + ws[pair_brick], top + hs[pair_brick]
+        touch = ((alive[pair_brick] != 0) & (bx + r >= left) & (bx - r <= right)
+                 & (by + r >= top) & (by - r <= bottom))
+        if not touch.any():
+            return []
+        pair_ball, pair_brick = pair_ball[touch], pair_brick[touch]
+        bx, by = bx[touch], by[touch]
+        left, right, top, bottom = left[touch], right[touch], top[touch], bottom[touch]
+
+        #par balle: la brique de plus petit indice (ordre de BricksManager.candidates)
+        order = np.lexsort((pair_brick, pair_ball))
+        first = order[np.unique(pair_ball[order], return_index=True)[1]]
+        hit_left = bx[first] + r - left[first]
+        hit_right = right[first] - (bx[first] - r)
+        hit_top = by[first] + r - top[first]
+        hit_bottom = bottom[first] - (by[first] - r)
+        smallest = np.minimum(np.minimum(hit_left, hit_right), np.minimum(hit_top, hit_bottom))
+        lateral = (smallest == hit_left) | (smallest == hit_right)
+
+        #application dans l'ordre des balles: une brique détruite par une balle ne renvoie plus les suivantes
+        destroyed = []
+        for ball, brick, side in zip(pair_ball[first].tolist(), pair_brick[first].tolist(), lateral.tolist()):
+            if not bricks.alive[brick]:
+                continue
+            if side:
+                vx[ball] = -vx[ball]
+            else:
+                vy[ball] = -vy[ball]
+            if bricks.hit(brick):
+                destroyed.append(Brick(bricks, brick))
+        return destroyed
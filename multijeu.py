@@ -0,0 +1,150 @@
+"""
+Plusieurs parties du Casse-Brique dans une seule fenêtre (un seul processus)
+
+Fonctionnalités :
+- SessionHost : une fenêtre Tk, une grille de parties (Game), chacune avec son canevas, ses boutons et son moteur
+- une seule horloge à pas fixe et un seul after() pour toutes les parties :
+  chaque appel joue les mêmes ticks pour chaque partie en cours, puis les dessine toutes ;
+  Tk ne redessine les canevas qu'une fois, au retour dans la boucle
+- un fil d'écriture et un historique des scores partagés ; les fichiers de chaque partie portent son numéro
+  (save_2.bin, derniere_partie_2.cbr...) ; une partie reprise est lue dans le fil d'écriture :
+  les sauvegardes et chargements d'une partie ne bloquent jamais les autres
+- écran partagé : chaque joueur a ses touches (KEYMAPS)
+- tableaux de démonstration (--demo) : raquette pilotée par une stratégie de lots.py,
+  la partie recommence seule quelques secondes après sa fin, avec une nouvelle graine (autre service)
+
+Utilisation :
+    python multijeu.py                          # 2 joueurs côte à côte (flèches / Q-D)
+    python multijeu.py --sessions 6 --columns 3 --demo anticipation
+
+Coding: UTF-8
+"""
+
+import argparse
+import tkinter as tk
+
+from moteur import FixedStepClock
+from sauvegarde import BackgroundWriter
+from historique import ScoreDB
+from final_version import Game, SCORES_FILE, LEGACY_SCORES_FILE
+
+#touches (gauche, droite, retour arrière) des joueurs, dans l'ordre des parties
+KEYMAPS = [("Left", "Right", "BackSpace"), ("q", "d", "a"), ("j", "l", "u"), ("KP_4", "KP_6", "KP_7")]
+DEMO_RESTART_MS = 3000      #pause entre deux parties d'un tableau de démonstration
+
+
+class SessionHost:
+    """
+    Hôte de plusieurs parties dans une fenêtre:
+    - add() crée une partie (Game(host=self)) et la place dans la grille
+    - wake() relance la boucle commune quand une partie démarre ou reprend; elle s'arrête
+      d'elle-même quand plus aucune partie ne tourne
+    - close() (bouton de fermeture de la fenêtre) quitte chaque partie (sauvegarde), puis attend le fil d'écriture
+    """
+    def __init__(self, columns=2, title="Casse-Brique"):
+        self.root = tk.Tk()
+        self.root.title(title)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.columns = columns
+        self.writer = BackgroundWriter()
+        self.scores = ScoreDB(SCORES_FILE)
+        self.writer.submit(self.scores.import_legacy, LEGACY_SCORES_FILE)
+        self.clock = FixedStepClock()
+        self.sessions = []
+        self.added = 0
+        self.after_id = None
+        self.closing = False
+        #tableaux de démonstration dont le redémarrage est déjà programmé
+        self.restarts = set()
+
+    def add(self, keys=None, autopilot=None):
+        """nouvelle partie dans la case suivante de la grille"""
+        row, column = divmod(self.added, self.columns)
+        self.added += 1
+        session = Game(host=self, slot=self.added, keys=keys, autopilot=autopilot)
+        session.panel.grid(row=row, column=column, padx=2, pady=2)
+        self.sessions.append(session)
+        return session
+
+    def wake(self):
+        if self.after_id is None and not self.closing:
+            #le temps passé sans partie en cours ne doit pas être rattrapé
+            self.clock.start()
+            self.after_id = self.root.after(1, self.update)
+
+    def update(self):
+        """une image pour toutes les parties: mêmes ticks pour chacune, dessins faits ensemble"""
+        self.after_id = None
+        skipped = self.clock.skipped_renders
+        ticks = self.clock.advance()
+        render = self.clock.render_due()
+        skipped = self.clock.skipped_renders - skipped
+        running = False
+        for session in self.sessions:
+            if session.running:
+                session.step(ticks, render, skipped)
+            if session.running:
+                running = True
+            elif session.autopilot is not None and session.end_text is not None and session not in self.restarts:
+                self.restarts.add(session)
+                self.root.after(DEMO_RESTART_MS, self.restart, session)
+        if running:
+            self.after_id = self.root.after(self.clock.delay_ms(), self.update)
+
+    def start_all(self):
+        for session in self.sessions:
+            session.start()
+
+    def restart(self, session):
+        self.restarts.discard(session)
+        if session in self.sessions:
+            session.restart()
+
+    def remove(self, session):
+        """(Game.quitter) la partie a quitté; la fenêtre se ferme avec la dernière"""
+        self.sessions.remove(session)
+        if not self.sessions:
+            self.close()
+
+    def close(self):
+        if self.closing:
+            return
+        self.closing = True
+        for session in list(self.sessions):
+            session.quitter()
+        #on attend la fin des écritures en cours avant de fermer
+        self.writer.submit(self.scores.close)
+        self.writer.close()
+        self.scores.close()
+        self.root.destroy()
+
+    def run(self):
+        self.root.mainloop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plusieurs parties du Casse-Brique dans une seule fenêtre")
+    parser.add_argument("--sessions", type=int, default=2, help="nombre de parties")
+    parser.add_argument("--columns", type=int, default=2, help="parties par rangée")
+    parser.add_argument("--demo", metavar="STRATÉGIE",
+                        help="tableaux de démonstration: raquette pilotée (suiveur, anticipation, module:fonction)")
+    args = parser.parse_args(argv)
+
+    host = SessionHost(columns=args.columns)
+    autopilot = None
+    if args.demo:
+        from lots import resolve_policy
+        autopilot = resolve_policy(args.demo)
+    for index in range(args.sessions):
+        if autopilot is not None:
+            host.add(keys=None, autopilot=autopilot)
+        else:
+            host.add(keys=KEYMAPS[index] if index < len(KEYMAPS) else None)
+    if autopilot is not None:
+        #les démonstrations démarrent seules, une fois leur moteur prêt (après la première image)
+        host.root.after(1, host.start_all)
+    host.run()
+
+
+if __name__ == "__main__":
+    main()
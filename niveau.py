@@ -0,0 +1,281 @@
+"""
+Niveaux du Casse-Brique (sans Tkinter)
+
+Fonctionnalités :
+- format texte des niveaux (dossier niveaux/) : couleur, valeur, points de vie et bonus par brique,
+  trous et briques placées librement (tableaux irréguliers)
+- compilation : tableaux des briques + grille de collisions (BricksManager.build_grid) déjà construits
+- cache binaire de la compilation, nommé d'après l'empreinte (sha256) du fichier texte :
+  un niveau déjà compilé est lu par mmap et recopié en bloc, sans refaire la construction
+- load_level(path) : niveau compilé (CompiledLevel) prêt pour BricksManager.load_level
+
+Format d'un niveau :
+    # commentaire (ligne commençant par #)
+    nom Classique
+    case 80 22                 # largeur et hauteur d'une case de la grille (pixels)
+    origine 0 60               # coin haut gauche de la grille
+    brique a #9b59b6 1 1       # symbole, couleur, valeur, points de vie
+    brique m #ecf0f1 1 1 multiballe   # (bonus libéré quand la brique est détruite)
+    grille                     # une ligne de texte par rangée, '.' ou espace = trou
+    aaaaaaaaaa
+    a.a.aa.a.a
+    fin
+    libre 100 300 160 22 a     # brique placée librement: x, y, largeur, hauteur, symbole
+
+(les commentaires en fin de ligne ne sont pas autorisés : ils sont montrés ici pour l'explication)
+
+Coding: UTF-8
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from moteur import BricksManager, POWER_NONE, POWER_MULTIBALL, C_WIDTH, C_HEIGHT
+from sauvegarde import atomic_write
+
+#niveaux livrés avec le jeu (à côté de ce fichier, quel que soit le dossier courant)
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "niveaux")
+CACHE_DIR = ".cache"        #sous-dossier du dossier du niveau
+HOLES = ". "
+#bonus possibles après les points de vie d'une brique
+POWERS = {"multiballe": POWER_MULTIBALL}
+
+#fichier compilé: en-tête puis tableaux (ordre natif de la machine, inclus dans l'empreinte)
+LEVEL_MAGIC = b'CBLV'
+LEVEL_VERSION = 2
+LEVEL_HEADER = struct.Struct('<4sH8I6d')
+#(nom, type) des tableaux par brique, dans l'ordre du fichier
+BRICK_ARRAYS = (('xs', 'd'), ('ys', 'd'), ('ws', 'd'), ('hs', 'd'),
+                ('values', 'i'), ('hp', 'i'), ('color_ids', 'H'), ('powers', 'B'))
+
+
+class CompiledLevel:
+    """
+    Niveau prêt à charger:
+    - tableaux des briques (xs, ys, ws, hs, values, hp, color_ids, powers) et palette
+    - grille de collisions (cell_start, cell_items, origine, taille des cellules)
+    """
+    def __init__(self, name, rows, cols, brick_width, brick_height):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.brick_width = brick_width
+        self.brick_height = brick_height
+        self.palette = []
+        for attr, typecode in BRICK_ARRAYS:
+            setattr(self, attr, array(typecode))
+        self.cell_w = brick_width
+        self.cell_h = brick_height
+        self.grid_x = self.grid_y = 0.0
+        self.grid_cols = self.grid_rows = 0
+        self.cell_start = array('i', [0])
+        self.cell_items = array('i')
+
+    def __len__(self):
+        return len(self.xs)
+
+
+def parse_level(text, path="<niveau>"):
+    """
+    - lit le texte d'un niveau
+    - retourne (nom, (largeur, hauteur) des cases, nombre de rangées et de colonnes, liste des briques)
+      une brique est (x, y, largeur, hauteur, couleur, valeur, points de vie, bonus)
+    - une erreur de format lève ValueError avec le numéro de ligne,
+      de même qu'une brique qui sort du canevas (0..C_WIDTH x 0..C_HEIGHT: la balle ne l'atteindrait jamais)
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    cell = (80.0, 22.0)
+    origin = (0.0, 60.0)
+    kinds = {}
+    grid = []
+    free = []
+    in_grid = False
+
+    for number, line in enumerate(text.splitlines(), 1):
+        def error(message):
+            return ValueError(f"{path}:{number}: {message}")
+        if in_grid:
+            if line.strip() == "fin":
+                in_grid = False
+            else:
+                grid.append((number, line))
+            continue
+        words = line.split()
+        if not words or words[0].startswith("#"):
+            continue
+        key, args = words[0], words[1:]
+        try:
+            if key == "nom":
+                name = " ".join(args)
+            elif key == "case":
+                cell = (float(args[0]), float(args[1]))
+            elif key == "origine":
+                origin = (float(args[0]), float(args[1]))
+            elif key == "brique":
+                symbol, color, value, hp = args[:4]
+                if len(symbol) != 1 or symbol in HOLES:
+                    raise error(f"symbole de brique invalide: {symbol!r}")
+                if len(args) > 5 or (len(args) == 5 and args[4] not in POWERS):
+                    raise error(f"bonus inconnu: {' '.join(args[4:])!r} (bonus possibles: {', '.join(POWERS)})")
+                power = POWERS[args[4]] if len(args) == 5 else POWER_NONE
+                kinds[symbol] = (color, int(value), int(hp), power)
+            elif key == "grille":
+                in_grid = True
+            elif key == "libre":
+                x, y, w, h, symbol = args
+                free.append((number, float(x), float(y), float(w), float(h), symbol))
+            else:
+                raise error(f"mot-clé inconnu: {key!r}")
+        except (IndexError, ValueError) as e:
+            if str(e).startswith(path):
+                raise
+            raise error(f"ligne '{line.strip()}' invalide ({e})")
+
+    bricks = []
+    w, h = cell
+    for row, (number, line) in enumerate(grid):
+        for col, symbol in enumerate(line):
+            if symbol in HOLES:
+                continue
+            if symbol not in kinds:
+                raise ValueError(f"{path}:{number}: symbole {symbol!r} non déclaré (mot-clé brique)")
+            color, value, hp, power = kinds[symbol]
+            x, y = origin[0] + col * w, origin[1] + row * h
+            check_bounds(path, number, x, y, w, h)
+            bricks.append((x, y, w, h, color, value, hp, power))
+    for number, x, y, bw, bh, symbol in free:
+        if symbol not in kinds:
+            raise ValueError(f"{path}:{number}: symbole {symbol!r} non déclaré (mot-clé brique)")
+        check_bounds(path, number, x, y, bw, bh)
+        color, value, hp, power = kinds[symbol]
+        bricks.append((x, y, bw, bh, color, value, hp, power))
+    cols = max((len(line.rstrip()) for _, line in grid), default=0)
+    return name, cell, len(grid), cols, bricks
+
+
+def check_bounds(path, number, x, y, w, h):
+    """ValueError si la brique (x, y, w, h) de la ligne number n'est pas entièrement dans le canevas"""
+    if w <= 0 or h <= 0 or x < 0 or y < 0 or x + w > C_WIDTH or y + h > C_HEIGHT:
+        raise ValueError(f"{path}:{number}: brique ({x:g}, {y:g}, {w:g}x{h:g}) hors du canevas "
+                         f"(0..{C_WIDTH} x 0..{C_HEIGHT})")
+
+
+def compile_level(text, path="<niveau>"):
+    """texte d'un niveau -> CompiledLevel (briques ajoutées et grille construite par BricksManager)"""
+    name, (w, h), rows, cols, bricks = parse_level(text, path)
+    #gestionnaire vide (0 rangée) rempli avec les briques du niveau
+    manager = BricksManager(rows=0, cols=1, brick_height=h)
+    manager.brick_width = w
+    for x, y, bw, bh, color, value, hp, power in bricks:
+        manager.add_brick(x, y, bw, bh, color, value, hp, power)
+    manager.build_grid()
+
+    level = CompiledLevel(name, rows, cols, w, h)
+    for attr, typecode in BRICK_ARRAYS + (('cell_start', 'i'), ('cell_items', 'i')):
+        setattr(level, attr, array(typecode, getattr(manager, attr)))
+    level.palette = list(manager.palette)
+    level.cell_w, level.cell_h = manager.cell_w, manager.cell_h
+    level.grid_x, level.grid_y = manager.grid_x, manager.grid_y
+    level.grid_cols, level.grid_rows = manager.grid_cols, manager.grid_rows
+    return level
+
+
+def encode_level(level):
+    """CompiledLevel -> contenu du fichier de cache (bytes)"""
+    extra = json.dumps({"name": level.name, "palette": level.palette}).encode('utf-8')
+    header = LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, len(level), len(level.cell_start), len(level.cell_items),
+                               len(extra), level.rows, level.cols, level.grid_cols, level.grid_rows,
+                               level.brick_width, level.brick_height, level.cell_w, level.cell_h,
+                               level.grid_x, level.grid_y)
+    parts = [header]
+    parts += [getattr(level, attr).tobytes() for attr, _ in BRICK_ARRAYS]
+    parts += [level.cell_start.tobytes(), level.cell_items.tobytes(), extra]
+    return b''.join(parts)
+
+
+def decode_level(data):
+    """contenu d'un fichier de cache (bytes, mmap...) -> CompiledLevel (tableaux recopiés en bloc)"""
+    (magic, version, n, starts, items, extra_size, rows, cols, grid_cols, grid_rows,
+     brick_width, brick_height, cell_w, cell_h, grid_x, grid_y) = LEVEL_HEADER.unpack_from(data, 0)
+    if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+        raise ValueError("fichier de niveau compilé invalide")
+    pos = LEVEL_HEADER.size
+
+    def take(typecode, count):
+        nonlocal pos
+        values = array(typecode)
+        end = pos + values.itemsize * count
+        if end > len(view):
+            raise ValueError("fichier de niveau compilé tronqué")
+        values.frombytes(view[pos:end])
+        pos = end
+        return values
+
+    level = CompiledLevel("", rows, cols, brick_width, brick_height)
+    with memoryview(data) as view:
+        for attr, typecode in BRICK_ARRAYS:
+            setattr(level, attr, take(typecode, n))
+        level.cell_start = take('i', starts)
+        level.cell_items = take('i', items)
+        extra = json.loads(bytes(view[pos:pos + extra_size]).decode('utf-8'))
+    level.name = extra["name"]
+    level.palette = extra["palette"]
+    level.cell_w, level.cell_h = cell_w, cell_h
+    level.grid_x, level.grid_y = grid_x, grid_y
+    level.grid_cols, level.grid_rows = grid_cols, grid_rows
+    return level
+
+
+def level_key(text):
+    """empreinte d'un niveau: contenu du fichier + version du format compilé + ordre des octets"""
+    digest = hashlib.sha256(text.encode('utf-8'))
+    digest.update(f"{LEVEL_VERSION} {sys.byteorder}".encode('ascii'))
+    return digest.hexdigest()
+
+
+def cache_path(path, key):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR, key + ".cbl")
+
+
+def load_level(path):
+    """
+    - niveau compilé du fichier path
+    - lu dans le cache s'il y est (fichier projeté en mémoire), sinon compilé puis mis en cache
+    - un cache illisible est ignoré (le niveau est recompilé)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    cached = cache_path(path, level_key(text))
+    if os.path.exists(cached):
+        try:
+            with open(cached, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return decode_level(data)
+        except (ValueError, struct.error, OSError):
+            pass
+
+    level = compile_level(text, path)
+    try:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        atomic_write(cached, encode_level(level))
+    except OSError as e:
+        print(f"Niveau {path}: cache non écrit ({e})")
+    return level
+
+
+def level_files(folder=LEVEL_DIR):
+    """fichiers de niveau (*.txt) du dossier, par ordre alphabétique"""
+    if not os.path.isdir(folder):
+        return []
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder)) if name.endswith(".txt")]
+
+
+if __name__ == "__main__":
+    #python niveau.py niveaux/*.txt : compile (et met en cache) les niveaux donnés
+    for name in sys.argv[1:] or level_files():
+        compiled = load_level(name)
+        print(f"{name}: {compiled.name}, {len(compiled)} briques, grille {compiled.grid_cols}x{compiled.grid_rows}")
@@ -0,0 +1,182 @@
+"""
+Enregistrement et rejeu des parties du Casse-Brique (sans Tkinter)
+
+Fonctionnalités :
+- InputRecorder : enregistre les commandes de la raquette avec le numéro du tick où elles s'appliquent
+- fichier de rejeu compact : en-tête compressé (paramètres, graine, état initial) + 12 octets par commande
+  + résultat final (ticks, score, vies, empreinte du masque des briques)
+- replay() : rejoue la partie sans fenêtre, aussi vite que possible, et vérifie le résultat;
+  entre deux commandes la raquette garde sa vitesse : la partie avance par Engine.fast_forward
+  (vols libres de la balle sautés d'un coup)
+
+Utilisation : python rejeu.py partie.cbr
+              python rejeu.py --ticks partie.cbr     # tick par tick (Engine.step), pour comparer
+
+Coding: UTF-8
+"""
+
+import base64
+import json
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from moteur import Engine, RUNNING
+
+MAGIC = b'CBRP'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')      #magic, version, taille de l'en-tête (JSON compressé par zlib)
+RECORD = struct.Struct('<Id')        #tick, vitesse de la raquette
+END = struct.Struct('<IIiiI')        #END_TICK, ticks, score, vies, crc32 du masque
+END_TICK = 0xFFFFFFFF
+
+
+def encode_state(state):
+    """état de Engine.get_state() -> dictionnaire JSON (bytes en base64)"""
+    state = dict(state)
+    state["bricks"] = base64.b64encode(state["bricks"]).decode('ascii')
+    state["hp"] = base64.b64encode(state["hp"]).decode('ascii')
+    return state
+
+
+def decode_state(state):
+    """inverse de encode_state()"""
+    state = dict(state)
+    state["bricks"] = base64.b64decode(state["bricks"])
+    state["hp"] = base64.b64decode(state["hp"])
+    return state
+
+
+def mask_crc(engine):
+    """empreinte du masque des briques (comparaison du résultat final)"""
+    return zlib.crc32(engine.bricks.alive)
+
+
+class InputRecorder:
+    """
+    - garde l'état initial de la partie au moment de sa création
+    - record(tick, vitesse) est appelé par Engine.apply_input
+    - snapshot() copie les commandes et le résultat actuel du moteur (Replay, à écrire par Replay.save)
+    - save(path) écrit directement le fichier de rejeu
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.params = dict(engine.params)
+        self.initial = encode_state(engine.get_state())
+        self.ticks = array('I')
+        self.speeds = array('d')
+
+    def record(self, tick, speed):
+        self.ticks.append(tick)
+        self.speeds.append(speed)
+
+    def snapshot(self):
+        """
+        copie figée de l'enregistrement, à prendre dans le fil du jeu:
+        elle peut être écrite par un autre fil pendant que la partie continue
+        """
+        engine = self.engine
+        final = {"ticks": engine.ticks, "score": engine.score, "lives": engine.lives, "crc": mask_crc(engine)}
+        return Replay(self.params, self.initial, array('I', self.ticks), array('d', self.speeds), final)
+
+    def save(self, path):
+        self.snapshot().save(path)
+
+
+class Replay:
+    """contenu d'un fichier de rejeu: params, initial, ticks/speeds (commandes), final"""
+    def __init__(self, params, initial, ticks, speeds, final):
+        self.params = params
+        self.initial = initial
+        self.ticks = ticks
+        self.speeds = speeds
+        self.final = final  #dictionnaire ticks, score, lives, crc
+
+    def save(self, path):
+        """écrit l'en-tête, les commandes et le résultat final"""
+        header = zlib.compress(json.dumps({"params": self.params, "initial": self.initial}).encode('utf-8'))
+        final = self.final
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            for tick, speed in zip(self.ticks, self.speeds):
+                f.write(RECORD.pack(tick, speed))
+            f.write(END.pack(END_TICK, final["ticks"], final["score"], final["lives"], final["crc"]))
+
+
+def load_replay(path):
+    """lit un fichier de rejeu (ValueError si le fichier n'en est pas un)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, size = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: fichier de rejeu invalide")
+    offset = HEADER.size
+    header = json.loads(zlib.decompress(data[offset:offset + size]).decode('utf-8'))
+    offset += size
+
+    ticks = array('I')
+    speeds = array('d')
+    final = None
+    while offset + RECORD.size <= len(data):
+        tick, = struct.unpack_from('<I', data, offset)
+        if tick == END_TICK:
+            _, n, score, lives, crc = END.unpack_from(data, offset)
+            final = {"ticks": n, "score": score, "lives": lives, "crc": crc}
+            break
+        tick, speed = RECORD.unpack_from(data, offset)
+        ticks.append(tick)
+        speeds.append(speed)
+        offset += RECORD.size
+    if final is None:
+        raise ValueError(f"{path}: fichier de rejeu incomplet")
+    params = header["params"]
+    #enregistrements d'avant le service tiré au hasard: toujours la diagonale à droite
+    params.setdefault("random_serve", False)
+    return Replay(params, decode_state(header["initial"]), ticks, speeds, final)
+
+
+def replay(path, verify=True, fast=True):
+    """
+    - rejoue le fichier sans fenêtre et retourne le moteur dans son état final
+    - verify=True: ValueError si ticks, score, vies ou masque des briques diffèrent de l'enregistrement
+    - fast=True: avance rapide entre deux commandes (Engine.fast_forward), sinon tick par tick
+    """
+    rec = load_replay(path)
+    engine = Engine(**rec.params)
+    engine.set_state(rec.initial)
+    advance = engine.fast_forward if fast else engine.run
+    ticks, speeds = rec.ticks, rec.speeds
+    last = rec.final["ticks"]
+    i = 0
+    n = len(ticks)
+    while engine.ticks < last and engine.status == RUNNING:
+        #commandes de ce tick (appliquées au début de step, comme pendant la partie)
+        while i < n and ticks[i] <= engine.ticks:
+            engine.set_paddle_speed(speeds[i])
+            i += 1
+        #jusqu'à la prochaine commande
+        advance(min(ticks[i] if i < n else last, last) - engine.ticks)
+
+    if verify:
+        result = {"ticks": engine.ticks, "score": engine.score, "lives": engine.lives, "crc": mask_crc(engine)}
+        if result != rec.final:
+            raise ValueError(f"rejeu différent de l'enregistrement: {result} != {rec.final}")
+    return engine
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    fast = "--ticks" not in args
+    if not fast:
+        args.remove("--ticks")
+    if len(args) != 1:
+        print("usage: python rejeu.py [--ticks] fichier_de_rejeu")
+        sys.exit(2)
+    start = time.perf_counter()
+    engine = replay(args[0], fast=fast)
+    elapsed = time.perf_counter() - start
+    print(f"{engine.ticks} ticks rejoués en {elapsed:.3f} s ({engine.ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    print(f"score {engine.score}, vies {engine.lives}, briques restantes {engine.bricks.count()}")
@@ -0,0 +1,176 @@
+"""
+Retour en arrière du Casse-Brique (sans Tkinter)
+
+Fonctionnalités :
+- RewindBuffer : les dernières secondes de jeu, une image de l'état par tick, dans des tableaux alloués une fois
+  (rien n'est créé pendant la partie, mémoire bornée)
+    - par tick : balle (x, y, vx, vy), raquette (x, vitesse), score, vies, numéro du tick
+    - briques : journal circulaire des coups (indice de la brique, points de vie avant le coup),
+      rempli par BricksManager.hit
+- seek(k) : remet le moteur dans l'état du tick k (en arrière ou en avant), en ne touchant que les briques
+  changées entre les deux
+- rewind(ticks) : annule les derniers ticks (la suite est oubliée)
+- kill-cam : seek() vers le début des dernières secondes, puis tick par tick jusqu'au présent
+
+Limites : l'historique repart de zéro à chaque changement de niveau ;
+les balles du multiballe ne sont pas gardées (un retour en arrière les retire).
+
+Coding: UTF-8
+"""
+
+from array import array
+
+from moteur import RUNNING, LOST, WON
+
+REWIND_SECONDS = 10     #durée gardée
+CHANGES_PER_TICK = 4    #coups de brique gardés par tick en moyenne (au-delà, les plus vieux ticks sont perdus)
+
+
+class RewindBuffer:
+    """
+    Historique circulaire des capacity derniers ticks d'un moteur:
+    - record() après chaque Engine.step() (et une fois au départ)
+    - les numéros de tick k sont absolus (0 = premier record() depuis clear()),
+      seuls oldest() <= k < count sont encore disponibles
+    - position: tick dont l'état est celui du moteur (count - 1 pendant la partie)
+    """
+    def __init__(self, engine, seconds=REWIND_SECONDS, changes_per_tick=CHANGES_PER_TICK):
+        self.engine = engine
+        self.capacity = int(seconds * engine.params["tick_rate"]) + 1
+        capacity = self.capacity
+        self.tick = array('q', bytes(8 * capacity))
+        self.ball_x = array('d', bytes(8 * capacity))
+        self.ball_y = array('d', bytes(8 * capacity))
+        self.ball_vx = array('d', bytes(8 * capacity))
+        self.ball_vy = array('d', bytes(8 * capacity))
+        self.paddle_x = array('d', bytes(8 * capacity))
+        self.paddle_vel = array('d', bytes(8 * capacity))
+        self.score = array('q', bytes(8 * capacity))
+        self.lives = array('i', bytes(4 * capacity))
+        #nombre total de coups de brique au moment de chaque record()
+        self.change_at = array('q', bytes(8 * capacity))
+        #journal des coups: brique et points de vie avant le coup
+        self.change_capacity = capacity * changes_per_tick
+        self.change_index = array('i', bytes(4 * self.change_capacity))
+        self.change_hp = array('i', bytes(4 * self.change_capacity))
+        self.clear()
+        engine.bricks.journal = self
+
+    def clear(self):
+        """oublie tout l'historique (nouvelle partie, partie chargée, nouveau niveau)"""
+        self.count = 0
+        self.changes = 0
+        #plus vieux tick et plus vieux coup encore gardés (les suivants ont pris leur place dans l'anneau)
+        self.first = 0
+        self.first_change = 0
+        self.position = -1
+        self.level = self.engine.level
+
+    def brick_hit(self, index, hp):
+        """(appelé par BricksManager.hit) la brique index va perdre un point de vie, elle en avait hp"""
+        slot = self.changes % self.change_capacity
+        self.change_index[slot] = index
+        self.change_hp[slot] = hp
+        self.changes += 1
+        if self.changes - self.first_change > self.change_capacity:
+            self.first_change += 1
+
+    def record(self):
+        """garde l'état actuel du moteur (après un tick)"""
+        engine = self.engine
+        if engine.level != self.level:
+            #les coups du journal concernent l'ancien niveau
+            self.clear()
+        slot = self.count % self.capacity
+        ball, paddle = engine.ball, engine.paddle
+        self.tick[slot] = engine.ticks
+        self.ball_x[slot] = ball.x
+        self.ball_y[slot] = ball.y
+        self.ball_vx[slot] = ball.vx
+        self.ball_vy[slot] = ball.vy
+        self.paddle_x[slot] = paddle.x
+        self.paddle_vel[slot] = paddle.vel
+        self.score[slot] = engine.score
+        self.lives[slot] = engine.lives
+        self.change_at[slot] = self.changes
+        self.count += 1
+        if self.count - self.first > self.capacity:
+            self.first += 1
+        self.position = self.count - 1
+
+    def oldest(self):
+        """plus vieux tick disponible: dans l'anneau, et dont les coups de brique suivants sont tous gardés"""
+        low = self.first
+        high = self.count
+        #change_at croît avec k: recherche dichotomique du premier tick assez récent
+        while low < high:
+            mid = (low + high) // 2
+            if self.change_at[mid % self.capacity] >= self.first_change:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    def seek(self, k):
+        """
+        remet le moteur dans l'état du tick k (oldest() <= k < count):
+        seules les briques touchées entre la position actuelle et k sont modifiées
+        """
+        if not self.oldest() <= k < self.count:
+            raise IndexError(f"tick {k} hors de l'historique")
+        engine = self.engine
+        bricks = engine.bricks
+        alive, hp = bricks.alive, bricks.hp
+        start = self.change_at[self.position % self.capacity]
+        end = self.change_at[k % self.capacity]
+        for change in range(start - 1, end - 1, -1):
+            #en arrière: on rend à la brique ses points de vie d'avant le coup
+            slot = change % self.change_capacity
+            index = self.change_index[slot]
+            if alive[index]:
+                hp[index] = self.change_hp[slot]
+            else:
+                bricks.revive(index, self.change_hp[slot])
+        for change in range(start, end):
+            #en avant: le même coup à nouveau (sans repasser par hit(), qui l'ajouterait au journal)
+            slot = change % self.change_capacity
+            index = self.change_index[slot]
+            hp[index] = self.change_hp[slot] - 1
+            if hp[index] <= 0:
+                bricks.destroy(index)
+
+        slot = k % self.capacity
+        ball, paddle = engine.ball, engine.paddle
+        engine.ticks = self.tick[slot]
+        ball.x = self.ball_x[slot]
+        ball.y = self.ball_y[slot]
+        ball.vx = self.ball_vx[slot]
+        ball.vy = self.ball_vy[slot]
+        paddle.x = self.paddle_x[slot]
+        paddle.vel = engine.input_vel = self.paddle_vel[slot]
+        engine.score = self.score[slot]
+        engine.lives = self.lives[slot]
+        if engine.lives <= 0:
+            engine.status = LOST
+        elif bricks.count() == 0:
+            engine.status = WON
+        else:
+            engine.status = RUNNING
+        if engine.swarm is not None:
+            engine.swarm.clear()
+        self.position = k
+
+    def rewind(self, ticks):
+        """
+        - revient ticks ticks en arrière (au plus jusqu'à oldest()) et oublie la suite
+          (ses places dans les anneaux restent perdues: oldest() ne recule pas)
+        - retourne le nombre de ticks annulés
+        """
+        if self.count == 0:
+            return 0
+        k = max(self.oldest(), self.position - ticks)
+        done = self.position - k
+        self.seek(k)
+        self.count = k + 1
+        self.changes = self.change_at[k % self.capacity]
+        return done
@@ -0,0 +1,473 @@
+"""
+Sauvegarde des parties du Casse-Brique (sans Tkinter)
+
+Fonctionnalités :
+- format binaire versionné (save_binary / load_binary) :
+    - en-tête fixe : signature, version, score, vies, raquette et balle en flottants
+    - masque des briques en champ de bits (1 bit par brique), points de vie si besoin
+    - chargement par mmap, briques restaurées en bloc
+- save_json / load_json : ancien format save.json (score, vies, raquette, balle, briques), toujours lisible
+- load_save : reconnaît le format d'un fichier (binaire ou JSON) et le charge
+- atomic_write : écriture dans un fichier temporaire puis renommage (jamais de fichier à moitié écrit)
+- BackgroundWriter : fil d'écriture qui exécute les sauvegardes hors du fil Tk, dans l'ordre
+- AutoSaver : sauvegarde automatique à intervalle régulier, incrémentale
+    - une sauvegarde complète au format binaire (save.bin, CBSV version 2) sert de base
+      (un ancien save.json reste lisible comme base)
+    - ensuite seules les différences sont ajoutées au journal (save.journal) :
+      briques détruites/revenues, score, vies, raquette, balle
+    - le journal est réintégré dans une nouvelle base tous les AUTOSAVE_COMPACT ajouts
+- load_autosave : recharge la base puis rejoue le journal
+
+Coding: UTF-8
+"""
+
+import json
+import mmap
+import os
+import queue
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+
+AUTOSAVE_INTERVAL = 5.0   #secondes entre deux sauvegardes automatiques
+AUTOSAVE_COMPACT = 50     #ajouts au journal avant de réécrire une sauvegarde complète
+
+#format binaire (petit-boutiste):
+#signature, version, drapeaux, seq, score, vies, nombre de briques, raquette x, balle x, y, vx, vy
+#puis (version >= 2) le numéro du niveau
+#puis (nombre + 7) // 8 octets de masque (bit de poids fort = première brique),
+#puis, si drapeaux & FLAG_HP, les points de vie ('i', 4 octets par brique, petit-boutistes eux aussi)
+SAVE_MAGIC = b'CBSV'
+SAVE_VERSION = 2
+SAVE_HEADER = struct.Struct('<4sHHIiiIddddd')
+SAVE_LEVEL = struct.Struct('<I')
+FLAG_HP = 1
+
+#conversion masque (un octet 0/1 par brique) <-> champ de bits, par paquets de 8 briques
+#(et champ de bits -> points de vie 0/1 au format de array('i'))
+PACK_BITS = {}
+UNPACK_BITS = []
+UNPACK_HP = []
+for byte in range(256):
+    bits = bytes((byte >> (7 - k)) & 1 for k in range(8))
+    PACK_BITS[bits] = byte
+    UNPACK_BITS.append(bits)
+    UNPACK_HP.append(array('i', list(bits)).tobytes())
+del byte, bits
+
+
+def pack_mask(mask):
+    """masque (octets 0/1) -> champ de bits"""
+    mask = bytes(mask) + bytes(-len(mask) % 8)
+    pack = PACK_BITS
+    return bytes([pack[mask[i:i + 8]] for i in range(0, len(mask), 8)])
+
+
+def unpack_mask(bits, count):
+    """champ de bits -> masque de count octets 0/1"""
+    return bytearray(b''.join([UNPACK_BITS[byte] for byte in bits])[:count])
+
+
+def unpack_hp(bits, count):
+    """champ de bits -> points de vie (array('i')): 1 par brique vivante, 0 sinon"""
+    hp = array('i')
+    hp.frombytes(b''.join([UNPACK_HP[byte] for byte in bits]))
+    del hp[count:]
+    return hp
+
+
+def state_to_json(state, seq=0):
+    """
+    état de Engine.get_state() -> dictionnaire du format save.json (+ numéro de sauvegarde seq)
+    (points de vie seulement si une brique en a plus d'un, comme pour le format binaire)
+    """
+    data = {
+        "score": state["score"],
+        "lives": state["lives"],
+        "paddle": {"x": state["paddle"]["x"]},
+        "ball": dict(state["ball"]),
+        "bricks": [bool(alive) for alive in state["bricks"]],
+        "level": state.get("level", 0),
+        "seq": seq,
+    }
+    hp = array('i', state["hp"])
+    if hp and max(hp) > 1:
+        data["hp"] = hp.tolist()
+    return data
+
+
+def select_level(engine, level):
+    """charge le niveau de la sauvegarde s'il n'est pas celui du moteur (avant de restaurer les briques)"""
+    if level != getattr(engine, "level", 0):
+        engine.load_level(level)
+
+
+def apply_json(engine, state, mask):
+    """recopie score, vies, raquette et balle d'un dictionnaire save.json dans le moteur; mask reçoit les briques"""
+    engine.score = state["score"]
+    engine.lives = state["lives"]
+
+    engine.paddle.x = state["paddle"]["x"]
+
+    engine.ball.x = state["ball"]["x"]
+    engine.ball.y = state["ball"]["y"]
+    engine.ball.vx = state["ball"]["vx"]
+    engine.ball.vy = state["ball"]["vy"]
+
+    if "bricks" in state:
+        mask[:len(state["bricks"])] = bytes(bool(alive) for alive in state["bricks"][:len(mask)])
+
+
+def json_hp(state, mask):
+    """points de vie d'une sauvegarde JSON (sans liste "hp": 1 par brique vivante; None si autre tableau)"""
+    if "hp" not in state:
+        return array('i', array('B', mask))
+    if len(state["hp"]) != len(mask):
+        return None
+    return array('i', state["hp"])
+
+
+def atomic_write(path, data):
+    """
+    écrit data (str ou bytes) dans path de façon atomique:
+    fichier temporaire du même dossier, fsync, puis os.replace
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    fd, temp = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+def encode_binary(state, seq=0):
+    """état de Engine.get_state() -> sauvegarde binaire (bytes)"""
+    mask = state["bricks"]
+    ball = state["ball"]
+    #points de vie écrits seulement si une brique en a plus d'un (sinon: 1 par brique vivante)
+    hp = array('i', state["hp"])
+    flags = FLAG_HP if hp and max(hp) > 1 else 0
+    header = SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, flags, seq, state["score"], state["lives"], len(mask),
+                              state["paddle"]["x"], ball["x"], ball["y"], ball["vx"], ball["vy"])
+    level = SAVE_LEVEL.pack(state.get("level", 0))
+    if flags & FLAG_HP and sys.byteorder == 'big':
+        #get_state() donne les points de vie dans l'ordre de la machine
+        hp.byteswap()
+    return b''.join((header, level, pack_mask(mask), hp.tobytes() if flags & FLAG_HP else b''))
+
+
+def read_binary(engine, data):
+    """
+    - recopie dans le moteur une sauvegarde binaire (bytes, mmap...), en chargeant d'abord son niveau
+    - retourne (seq, masque des briques, points de vie: bytes, array ou None si le tableau n'a pas la même taille)
+    """
+    if len(data) < SAVE_HEADER.size:
+        raise ValueError("sauvegarde binaire tronquée")
+    (magic, version, flags, seq, score, lives, count,
+     paddle_x, ball_x, ball_y, ball_vx, ball_vy) = SAVE_HEADER.unpack_from(data, 0)
+    if magic != SAVE_MAGIC:
+        raise ValueError("ce n'est pas une sauvegarde binaire")
+    if version > SAVE_VERSION:
+        raise ValueError(f"version de sauvegarde {version} inconnue (version gérée: {SAVE_VERSION})")
+    start = SAVE_HEADER.size
+    level = 0
+    if version >= 2:
+        if len(data) < start + SAVE_LEVEL.size:
+            raise ValueError("sauvegarde binaire tronquée")
+        level, = SAVE_LEVEL.unpack_from(data, start)
+        start += SAVE_LEVEL.size
+    end = start + (count + 7) // 8
+    hp_end = end + 4 * count if flags & FLAG_HP else end
+    if len(data) < hp_end:
+        raise ValueError("sauvegarde binaire tronquée")
+
+    select_level(engine, level)
+    mask = bytearray(engine.bricks.alive)
+    engine.score = score
+    engine.lives = lives
+    engine.paddle.x = paddle_x
+    engine.ball.x, engine.ball.y = ball_x, ball_y
+    engine.ball.vx, engine.ball.vy = ball_vx, ball_vy
+
+    #un tableau d'une autre taille est recopié sur la partie commune, comme pour le JSON
+    bits = data[start:end]
+    n = min(count, len(mask))
+    mask[:n] = unpack_mask(bits, count)[:n]
+    hp = None
+    if count == len(mask):
+        if flags & FLAG_HP:
+            hp = array('i', bytes(data[end:hp_end]))
+            if sys.byteorder == 'big':
+                hp.byteswap()
+        else:
+            hp = unpack_hp(bits, count)
+    return seq, mask, hp
+
+
+def is_binary(path):
+    """vrai si path commence par la signature du format binaire"""
+    with open(path, "rb") as f:
+        return f.read(len(SAVE_MAGIC)) == SAVE_MAGIC
+
+
+def save_binary(engine, path):
+    """Sauvegarde l'état actuel du moteur au format binaire."""
+    atomic_write(path, encode_binary(engine.get_state()))
+
+
+def load_binary(engine, path):
+    """Charge une sauvegarde binaire (fichier projeté en mémoire, briques restaurées en bloc)."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        seq, mask, hp = read_binary(engine, data)
+    engine.bricks.set_alive_mask(mask, hp)
+    return seq
+
+
+def read_base(engine, path):
+    """charge une base (binaire ou JSON) dans le moteur; retourne (seq, masque des briques, points de vie ou None)"""
+    if is_binary(path):
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return read_binary(engine, data)
+    with open(path, "r") as f:
+        state = json.load(f)
+    select_level(engine, state.get("level", 0))
+    mask = bytearray(engine.bricks.alive)
+    apply_json(engine, state, mask)
+    return state.get("seq", 0), mask, json_hp(state, mask)
+
+
+def load_save(engine, path):
+    """Charge une sauvegarde au format binaire ou JSON (reconnu par sa signature)."""
+    if is_binary(path):
+        return load_binary(engine, path)
+    return load_json(engine, path).get("seq", 0)
+
+
+def save_json(engine, path):
+    """Sauvegarde l'état actuel du moteur dans un fichier JSON."""
+    atomic_write(path, json.dumps(state_to_json(engine.get_state())))
+
+
+def load_json(engine, path):
+    """Charge dans le moteur une sauvegarde JSON (les briques sont restaurées en bloc)."""
+    with open(path, "r") as f:
+        state = json.load(f)
+
+    select_level(engine, state.get("level", 0))
+    mask = bytearray(engine.bricks.alive)
+    apply_json(engine, state, mask)
+    engine.bricks.set_alive_mask(mask, json_hp(state, mask))
+    return state
+
+
+def changed_indices(old, new, chunk=1024):
+    """indices où les masques old et new diffèrent (les blocs identiques sont sautés d'un coup)"""
+    changed = []
+    for start in range(0, len(new), chunk):
+        end = start + chunk
+        if old[start:end] != new[start:end]:
+            for index in range(start, min(end, len(new))):
+                if old[index] != new[index]:
+                    changed.append(index)
+    return changed
+
+
+class BackgroundWriter:
+    """
+    Fil d'écriture des fichiers:
+    - submit(fonction, *args) met une tâche en file; les tâches sont exécutées une par une, dans l'ordre
+    - flush() attend la fin des tâches en file, close() les termine puis arrête le fil
+    - une erreur d'écriture est affichée et gardée dans errors, sans arrêter le jeu
+    """
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.errors = []
+        self.thread = threading.Thread(target=self.run, name="sauvegarde", daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, *args):
+        self.queue.put((fn, args))
+
+    def run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                fn, args = job
+                try:
+                    fn(*args)
+                except Exception as e:
+                    self.errors.append(e)
+                    print(f"Erreur de sauvegarde: {e}")
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+
+class AutoSaver:
+    """
+    Sauvegarde automatique incrémentale d'une partie:
+    - due() indique si l'intervalle est écoulé, autosave(engine) prend une copie de l'état
+      (rapide, dans le fil Tk) et confie l'écriture au BackgroundWriter
+    - la première écriture et une sur compact_every sont complètes (path, au format binaire
+      sauf si path se termine par .json),
+      les autres n'ajoutent au journal que les briques changées (détruites, revenues, points de vie)
+      et l'état balle/raquette/score/vies
+    - chaque écriture porte un numéro seq: au chargement, seules les entrées du journal
+      plus récentes que la base sont rejouées (un arrêt entre base et journal ne perd rien)
+    - seq reprend après la dernière entrée du journal laissé par une session précédente:
+      une nouvelle base est toujours plus récente que ces entrées, même si le journal n'a pas pu être vidé
+    """
+    def __init__(self, writer, path="save.json", interval=AUTOSAVE_INTERVAL,
+                 compact_every=AUTOSAVE_COMPACT, clock=time.monotonic):
+        self.writer = writer
+        self.path = path
+        self.journal_path = journal_path(path)
+        self.interval = interval
+        self.compact_every = compact_every
+        self.clock = clock
+        self.next_save = clock() + interval
+        #état propre au fil d'écriture
+        self.seq = 0
+        self.last_mask = None
+        self.last_hp = None
+        self.last_level = 0
+        self.deltas = 0
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def due(self):
+        return self.clock() >= self.next_save
+
+    def autosave(self, engine):
+        """sauvegarde incrémentale en arrière-plan"""
+        self.next_save = self.clock() + self.interval
+        self.writer.submit(self.write, engine.get_state(), False)
+
+    def save(self, engine):
+        """sauvegarde complète en arrière-plan"""
+        self.next_save = self.clock() + self.interval
+        self.writer.submit(self.write, engine.get_state(), True)
+
+    def delete(self):
+        """efface la sauvegarde et son journal (après les écritures déjà en file)"""
+        self.writer.submit(self.remove_files)
+
+    def write(self, state, full):
+        """(fil d'écriture) écrit une base complète ou ajoute une entrée au journal"""
+        if self.seq == 0:
+            #première écriture de cette session
+            self.seq = journal_seq(self.journal_path)
+        self.seq += 1
+        mask = state["bricks"]
+        level = state.get("level", 0)
+        #le journal ne décrit que des changements de briques: un nouveau niveau demande une base
+        if (full or self.last_mask is None or len(self.last_mask) != len(mask) or level != self.last_level
+                or self.deltas >= self.compact_every):
+            self.write_base(state)
+        else:
+            self.write_delta(state)
+        self.last_mask = mask
+        self.last_hp = array('i', state["hp"])
+        self.last_level = level
+
+    def write_base(self, state):
+        if self.path.endswith(".json"):
+            atomic_write(self.path, json.dumps(state_to_json(state, self.seq)))
+        else:
+            atomic_write(self.path, encode_binary(state, self.seq))
+        #le journal ne contient plus que des entrées antérieures à la base: on le vide
+        atomic_write(self.journal_path, "")
+        self.deltas = 0
+
+    def write_delta(self, state):
+        changed = changed_indices(self.last_mask, state["bricks"])
+        mask = state["bricks"]
+        hp = array('i', state["hp"])
+        entry = {
+            "seq": self.seq,
+            "score": state["score"],
+            "lives": state["lives"],
+            "paddle": {"x": state["paddle"]["x"]},
+            "ball": dict(state["ball"]),
+            "killed": [index for index in changed if not mask[index]],
+            "revived": [index for index in changed if mask[index]],
+            "hp": [[index, hp[index]] for index in changed_indices(self.last_hp, hp)],
+        }
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.deltas += 1
+
+    def remove_files(self):
+        for path in (self.path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.last_mask = None
+
+
+def journal_path(path):
+    """save.bin -> save.journal"""
+    return os.path.splitext(path)[0] + ".journal"
+
+
+def journal_seq(path):
+    """numéro seq de la dernière entrée complète du journal path (0 si le journal est absent ou vide)"""
+    seq = 0
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    seq = max(seq, json.loads(line)["seq"])
+                except ValueError:
+                    break
+    return seq
+
+
+def load_autosave(engine, path):
+    """
+    - charge la base path (binaire ou JSON) puis rejoue les entrées plus récentes du journal
+    - une dernière ligne incomplète (arrêt pendant l'écriture) est ignorée
+    - les briques sont restaurées en bloc
+    """
+    seq, mask, hp = read_base(engine, path)
+
+    journal = journal_path(path)
+    if os.path.exists(journal):
+        with open(journal, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if entry["seq"] <= seq:
+                    continue
+                apply_json(engine, entry, mask)
+                for index in entry["killed"]:
+                    mask[index] = 0
+                for index in entry["revived"]:
+                    mask[index] = 1
+                if entry.get("hp"):
+                    hp = array('i', hp if hp is not None else engine.bricks.hp)
+                    for index, value in entry["hp"]:
+                        hp[index] = value
+    engine.bricks.set_alive_mask(mask, hp)
@@ -0,0 +1,429 @@
+"""
+Diffusion d'une partie du Casse-Brique à des spectateurs (socket locale UNIX ou TCP)
+
+Fonctionnalités :
+- StatePublisher (côté jeu, sans Tkinter) : socket d'écoute non bloquante, publish(engine) à chaque dessin
+    - accepte les nouveaux spectateurs sans attendre
+    - une image delta par appel, construite une fois pour tous les spectateurs :
+      balle, raquette, score, vies, briques détruites / revenues depuis l'image précédente, balles du multiballe
+    - les briques changées sont relevées par BricksManager.changes (pas de comparaison de tout le tableau
+      à chaque image) ; un changement en bloc (version) renvoie une keyframe
+    - à la connexion (ou quand un spectateur a pris du retard) : image complète (keyframe),
+      précédée du plan des briques (positions, tailles, couleurs; compressé) s'il ne l'a pas encore
+    - envois non bloquants : un spectateur trop lent perd des images (puis reçoit une keyframe),
+      le jeu n'attend jamais
+- client spectateur (python spectateur.py [adresse]) : fenêtre Tkinter qui reçoit les images
+  et les dessine avec le rendu du jeu (CanvasRenderer / FramebufferRenderer)
+
+Format (octets little-endian) : chaque message est MESSAGE (type, taille) suivi de son contenu
+    BOARD : BOARD_HEADER, palette (JSON), tableaux xs ys ws hs (d) et color_ids (H) compressés par zlib
+    KEY   : STATE, masque des briques vivantes (1 bit par brique)
+    DELTA : STATE, CHANGES (détruites, revenues), indices (I) des briques détruites puis revenues
+    STATE se termine par le nombre de balles du multiballe, suivi de leurs positions (h, arrondies)
+
+Adresse : "hôte:port" (TCP) ou chemin d'une socket UNIX
+
+Coding: UTF-8
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+import zlib
+from array import array
+from collections import deque
+
+from moteur import RUNNING, LOST, WON
+from sauvegarde import pack_mask, unpack_mask
+
+DEFAULT_ADDRESS = "127.0.0.1:7777"
+LAG_LIMIT = 256 * 1024      #octets en attente au-delà desquels un spectateur perd des images
+MAX_SPECTATORS = 16
+
+MESSAGE = struct.Struct('<BI')              #type, taille du contenu
+BOARD_HEADER = struct.Struct('<IddI')       #briques, largeur de la raquette, rayon de la balle, taille de la palette
+STATE = struct.Struct('<IiiBfffH')          #tick, score, vies, état, balle x/y, raquette x, balles du multiballe
+CHANGES = struct.Struct('<II')              #briques détruites, briques revenues
+BOARD = 1
+KEY = 2
+DELTA = 3
+STATUS_CODES = {RUNNING: 0, LOST: 1, WON: 2}
+STATUSES = {code: status for status, code in STATUS_CODES.items()}
+
+
+def parse_address(address):
+    """'hôte:port' -> (AF_INET, (hôte, port)); sinon chemin de socket UNIX -> (AF_UNIX, chemin)"""
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, address
+
+
+def little_endian(values):
+    """octets d'un tableau dans l'ordre little-endian (celui du format)"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def from_little_endian(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def message(kind, payload):
+    return MESSAGE.pack(kind, len(payload)) + payload
+
+
+def encode_board(engine):
+    """plan des briques (ne change qu'avec le niveau)"""
+    bricks = engine.bricks
+    palette = json.dumps(bricks.palette).encode('utf-8')
+    arrays = b''.join([little_endian(values) for values in (bricks.xs, bricks.ys, bricks.ws, bricks.hs,
+                                                             bricks.color_ids)])
+    header = BOARD_HEADER.pack(len(bricks), engine.paddle.width, engine.ball.radius, len(palette))
+    return message(BOARD, header + palette + zlib.compress(arrays))
+
+
+def encode_state(engine):
+    """STATE + positions des balles du multiballe"""
+    ball = engine.ball
+    swarm = engine.swarm
+    n = swarm.n if swarm is not None else 0
+    head = STATE.pack(engine.ticks, engine.score, engine.lives, STATUS_CODES[engine.status],
+                      ball.x, ball.y, engine.paddle.x, n)
+    if n == 0:
+        return head
+    positions = array('h', [int(round(v)) for pair in zip(swarm.x[:n].tolist(), swarm.y[:n].tolist()) for v in pair])
+    return head + little_endian(positions)
+
+
+class Spectator:
+    """connexion d'un spectateur: messages en attente d'envoi (le premier peut être à moitié envoyé)"""
+    def __init__(self, sock):
+        self.sock = sock
+        self.pending = deque()
+        self.sent = 0           #octets déjà envoyés du premier message
+        self.pending_bytes = 0
+        self.board = None       #plan des briques déjà reçu (tableau xs du moteur)
+        self.needs_key = True
+
+    def queue(self, data):
+        self.pending.append(data)
+        self.pending_bytes += len(data)
+
+    def drop(self):
+        """oublie les messages pas encore commencés (le premier, à moitié envoyé, doit finir)"""
+        while len(self.pending) > (1 if self.sent else 0):
+            data = self.pending.pop()
+            self.pending_bytes -= len(data)
+            if data[0] == BOARD:
+                #plan perdu avant d'être envoyé: il faudra le renvoyer
+                self.board = None
+
+    def flush(self):
+        """envoie ce que la socket accepte sans attendre; False si le spectateur est parti"""
+        while self.pending:
+            data = self.pending[0]
+            try:
+                n = self.sock.send(memoryview(data)[self.sent:])
+            except (BlockingIOError, InterruptedError):
+                return True
+            except OSError:
+                return False
+            self.sent += n
+            if self.sent < len(data):
+                return True
+            self.pending.popleft()
+            self.pending_bytes -= len(data)
+            self.sent = 0
+        return True
+
+
+class StatePublisher:
+    """
+    Publication de l'état d'un moteur pour les spectateurs:
+    - publish(engine) à chaque dessin: jamais bloquant
+    - close() ferme les connexions et la socket d'écoute
+    """
+    def __init__(self, address=DEFAULT_ADDRESS):
+        self.family, self.address = parse_address(address)
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.remove(self.address)
+        self.server = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(self.address)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.spectators = []
+        #plan et masque des briques au moment de la dernière image envoyée
+        self.board = None
+        self.board_message = None
+        self.mask = None
+        #briques suivies (leur liste changes est remplie pour nous) et leur version à la dernière image
+        self.bricks = None
+        self.version = None
+        self.frames = 0
+        self.dropped = 0        #images perdues par des spectateurs trop lents
+
+    def accept(self):
+        while len(self.spectators) < MAX_SPECTATORS:
+            try:
+                sock, _ = self.server.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            if self.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.spectators.append(Spectator(sock))
+
+    def publish(self, engine):
+        """envoie l'image courante (delta, ou keyframe aux nouveaux spectateurs et à ceux en retard)"""
+        self.accept()
+        if not self.spectators:
+            #personne à servir: on ne relève plus les changements (le prochain spectateur part d'une keyframe)
+            self.detach()
+            return
+        bricks = engine.bricks
+        if bricks.xs is not self.board:
+            #nouveau plan (niveau): tout le monde repart d'une keyframe
+            self.board = bricks.xs
+            self.board_message = encode_board(engine)
+            self.mask = None
+        if bricks is not self.bricks:
+            #autre moteur (partie reprise, nouvelle partie)
+            self.detach()
+            self.bricks = bricks
+            bricks.changes = []
+        state = encode_state(engine)
+        delta = None
+        if self.mask is None or bricks.version != self.version:
+            #premier envoi ou changement en bloc: masque recopié, keyframe pour tous
+            self.mask = bytearray(bricks.alive)
+            self.version = bricks.version
+        else:
+            #seules les briques touchées depuis l'image précédente sont regardées
+            killed = []
+            revived = []
+            alive = bricks.alive
+            mask = self.mask
+            for index in sorted(set(bricks.changes)):
+                if alive[index] != mask[index]:
+                    mask[index] = alive[index]
+                    (revived if alive[index] else killed).append(index)
+            indices = little_endian(array('I', killed + revived))
+            delta = message(DELTA, state + CHANGES.pack(len(killed), len(revived)) + indices)
+        bricks.changes.clear()
+        key = None
+        self.frames += 1
+
+        for spectator in list(self.spectators):
+            if not spectator.flush():
+                self.remove(spectator)
+                continue
+            if spectator.pending_bytes > LAG_LIMIT:
+                #en retard: ses images en attente sont perdues, il repartira d'une keyframe
+                spectator.drop()
+                spectator.needs_key = True
+                self.dropped += 1
+                continue
+            if spectator.needs_key or delta is None:
+                if spectator.board is not self.board:
+                    spectator.queue(self.board_message)
+                    spectator.board = self.board
+                if key is None:
+                    key = message(KEY, state + pack_mask(self.mask))
+                spectator.queue(key)
+                spectator.needs_key = False
+            else:
+                spectator.queue(delta)
+            if not spectator.flush():
+                self.remove(spectator)
+
+    def detach(self):
+        """arrête le relevé des changements de briques (masque à recopier au prochain envoi)"""
+        if self.bricks is not None:
+            self.bricks.changes = None
+        self.bricks = None
+        self.mask = None
+
+    def remove(self, spectator):
+        self.spectators.remove(spectator)
+        spectator.sock.close()
+
+    def close(self):
+        self.detach()
+        for spectator in self.spectators:
+            spectator.sock.close()
+        self.spectators.clear()
+        self.server.close()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.remove(self.address)
+
+
+class MirrorEngine:
+    """
+    (client) copie de l'état reçu, avec les attributs lus par les rendus du jeu:
+    paddle, ball, bricks (BricksManager), score, lives, status, swarm
+    """
+    def __init__(self):
+        from moteur import BricksManager, Paddle, Ball
+        self.paddle = Paddle()
+        self.ball = Ball(self.paddle)
+        self.bricks = BricksManager(rows=0, cols=1)
+        self.score = 0
+        self.lives = 0
+        self.status = RUNNING
+        self.ticks = 0
+        self.swarm = None
+
+    def apply(self, kind, payload):
+        """applique un message BOARD, KEY ou DELTA"""
+        if kind == BOARD:
+            self.apply_board(payload)
+            return
+        rest = self.apply_state(payload)
+        bricks = self.bricks
+        if kind == KEY:
+            if len(bricks):
+                bricks.set_alive_mask(unpack_mask(rest, len(bricks)))
+        elif kind == DELTA:
+            killed, revived = CHANGES.unpack_from(rest, 0)
+            indices = from_little_endian('I', rest[CHANGES.size:CHANGES.size + 4 * (killed + revived)])
+            for index in indices[:killed]:
+                bricks.destroy(index)
+            for index in indices[killed:]:
+                bricks.revive(index, 1)
+
+    def apply_board(self, payload):
+        count, paddle_width, radius, palette_size = BOARD_HEADER.unpack_from(payload, 0)
+        pos = BOARD_HEADER.size
+        palette = json.loads(payload[pos:pos + palette_size].decode('utf-8'))
+        arrays = zlib.decompress(payload[pos + palette_size:])
+        bricks = self.bricks
+        size = 8 * count
+        bricks.xs, bricks.ys, bricks.ws, bricks.hs = [from_little_endian('d', arrays[i * size:(i + 1) * size])
+                                                      for i in range(4)]
+        bricks.color_ids = from_little_endian('H', arrays[4 * size:])
+        bricks.palette = palette
+        bricks.values = array('i', bytes(4 * count))
+        bricks.hp = array('i', bytes(4 * count))
+        bricks.powers = bytearray(count)
+        bricks.alive = bytearray(count)
+        bricks.live = 0
+        bricks.destroyed.clear()
+        bricks.revived.clear()
+        bricks.version += 1
+        self.paddle.width = paddle_width
+        self.ball.radius = radius
+
+    def apply_state(self, payload):
+        """STATE (+ balles du multiballe); retourne la suite du message"""
+        ticks, score, lives, status, x, y, paddle_x, n = STATE.unpack_from(payload, 0)
+        self.ticks, self.score, self.lives, self.status = ticks, score, lives, STATUSES[status]
+        self.ball.x, self.ball.y, self.paddle.x = x, y, paddle_x
+        end = STATE.size + 4 * n
+        if n or self.swarm is not None:
+            from multiballe import BallSwarm, HAS_NUMPY
+            if HAS_NUMPY:
+                if self.swarm is None:
+                    self.swarm = BallSwarm(self.ball.radius)
+                positions = from_little_endian('h', payload[STATE.size:end])
+                n = min(n, self.swarm.capacity)
+                self.swarm.x[:n] = positions[0:2 * n:2]
+                self.swarm.y[:n] = positions[1:2 * n:2]
+                self.swarm.n = n
+        return payload[end:]
+
+
+def watch(address=DEFAULT_ADDRESS):
+    """fenêtre du spectateur: se connecte (et se reconnecte) au jeu et dessine les images reçues"""
+    import tkinter as tk
+    from final_version import renderer_class
+    from moteur import C_WIDTH, C_HEIGHT
+
+    window = tk.Tk()
+    window.title(f"Casse-Brique - spectateur ({address})")
+    canvas = tk.Canvas(window, width=C_WIDTH, height=C_HEIGHT, bg='black')
+    canvas.pack()
+    info = canvas.create_text(C_WIDTH - 10, 10, anchor='ne', fill='#fd3f92', font=('Arial', 16), text="")
+    mirror = MirrorEngine()
+    view = {"sock": None, "buffer": bytearray(), "renderer": None, "lives": None}
+
+    def connect():
+        family, target = parse_address(address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.connect(target)
+        except OSError:
+            sock.close()
+            canvas.itemconfigure(info, text="en attente du jeu...")
+            return None
+        sock.setblocking(False)
+        view["buffer"].clear()
+        return sock
+
+    def poll():
+        sock = view["sock"] or connect()
+        view["sock"] = sock
+        if sock is None:
+            window.after(1000, poll)
+            return
+        buffer = view["buffer"]
+        while True:
+            try:
+                data = sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                data = b''
+            if not data:
+                sock.close()
+                view["sock"] = None
+                canvas.itemconfigure(info, text="jeu déconnecté")
+                window.after(1000, poll)
+                return
+            buffer += data
+        pos = 0
+        received = False
+        while len(buffer) - pos >= MESSAGE.size:
+            kind, size = MESSAGE.unpack_from(buffer, pos)
+            if len(buffer) - pos - MESSAGE.size < size:
+                break
+            start = pos + MESSAGE.size
+            mirror.apply(kind, bytes(buffer[start:start + size]))
+            pos = start + size
+            received = True
+        del buffer[:pos]
+        if received:
+            renderer = view["renderer"]
+            if len(mirror.bricks) and (renderer is None or renderer.brick_version != mirror.bricks.version):
+                #premier plateau ou nouveau niveau: le rendu suit le nombre de briques (comme dans le jeu)
+                backend = renderer_class(len(mirror.bricks))
+                if type(renderer) is not backend:
+                    if renderer is not None:
+                        renderer.destroy()
+                    view["renderer"] = backend(canvas, mirror)
+            if view["renderer"] is not None:
+                view["renderer"].draw()
+            text = f"Vies: {mirror.lives}"
+            if mirror.status != RUNNING:
+                text += "  -  " + ("VICTOIRE" if mirror.status == WON else "GAME OVER")
+            if text != view["lives"]:
+                view["lives"] = text
+                canvas.itemconfigure(info, text=text)
+        window.after(10, poll)
+
+    poll()
+    window.mainloop()
+
+
+if __name__ == "__main__":
+    watch(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ADDRESS)
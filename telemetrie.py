@@ -0,0 +1,173 @@
+"""
+Mesures de temps du Casse-Brique (sans Tkinter)
+
+Fonctionnalités :
+- histogramme glissant des durées (RollingHistogram) : p50, p99... sur les N dernières mesures
+- Profiler : un histogramme par phase de la boucle (paddle.move, ball.update, collisions...)
+  + durée des images, images perdues et ticks par seconde
+- export JSON / CSV du résumé
+- input.latency : délai entre une touche et le tick qui déplace la raquette (voir commandes.py)
+
+Désactivé (Engine.profiler / Game.profiler à None), il ne coûte qu'un test par tick.
+
+Coding: UTF-8
+"""
+
+import csv
+import json
+import math
+import time
+from array import array
+
+#phases mesurées, dans l'ordre d'affichage
+PHASES = ('paddle.move', 'ball.update', 'collisions.walls', 'collisions.bricks', 'collisions.paddle',
+          'multiballe', 'bricks.count', 'render', 'hud', 'input.latency')
+
+
+class RollingHistogram:
+    """
+    Histogramme des window dernières durées (en ms):
+    - classes logarithmiques (BINS_PER_DECADE par décade, de 1 µs à 10 s)
+    - add() est en O(1): la plus vieille mesure sort de l'histogramme quand une nouvelle entre
+    - percentile(p) parcourt les classes (borne haute de la classe trouvée)
+    """
+    BINS_PER_DECADE = 20
+    MIN_MS = 0.001
+    DECADES = 7
+
+    def __init__(self, window=1024):
+        self.nbins = self.BINS_PER_DECADE * self.DECADES
+        self.counts = array('I', bytes(4 * self.nbins))
+        self.ring = array('H', bytes(2 * window))
+        self.window = window
+        self.pos = 0
+        self.size = 0
+        #totaux depuis le début (hors fenêtre)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def bin(self, ms):
+        """classe de la durée ms"""
+        if ms <= self.MIN_MS:
+            return 0
+        index = int(math.log10(ms / self.MIN_MS) * self.BINS_PER_DECADE)
+        return index if index < self.nbins else self.nbins - 1
+
+    def add(self, ms):
+        """ajoute une durée (ms)"""
+        index = self.bin(ms)
+        if self.size == self.window:
+            self.counts[self.ring[self.pos]] -= 1
+        else:
+            self.size += 1
+        self.ring[self.pos] = index
+        self.counts[index] += 1
+        self.pos = (self.pos + 1) % self.window
+        self.total += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p):
+        """durée (ms) sous laquelle se trouvent p % des mesures de la fenêtre (0.0 si vide)"""
+        if self.size == 0:
+            return 0.0
+        rank = math.ceil(self.size * p / 100) or 1
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.MIN_MS * 10 ** ((index + 1) / self.BINS_PER_DECADE)
+        return self.max_ms
+
+    def summary(self):
+        """dictionnaire: nombre, moyenne, p50, p90, p99, max (ms)"""
+        return {
+            "count": self.total,
+            "mean_ms": self.sum_ms / self.total if self.total else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ms,
+        }
+
+
+class Profiler:
+    """
+    Chronométrage de la boucle de jeu:
+    - add(phase, secondes) range une durée dans l'histogramme de la phase
+    - begin_frame() / end_frame() mesurent une image (un appel de Game.update)
+    - une image est perdue si elle dépasse frame_budget (s) ou si des dessins ont été sautés
+    - tick() compte les ticks de physique (ticks/s sur la dernière seconde)
+    """
+    def __init__(self, frame_budget, window=1024, clock=time.perf_counter):
+        self.clock = clock
+        self.frame_budget = frame_budget
+        self.phases = {name: RollingHistogram(window) for name in PHASES}
+        self.frames = RollingHistogram(window)
+        self.dropped_frames = 0
+        self.ticks = 0
+        self.ticks_per_second = 0.0
+        self.frame_start = 0.0
+        self.rate_start = clock()
+        self.rate_ticks = 0
+
+    def add(self, phase, seconds):
+        """ajoute une durée (en secondes) à la phase"""
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = RollingHistogram(self.frames.window)
+        histogram.add(seconds * 1000.0)
+
+    def tick(self):
+        """compte un tick de physique"""
+        self.ticks += 1
+
+    def begin_frame(self):
+        self.frame_start = self.clock()
+
+    def end_frame(self, skipped=0):
+        """termine la mesure de l'image; skipped = dessins sautés depuis l'image précédente"""
+        now = self.clock()
+        elapsed = now - self.frame_start
+        self.frames.add(elapsed * 1000.0)
+        if elapsed > self.frame_budget:
+            self.dropped_frames += 1
+        self.dropped_frames += skipped
+        if now - self.rate_start >= 1.0:
+            self.ticks_per_second = (self.ticks - self.rate_ticks) / (now - self.rate_start)
+            self.rate_start = now
+            self.rate_ticks = self.ticks
+
+    def overlay_text(self):
+        """texte court pour l'affichage sur le canevas"""
+        latency = self.phases['input.latency']
+        return (f"frame p50 {self.frames.percentile(50):.2f} ms  p99 {self.frames.percentile(99):.2f} ms  "
+                f"{self.ticks_per_second:.0f} ticks/s  perdues {self.dropped_frames}  "
+                f"touche p50 {latency.percentile(50):.1f} ms  p99 {latency.percentile(99):.1f} ms")
+
+    def summary(self):
+        """résumé complet (dictionnaire sérialisable en JSON)"""
+        return {
+            "frames": self.frames.summary(),
+            "dropped_frames": self.dropped_frames,
+            "ticks": self.ticks,
+            "ticks_per_second": self.ticks_per_second,
+            "phases": {name: histogram.summary() for name, histogram in self.phases.items()},
+        }
+
+    def export_json(self, path):
+        """écrit le résumé dans un fichier JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_csv(self, path):
+        """écrit une ligne par phase (et une pour les images) dans un fichier CSV"""
+        fields = ["phase", "count", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerow({"phase": "frame", **self.frames.summary()})
+            for name, histogram in self.phases.items():
+                writer.writerow({"phase": name, **histogram.summary()})
@@ -0,0 +1,283 @@
+"""
+Vérifications de non-régression du moteur du Casse-Brique (sans fenêtre, sans Tkinter)
+
+Fonctionnalités :
+- avance rapide : Engine.fast_forward donne exactement le même état que run(), graines, niveaux tirés
+  au hasard (briques libres, résistantes, multiballe) et commandes de la raquette par tronçons
+- rejeu : une partie enregistrée (InputRecorder) est rejouée à l'identique, en avance rapide et tick par tick
+- multiballe (si NumPy est installé) : BallSwarm.step déplace une balle exactement comme Ball
+  (update + handle_collisions) sur le même tableau de briques
+- briques partagées : une brique touchée dans le même tick par la balle et le multiballe
+  ne rapporte sa valeur (et son bonus) qu'une fois
+- grille de collisions : BricksManager.collision et candidates() donnent les mêmes briques
+  qu'un parcours complet de toutes les briques
+- chaque vérification affiche le premier écart trouvé ; code de sortie 1 si l'une échoue
+
+Utilisation :
+    python verification.py                  # toutes les vérifications
+    python verification.py --quick          # moins de parties
+    python verification.py --seed 7         # autres tirages
+
+Coding: UTF-8
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+from moteur import Engine, BricksManager, Paddle, Ball, C_WIDTH, C_HEIGHT, RUNNING
+from niveau import compile_level
+from rejeu import InputRecorder, replay
+from multiballe import HAS_NUMPY
+from lots import POLICIES
+
+COLORS = ["#e74c3c", "#e67e22", "#f1c40f", "#2ecc71", "#3498db", "#9b59b6"]
+
+
+def random_level(rng):
+    """texte d'un niveau tiré par rng: grille à trous, briques résistantes, bonus multiballe, briques libres"""
+    cols = rng.randint(4, 40)
+    rows = rng.randint(1, 25)
+    case_w = C_WIDTH // cols
+    case_h = rng.randint(6, min(24, 300 // rows))
+    lines = [f"case {case_w} {case_h}", f"origine 0 {rng.randint(30, 80)}"]
+    symbols = "abcdef"
+    for symbol, color in zip(symbols, COLORS):
+        lines.append(f"brique {symbol} {color} {rng.randint(1, 3)} {rng.randint(1, 3)}")
+    lines.append("brique m #ecf0f1 1 1 multiballe")
+    lines.append("grille")
+    for _ in range(rows):
+        lines.append("".join(rng.choice(symbols + "m.." if rng.random() < 0.1 else symbols + "..")
+                             for _ in range(cols)))
+    lines.append("fin")
+    for _ in range(rng.randint(0, 8)):
+        w, h = rng.randint(5, 120), rng.randint(5, 40)
+        lines.append(f"libre {rng.randint(0, C_WIDTH - w)} {rng.randint(30, 450 - h)} {w} {h} {rng.choice(symbols)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_levels(folder, rng, count):
+    """count niveaux tirés au hasard, écrits dans folder; retourne leurs chemins"""
+    paths = []
+    for index in range(count):
+        path = os.path.join(folder, f"niveau_{index}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(random_level(rng))
+        paths.append(path)
+    return paths
+
+
+def random_engine(rng, levels):
+    """moteur tiré au hasard (graine, raquette, vitesse, mode de collision, niveaux)"""
+    return Engine(paddle_width=rng.randint(40, 300), ball_speed=rng.uniform(3, 12), lives=rng.randint(1, 5),
+                  swept=rng.random() < 0.8, seed=rng.randrange(2**32),
+                  levels=rng.sample(levels, rng.randint(1, len(levels))))
+
+
+def play(engine, rng, max_ticks, advance):
+    """
+    - joue la partie par tronçons de longueur tirée par rng; vitesse de la raquette fixée par tronçon,
+      donnée par une stratégie de lots.py (parties longues) ou tirée au hasard
+    - advance: engine.run ou engine.fast_forward; retourne la liste des états après chaque tronçon
+    """
+    states = []
+    while engine.status == RUNNING and engine.ticks < max_ticks:
+        if rng.random() < 0.97:
+            #stratégie suivie de près: la raquette rattrape la balle
+            engine.set_paddle_speed(POLICIES["anticipation"](engine))
+            length = rng.randint(1, 8)
+        else:
+            engine.set_paddle_speed(rng.uniform(-20, 20))
+            length = rng.randint(1, 30)
+        advance(min(length, max_ticks - engine.ticks))
+        states.append(engine.get_state())
+    return states
+
+
+def check_fast_forward(rng, folder, games, max_ticks):
+    """fast_forward() et run() donnent le même état après chaque tronçon"""
+    levels = write_levels(folder, rng, 6)
+    for game in range(games):
+        seed = rng.randrange(2**32)
+        fast = random_engine(random.Random(seed), levels)
+        ticks = random_engine(random.Random(seed), levels)
+        plan = rng.randrange(2**32)
+        fast_states = play(fast, random.Random(plan), max_ticks, fast.fast_forward)
+        tick_states = play(ticks, random.Random(plan), max_ticks, ticks.run)
+        for index, (a, b) in enumerate(zip(fast_states, tick_states)):
+            if a != b:
+                diff = sorted(key for key in a if a[key] != b.get(key))
+                return f"partie {game} (graine {seed}), tronçon {index}: {', '.join(diff)} différents"
+        if len(fast_states) != len(tick_states):
+            return f"partie {game} (graine {seed}): {len(fast_states)} tronçons au lieu de {len(tick_states)}"
+    return None
+
+
+def check_replay(rng, folder, games, max_ticks):
+    """une partie enregistrée se rejoue à l'identique (rejeu.replay vérifie ticks, score, vies et briques)"""
+    levels = write_levels(folder, rng, 4)
+    path = os.path.join(folder, "partie.cbr")
+    for game in range(games):
+        engine = random_engine(rng, levels)
+        engine.recorder = InputRecorder(engine)
+        play(engine, rng, max_ticks, engine.run)
+        engine.recorder.save(path)
+        for fast in (True, False):
+            try:
+                result = replay(path, fast=fast)
+            except ValueError as e:
+                return f"partie {game} ({'avance rapide' if fast else 'tick par tick'}): {e}"
+            if result.get_state() != engine.get_state():
+                return f"partie {game} ({'avance rapide' if fast else 'tick par tick'}): état final différent"
+    return None
+
+
+def check_swarm(rng, games, max_ticks):
+    """une balle de BallSwarm suit exactement la même trajectoire qu'une Ball (mode test à l'arrivée)"""
+    if not HAS_NUMPY:
+        return None
+    from multiballe import BallSwarm
+    for game in range(games):
+        level = compile_level(random_level(rng))
+        swarm_bricks = BricksManager(level=level)
+        ball_bricks = BricksManager(level=level)
+        paddle = Paddle(rng.randint(40, 300))
+        ball = Ball(paddle, speed=rng.uniform(3, 12))
+        ball.x, ball.y = rng.uniform(10, C_WIDTH - 10), rng.uniform(450, 550)
+        ball.vx, ball.vy = rng.uniform(-8, 8), -rng.uniform(2, 8)
+        swarm = BallSwarm(ball.radius)
+        swarm.add(ball.x, ball.y, ball.vx, ball.vy)
+        for tick in range(max_ticks):
+            if tick % 50 == 0:
+                paddle.set_speed(rng.uniform(-20, 20))
+            paddle.move()
+            ball.update()
+            ball.handle_collisions(ball_bricks)
+            swarm.step(swarm_bricks, paddle)
+            lost = ball.y - ball.radius > C_HEIGHT
+            if lost != (swarm.n == 0):
+                return f"tableau {game}, tick {tick}: balle perdue d'un seul côté"
+            if lost:
+                break
+            if swarm.balls()[0] != (ball.x, ball.y, ball.vx, ball.vy):
+                return f"tableau {game}, tick {tick}: {swarm.balls()[0]} != {(ball.x, ball.y, ball.vx, ball.vy)}"
+            if swarm_bricks.alive != ball_bricks.alive or swarm_bricks.hp != ball_bricks.hp:
+                return f"tableau {game}, tick {tick}: briques différentes"
+    return None
+
+
+def check_shared_hits():
+    """
+    une brique de 2 points de vie touchée dans le même tick par la balle principale et une balle
+    du multiballe: sa valeur est comptée une fois, son bonus multiballe n'est pris qu'une fois
+    """
+    if not HAS_NUMPY:
+        return None
+    from multiballe import BallSwarm, SPLIT
+    for power in ("", " multiballe"):
+        engine = Engine()
+        engine.bricks.load_level(compile_level(f"case 80 22\norigine 360 200\nbrique a #e74c3c 5 2{power}\ngrille\na\nfin\n"))
+        ball = engine.ball
+        #les deux balles montent sous la brique (bas à y = 222) et la touchent au tick suivant
+        ball.x, ball.y, ball.vx, ball.vy = 400, 222 + ball.radius + 2, 0, -5
+        engine.swarm = BallSwarm(ball.radius)
+        engine.swarm.add(380, 222 + ball.radius + 2, 0, -5)
+        engine.step()
+        if engine.bricks.count() != 0:
+            return f"brique{power or ' simple'}: pas détruite par les deux balles"
+        if engine.score != 5:
+            return f"brique{power or ' simple'}: score {engine.score} au lieu de 5"
+        #bonus pris une fois: chacune des deux balles en donne SPLIT
+        expected = 1 + (2 * SPLIT if power else 0)
+        if engine.swarm.n != expected:
+            return f"brique{power or ' simple'}: {engine.swarm.n} balles supplémentaires au lieu de {expected}"
+    return None
+
+
+def brute_collision(bricks, ball):
+    """BricksManager.collision sans la grille: toutes les briques, dans l'ordre"""
+    left, right = ball.x - ball.radius, ball.x + ball.radius
+    top, bottom = ball.y - ball.radius, ball.y + ball.radius
+    for index in range(len(bricks)):
+        if not bricks.alive[index]:
+            continue
+        brick_left, brick_top = bricks.xs[index], bricks.ys[index]
+        brick_right, brick_bottom = brick_left + bricks.ws[index], brick_top + bricks.hs[index]
+        if right >= brick_left and left <= brick_right and bottom >= brick_top and top <= brick_bottom:
+            hit_left = right - brick_left
+            hit_right = brick_right - left
+            min_hit = min(hit_left, hit_right, bottom - brick_top, brick_bottom - top)
+            if min_hit == hit_left or min_hit == hit_right:
+                ball.vx = -ball.vx
+            else:
+                ball.vy = -ball.vy
+            bricks.hit(index)
+            return index
+    return None
+
+
+def check_grid(rng, games, probes):
+    """collision() et candidates() (grille) contre un parcours de toutes les briques"""
+    for game in range(games):
+        level = compile_level(random_level(rng))
+        grid_bricks = BricksManager(level=level)
+        brute_bricks = BricksManager(level=level)
+        paddle = Paddle()
+        for probe in range(probes):
+            radius = rng.uniform(1, 30)
+            x, y = rng.uniform(-40, C_WIDTH + 40), rng.uniform(-40, 500)
+            vx, vy = rng.uniform(-10, 10), rng.uniform(-10, 10)
+            grid_ball, brute_ball = Ball(paddle, radius=radius), Ball(paddle, radius=radius)
+            for b in (grid_ball, brute_ball):
+                b.x, b.y, b.vx, b.vy = x, y, vx, vy
+            hit = grid_bricks.collision(grid_ball)
+            expected = brute_collision(brute_bricks, brute_ball)
+            if (hit.index if hit else None) != expected or (grid_ball.vx, grid_ball.vy) != (brute_ball.vx, brute_ball.vy):
+                return f"tableau {game}, essai {probe}: brique {hit.index if hit else None} au lieu de {expected}"
+
+            #rectangle quelconque: toutes les briques qui le touchent sont candidates, dans l'ordre
+            left, top = x - radius, y - radius
+            right, bottom = left + rng.uniform(0, 200), top + rng.uniform(0, 200)
+            found = list(grid_bricks.candidates(left, top, right, bottom))
+            if found != sorted(set(found)):
+                return f"tableau {game}, essai {probe}: candidats mal rangés"
+            missing = [index for index in range(len(grid_bricks))
+                       if grid_bricks.xs[index] <= right and grid_bricks.xs[index] + grid_bricks.ws[index] >= left
+                       and grid_bricks.ys[index] <= bottom and grid_bricks.ys[index] + grid_bricks.hs[index] >= top
+                       and index not in found]
+            if missing:
+                return f"tableau {game}, essai {probe}: briques {missing[:5]} absentes des candidats"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vérifications de non-régression du moteur du Casse-Brique")
+    parser.add_argument("--quick", action="store_true", help="moins de parties")
+    parser.add_argument("--seed", type=int, default=0, help="graine des tirages")
+    args = parser.parse_args(argv)
+    scale = 1 if args.quick else 4
+    rng = random.Random(args.seed)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as folder:
+        checks = [
+            ("avance rapide == tick par tick", lambda: check_fast_forward(rng, folder, 5 * scale, 20000)),
+            ("rejeu identique", lambda: check_replay(rng, folder, 3 * scale, 10000)),
+            ("multiballe == balle", lambda: check_swarm(rng, 10 * scale, 5000)),
+            ("multiballe, brique partagée", check_shared_hits),
+            ("grille == toutes les briques", lambda: check_grid(rng, 5 * scale, 500)),
+        ]
+        for name, check in checks:
+            if name.startswith("multiballe") and not HAS_NUMPY:
+                print(f"{name:32} ignorée (NumPy absent)")
+                continue
+            error = check()
+            print(f"{name:32} {'ok' if error is None else 'ÉCHEC: ' + error}")
+            failed = failed or error is not None
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())